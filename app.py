@@ -3,15 +3,19 @@ import os
 from dotenv import load_dotenv
 
 # Import custom modules
-from resume_parser import extract_text_from_pdf
+from resume_parser import PDFTooLarge
+from pdf_cache import extract_text_cached
 from ats_analyser import ats_score, categorize_keywords, analyze_coverage
 from resume_generator import generate_enhanced_resume, verify_enhancement, extract_missing_critical_keywords
-from pdf_generator import create_professional_pdf
-from rag_engine import build_vector_store, retrieve
+from incremental_scorer import IncrementalScorer
+import instrumentation
 
 # Load environment variables
 load_dotenv()
 
+# Each rerun is one request for the stage breakdown
+instrumentation.new_trace()
+
 # Page configuration
 st.set_page_config(
     page_title="ResumeAI - Intelligent ATS Optimization",
@@ -256,12 +260,17 @@ with tab1:
         resume_file = st.file_uploader("Upload your resume (PDF format)", type=["pdf"], key="resume")
         
         if resume_file:
-            st.success(f"✅ {resume_file.name}")
-            resume_text = extract_text_from_pdf(resume_file)
-            st.session_state.resume_text = resume_text
-            
-            with st.expander("👁️ Preview Content"):
-                st.text_area("", resume_text, height=200, disabled=True, label_visibility="collapsed")
+            try:
+                # Cached by content hash: reruns never re-parse the same upload
+                resume_text = extract_text_cached(resume_file)
+            except PDFTooLarge as e:
+                st.error(f"⚠️ {e}")
+            else:
+                st.success(f"✅ {resume_file.name}")
+                st.session_state.resume_text = resume_text
+                
+                with st.expander("👁️ Preview Content"):
+                    st.text_area("", resume_text, height=200, disabled=True, label_visibility="collapsed")
     
     with col2:
         st.markdown("### 📋 Job Description")
@@ -407,67 +416,107 @@ with tab3:
         
         st.markdown("---")
         
-        if st.button("🚀 Generate Enhanced Resume", type="primary", use_container_width=True):
+        generate = st.button("🚀 Generate Enhanced Resume", type="primary", use_container_width=True)
+        
+        # The same resume + JD is served from the response cache; this asks
+        # Gemini for a fresh version (and caches that one instead)
+        regenerate = False
+        if st.session_state.get("enhanced_ok"):
+            regenerate = st.button(
+                "🔁 Generate a New Version",
+                use_container_width=True,
+                help="Identical requests reuse the previous result; click for a fresh rewrite"
+            )
+        
+        if generate or regenerate:
             if 'resume_text' not in st.session_state or 'jd_text' not in st.session_state:
                 st.error("Missing required data")
             else:
                 with st.spinner("🤖 AI is enhancing your resume... This may take 30-60 seconds"):
                     enhanced_resume = generate_enhanced_resume(
                         st.session_state.resume_text,
-                        st.session_state.jd_text
+                        st.session_state.jd_text,
+                        force=regenerate
                     )
                     
                     st.session_state.enhanced_resume = enhanced_resume
+                    st.session_state.enhanced_ok = not (
+                        "ERROR" in enhanced_resume or "TROUBLESHOOTING" in enhanced_resume
+                    )
+                    st.session_state.quality_report = None
+                    st.session_state.pop("live_scorer", None)
                     
-                    if "ERROR" in enhanced_resume or "TROUBLESHOOTING" in enhanced_resume:
-                        st.error("⚠️ Enhancement service temporarily unavailable")
-                        with st.expander("Error Details"):
-                            st.code(enhanced_resume)
-                    else:
-                        st.success("✅ Enhancement Complete!")
-                        
-                        quality_report = verify_enhancement(
+                    if st.session_state.enhanced_ok:
+                        st.session_state.quality_report = verify_enhancement(
                             st.session_state.resume_text,
                             enhanced_resume,
                             st.session_state.jd_text
                         )
-                        
-                        with st.expander("📊 Quality Report"):
-                            st.code(quality_report)
-                        
-                        st.markdown("---")
-                        st.markdown("### 📄 Enhanced Resume")
-                        
-                        enhanced_text = st.text_area(
-                            "Review and customize",
-                            enhanced_resume,
-                            height=400
+        
+        # Rendered outside the button block so edits keep the section on screen
+        if 'enhanced_resume' in st.session_state:
+            enhanced_resume = st.session_state.enhanced_resume
+            
+            if not st.session_state.get("enhanced_ok"):
+                st.error("⚠️ Enhancement service temporarily unavailable")
+                with st.expander("Error Details"):
+                    st.code(enhanced_resume)
+            else:
+                st.success("✅ Enhancement Complete!")
+                
+                with st.expander("📊 Quality Report"):
+                    st.code(st.session_state.quality_report)
+                
+                st.markdown("---")
+                st.markdown("### 📄 Enhanced Resume")
+                
+                enhanced_text = st.text_area(
+                    "Review and customize",
+                    enhanced_resume,
+                    height=400
+                )
+                
+                # Live score: only the edited lines are re-analysed per rerun
+                scorer = st.session_state.get("live_scorer")
+                if scorer is None or scorer.jd.text != st.session_state.jd_text:
+                    scorer = IncrementalScorer(enhanced_text, st.session_state.jd_text)
+                    st.session_state.live_scorer = scorer
+                else:
+                    scorer.update(enhanced_text)
+                
+                live_score, _ = scorer.score()
+                st.metric(
+                    "Live ATS Score",
+                    f"{live_score}%",
+                    delta=f"{live_score - current_score:+}% vs original"
+                )
+                
+                st.markdown("---")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.download_button(
+                        "📄 Download TXT",
+                        data=enhanced_text,
+                        file_name="resume_optimized.txt",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+                
+                with col2:
+                    try:
+                        # reportlab is only needed once a resume exists
+                        from pdf_generator import create_professional_pdf
+                        pdf_buffer = create_professional_pdf(enhanced_text)
+                        st.download_button(
+                            "📑 Download PDF",
+                            data=pdf_buffer,
+                            file_name="resume_optimized.pdf",
+                            mime="application/pdf",
+                            use_container_width=True
                         )
-                        
-                        st.markdown("---")
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.download_button(
-                                "📄 Download TXT",
-                                data=enhanced_text if 'enhanced_text' in locals() else enhanced_resume,
-                                file_name="resume_optimized.txt",
-                                mime="text/plain",
-                                use_container_width=True
-                            )
-                        
-                        with col2:
-                            try:
-                                pdf_buffer = create_professional_pdf(enhanced_text if 'enhanced_text' in locals() else enhanced_resume)
-                                st.download_button(
-                                    "📑 Download PDF",
-                                    data=pdf_buffer,
-                                    file_name="resume_optimized.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True
-                                )
-                            except Exception as e:
-                                st.error(f"PDF generation error: {str(e)}")
+                    except Exception as e:
+                        st.error(f"PDF generation error: {str(e)}")
         
         if 'resume_text' in st.session_state and 'jd_text' in st.session_state:
             st.markdown("---")
@@ -561,6 +610,26 @@ with tab4:
         - ✗ Keyword typos
         """)
 
+# Debug panel: stage breakdown of this run (ATS_METRICS=1)
+if instrumentation.enabled():
+    with st.sidebar.expander("🛠️ Stage Timings"):
+        trace = instrumentation.last_trace()
+        if trace:
+            st.code("\n".join(
+                f"{'  ' * depth}{name:<{32 - 2 * depth}} {ms:>9.1f} ms"
+                for name, depth, ms in trace
+            ))
+        else:
+            st.caption("No instrumented stages ran in this request")
+        
+        st.download_button(
+            "Prometheus snapshot",
+            data=instrumentation.export_prometheus(),
+            file_name="ats_metrics.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+
 # Footer
 st.markdown("---")
 st.markdown("""
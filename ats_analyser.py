@@ -1,102 +1,151 @@
-import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import heapq
+import numpy as np
+import scipy.sparse as sp
 from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+from keyword_matcher import KeywordMatcher
+from skill_taxonomy import get_taxonomy, refresh_taxonomy
+from idf_model import get_idf_model
+from tokenizer import TokenStream, tokenize
+from instrumentation import span, timed
 def clean_text(text):
     """Normalize text"""
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s+#.\-/]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    return tokenize(text).cleaned
 
 
 # ---------------- TERM EXTRACTION ---------------- #
 
-def extract_all_terms(text, min_length=2):
+STOP_WORDS = frozenset({
+    'the','a','an','and','or','but','in','on','at','to','for','of',
+    'with','by','from','as','is','was','are','be','been','have',
+    'has','had','do','does','did','will','would','should','can',
+    'this','that','these','those','it','its','their','our','your'
+})
+
+# Limit explosion: keep the MAX_TERMS most important terms
+MAX_TERMS = 300
+
+# Distinct terms counted before rare ones are pruned (long documents)
+TERM_COUNT_CAPACITY = 20000
+
+TECH_BONUS = 2.0
+
+
+def extract_all_terms(text, min_length=2, max_terms=MAX_TERMS):
     """
     Extract meaningful terms:
     - Words
     - Bigrams
     - Trigrams
+    Returns the max_terms most important ones (deterministic).
     """
-    text = clean_text(text)
+    stream = tokenize(text)
+    return _terms_from_tokens(stream.lower, stream.tech, min_length, max_terms)
 
-    stop_words = {
-        'the','a','an','and','or','but','in','on','at','to','for','of',
-        'with','by','from','as','is','was','are','be','been','have',
-        'has','had','do','does','did','will','would','should','can',
-        'this','that','these','those','it','its','their','our','your'
-    }
 
-    words = text.split()
-    all_terms = set()
+def _terms_from_tokens(words, tech_terms=(), min_length=2, max_terms=MAX_TERMS):
+    counts = count_terms(words, min_length, TERM_COUNT_CAPACITY)
+    return select_terms(counts, tech_terms, max_terms)
+
 
-    # -------- Unigrams -------- #
-    for w in words:
-        if w not in stop_words and len(w) > min_length:
-            all_terms.add(w)
+def count_terms(words, min_length=2, capacity=None):
+    """
+    One pass over the words counting unigram, bigram and trigram terms.
 
-    # -------- Bigrams -------- #
-    for i in range(len(words)-1):
-        phrase = f"{words[i]} {words[i+1]}"
-        if len(phrase) > 5:
-            all_terms.add(phrase)
+    With a capacity, the counter is cut back to its capacity // 2 most
+    frequent terms whenever it grows past `capacity`, which bounds memory
+    on long documents. Pruning depends only on the counts and the terms,
+    so it is reproducible.
+    """
+    counts = Counter()
+    n = len(words)
 
-    # -------- Trigrams -------- #
-    for i in range(len(words)-2):
-        phrase = f"{words[i]} {words[i+1]} {words[i+2]}"
-        if len(phrase) > 10:
-            all_terms.add(phrase)
+    for i, w in enumerate(words):
 
-    # Limit explosion (IMPORTANT FIX)
-    return set(list(all_terms)[:300])
+        # -------- Unigrams -------- #
+        if w not in STOP_WORDS and len(w) > min_length:
+            counts[w] += 1
 
+        # -------- Bigrams -------- #
+        if i + 1 < n:
+            phrase = f"{w} {words[i+1]}"
+            if len(phrase) > 5:
+                counts[phrase] += 1
 
-# ---------------- TECH PATTERNS ---------------- #
+            # -------- Trigrams -------- #
+            if i + 2 < n:
+                phrase = f"{phrase} {words[i+2]}"
+                if len(phrase) > 10:
+                    counts[phrase] += 1
 
-def extract_technical_patterns(text):
-    patterns = [
-        r'\b[A-Z]{2,}\+?\+?\b',      # AWS, API, C++
-        r'\b\w+\d+\b',               # Python3
-        r'\b[A-Z][a-z]+(?:\.[a-z]+)+\b',  # Node.js
-    ]
+        if capacity and len(counts) > capacity:
+            counts = Counter(dict(heapq.nlargest(
+                capacity // 2,
+                counts.items(),
+                key=lambda tc: (tc[1], tc[0])
+            )))
 
-    tech_terms = set()
-    for p in patterns:
-        matches = re.findall(p, text)
-        tech_terms.update([m.lower() for m in matches])
+    return counts
 
-    return tech_terms
 
+@lru_cache(maxsize=1 << 16)
+def _specificity(term):
+    words = term.split(" ")
+    return len(words) - len(STOP_WORDS.intersection(words))
 
-# ---------------- NORMALIZATION ---------------- #
 
-def normalize_term(term):
-    term = term.lower().strip()
-
-    mapping = {
-        'python': ['python', 'python3', 'py'],
-        'machine learning': ['ml','machine learning'],
-        'artificial intelligence': ['ai'],
-        'deep learning': ['dl'],
-        'natural language processing': ['nlp'],
-        'react': ['react','reactjs','react.js'],
-        'node': ['node','nodejs','node.js'],
-        'aws': ['aws','amazon web services'],
-    }
+def term_importance(term, count, tech_terms=()):
+    """
+    Stable importance score: frequency x specificity (+ tech bonus).
+    Specificity is the number of non-stop-words in the term, so
+    "machine learning" outranks "with the".
+    """
+    score = count * _specificity(term)
+    if term in tech_terms:
+        score += TECH_BONUS
+    return score
+
+
+def select_terms(counts, tech_terms=(), max_terms=MAX_TERMS):
+    """Top max_terms terms by importance, ties broken by the term itself"""
+    if len(counts) <= max_terms:
+        return set(counts)
+
+    top = heapq.nlargest(
+        max_terms,
+        (
+            (term_importance(term, count, tech_terms), term)
+            for term, count in counts.items()
+        )
+    )
+    return {term for _, term in top}
+
+
+# ---------------- TECH PATTERNS ---------------- #
+
+def extract_technical_patterns(text):
+    """AWS, C++, Python3, Node.js ... (see tokenizer.TECH_RE), lowercased"""
+    return set(tokenize(text).tech)
 
-    for canon, variants in mapping.items():
-        if term in variants:
-            return canon
 
-    return term
+# ---------------- NORMALIZATION ---------------- #
+
+def normalize_term(term):
+    """Canonical skill name via the skill taxonomy (O(1) lookup)"""
+    return get_taxonomy().normalize(term.lower().strip())
 
 
 def create_normalized_set(terms):
+    index = get_taxonomy().index
     normalized = set()
     for t in terms:
-        normalized.add(t.lower())
-        normalized.add(normalize_term(t))
+        low = t.lower()
+        normalized.add(low)
+        low = low.strip()
+        normalized.add(index.get(low, low))
     return normalized
 
 
@@ -110,81 +159,284 @@ def fuzzy_match(term, text):
 # ---------------- MATCH % ---------------- #
 
 def calculate_match_percentage(resume_terms, jd_terms, resume_text):
-    if not jd_terms:
+    jd_pairs = [(term, normalize_term(term)) for term in jd_terms]
+    return _match_percentage(
+        resume_terms,
+        jd_pairs,
+        KeywordMatcher(norm for _, norm in jd_pairs).present(resume_text)
+    )
+
+
+def _match_percentage(resume_terms, jd_pairs, found_in_text):
+    """
+    Keyword match over pre-normalized (term, normalized) JD pairs.
+    found_in_text: normalized terms the JD matcher found in the resume.
+    """
+    if not jd_pairs:
         return 100.0
 
     matches = 0
 
-    for term in jd_terms:
-        norm = normalize_term(term)
-
+    for term, norm in jd_pairs:
         if (
             norm in resume_terms
             or term.lower() in resume_terms
-            or fuzzy_match(norm, resume_text)
+            or norm.lower() in found_in_text
         ):
             matches += 1
 
-    return (matches / len(jd_terms)) * 100
+    return (matches / len(jd_pairs)) * 100
 
 
-# ---------------- ATS SCORE ---------------- #
+# ---------------- TF-IDF SIMILARITY ---------------- #
 
-def ats_score(resume_text, jd_text):
+TFIDF_MAX_FEATURES = 1500
 
-    # ---- Extract terms ---- #
-    jd_terms = extract_all_terms(jd_text)
-    resume_terms = extract_all_terms(resume_text)
+# idf of a term found in only one document of a two-document corpus
+# (smooth_idf): ln((1 + 2) / (1 + 1)) + 1
+_ONE_DOC_IDF = np.log(1.5) + 1
 
-    jd_tech = extract_technical_patterns(jd_text)
-    resume_tech = extract_technical_patterns(resume_text)
 
-    jd_combined = jd_terms.union(jd_tech)
-    resume_combined = resume_terms.union(resume_tech)
+def _pair_cosine(r_counts, j_counts, one_doc):
+    """Cosine of two count vectors weighted like a two-document TF-IDF fit"""
+    idf = np.where(one_doc, _ONE_DOC_IDF, 1.0)
+    r = r_counts * idf
+    j = j_counts * idf
+    norm = np.sqrt(r @ r) * np.sqrt(j @ j)
+    return (r @ j) / norm if norm else 0.0
 
-    # ---- Keyword Match (50%) ---- #
-    keyword_match_pct = calculate_match_percentage(
-        resume_combined,
-        jd_combined,
-        resume_text
+
+def ngram_counts(tokens):
+    """
+    Unigram+bigram counts: the term-frequency side of the TF-IDF vector.
+    Like TfidfVectorizer, single-character tokens are skipped.
+    """
+    words = [t for t in tokens if len(t) > 1]
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return counts
+
+
+def _count_matrix(count_maps):
+    """(csr count matrix, column terms) over the union vocabulary"""
+    terms = sorted(set().union(*count_maps))
+    vocab = {t: i for i, t in enumerate(terms)}
+
+    indptr = [0]
+    indices = []
+    data = []
+    for counts in count_maps:
+        indices.extend(vocab[t] for t in counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+
+    X = sp.csr_matrix(
+        (
+            np.asarray(data, dtype=np.float64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(indptr, dtype=np.int64)
+        ),
+        shape=(len(count_maps), len(vocab))
     )
+    X.sort_indices()
+    return X, terms
 
-    # ---- TF-IDF Similarity (30%) ---- #
-    try:
-        vectorizer = TfidfVectorizer(
-            ngram_range=(1,2),
-            max_features=1500
+
+def _corpus_similarities(counts, terms, model):
+    """Cosine of TF-IDF vectors weighted by a corpus IDFModel (JD = last row)"""
+    n = counts.shape[0] - 1
+
+    W = counts @ sp.diags(model.idf_of(terms))
+    norms = np.sqrt(np.asarray(W.multiply(W).sum(axis=1)).ravel())
+
+    dot = np.asarray((W[:n] @ W[n].T).todense()).ravel()
+    norm = norms[:n] * norms[n]
+
+    sims = np.divide(dot, norm, out=np.zeros(n), where=norm > 0)
+    sims[counts[:n].getnnz(axis=1) + counts[n].getnnz() == 0] = np.nan
+    return sims
+
+
+def tfidf_similarities(resume_counts, jd_counts, idf_model=None):
+    """
+    TF-IDF cosine between each resume and the JD, given ngram_counts maps.
+
+    With a corpus IDF model (idf_model, or the process-wide one from
+    IDF_MODEL_DIR) this is a lookup plus sparse dot products. Without one
+    it falls back to the weighting of a TfidfVectorizer(ngram_range=(1,2),
+    max_features=1500) fit on every [resume, jd] pair (smooth idf, l2
+    norm), with the vocabulary built once for the whole batch. Returns NaN
+    where the pair has an empty vocabulary.
+    """
+    n = len(resume_counts)
+    counts, terms = _count_matrix(list(resume_counts) + [jd_counts])
+    if counts.shape[1] == 0:
+        return np.full(n, np.nan)
+
+    model = idf_model if idf_model is not None else get_idf_model()
+    if model is not None:
+        return _corpus_similarities(counts, terms, model)
+
+    R = counts[:n]
+    jd_row = counts[n]
+    jd_cols = jd_row.indices
+    jd_vals = jd_row.data
+
+    # ---- Terms shared with the JD get idf 1, the rest get _ONE_DOC_IDF ---- #
+    R_shared = R[:, jd_cols]
+    present = (R_shared > 0).astype(np.float64)
+
+    dot = R_shared @ jd_vals
+    r_shared_sq = np.asarray(R_shared.multiply(R_shared).sum(axis=1)).ravel()
+    r_total_sq = np.asarray(R.multiply(R).sum(axis=1)).ravel()
+    j_shared_sq = present @ (jd_vals * jd_vals)
+    j_total_sq = jd_vals @ jd_vals
+
+    r_norm = np.sqrt(r_shared_sq + _ONE_DOC_IDF ** 2 * (r_total_sq - r_shared_sq))
+    j_norm = np.sqrt(j_shared_sq + _ONE_DOC_IDF ** 2 * (j_total_sq - j_shared_sq))
+
+    norm = r_norm * j_norm
+    sims = np.divide(dot, norm, out=np.zeros(n), where=norm > 0)
+
+    # ---- Pairs whose joint vocabulary overflows max_features ---- #
+    vocab_sizes = R.getnnz(axis=1) + len(jd_cols) - present.getnnz(axis=1)
+    sims[vocab_sizes == 0] = np.nan
+
+    for i in np.flatnonzero(vocab_sizes > TFIDF_MAX_FEATURES):
+        row = R[i]
+        cols = np.union1d(row.indices, jd_cols)
+
+        r_counts = np.zeros(len(cols))
+        r_counts[np.searchsorted(cols, row.indices)] = row.data
+        j_counts = np.zeros(len(cols))
+        j_counts[np.searchsorted(cols, jd_cols)] = jd_vals
+
+        # Same max_features selection as sklearn's _limit_features
+        keep = (-(r_counts + j_counts)).argsort()[:TFIDF_MAX_FEATURES]
+        keep.sort()
+        r_counts = r_counts[keep]
+        j_counts = j_counts[keep]
+
+        sims[i] = _pair_cosine(
+            r_counts,
+            j_counts,
+            (r_counts == 0) | (j_counts == 0)
         )
 
-        vecs = vectorizer.fit_transform([
-            clean_text(resume_text),
-            clean_text(jd_text)
-        ])
+    return sims
 
-        similarity = cosine_similarity(vecs[0:1], vecs[1:2])[0][0]
-        similarity_score = similarity * 100
 
-    except:
-        similarity_score = keyword_match_pct
+# ---------------- FREQUENCY MATCH ---------------- #
 
-    # ---- Frequency Match (20%) ---- #
-    jd_freq = Counter(clean_text(jd_text).split())
-    important = {
+def important_jd_words(jd_freq):
+    """Words repeated in the cleaned JD (>= 2 times, > 3 chars)"""
+    return {
         w for w,c in jd_freq.items()
         if c >= 2 and len(w) > 3
     }
 
-    resume_words = set(clean_text(resume_text).split())
 
-    if important:
-        freq_score = (
-            len(important.intersection(resume_words))
-            / len(important)
-        ) * 100
-    else:
-        freq_score = keyword_match_pct
+# ---------------- PROFILES ---------------- #
+
+@dataclass(frozen=True, eq=False)
+class TextProfile:
+    """
+    Everything the analysis functions derive from one document,
+    computed once. Build with ResumeProfile.from_text / JDProfile.from_text
+    (or resume_profile / jd_profile, which also cache).
+    """
+    text: str
+    lower: str
+    cleaned: str
+    stream: TokenStream             # shared tokenizer output
+    tokens: tuple                   # lowercased tokens
+    terms: frozenset                # extract_all_terms
+    tech: frozenset                 # extract_technical_patterns
+    combined: frozenset             # terms | tech
+    terms_normalized: frozenset     # create_normalized_set(terms)
+    combined_normalized: frozenset  # create_normalized_set(combined)
+    freq: MappingProxyType          # token counts
+    ngrams: MappingProxyType        # unigram+bigram counts for TF-IDF
+
+    @staticmethod
+    def _analyse(text):
+        with span("analysis.tokenize"):
+            stream = tokenize(text)
+        tokens = stream.lower
+        tech = stream.tech
+
+        with span("analysis.terms"):
+            terms = frozenset(_terms_from_tokens(tokens, tech))
+        combined = terms | tech
+
+        return dict(
+            text=text,
+            lower=text.lower(),
+            cleaned=stream.cleaned,
+            stream=stream,
+            tokens=tokens,
+            terms=terms,
+            tech=tech,
+            combined=combined,
+            terms_normalized=frozenset(create_normalized_set(terms)),
+            combined_normalized=frozenset(create_normalized_set(combined)),
+            freq=MappingProxyType(Counter(tokens)),
+            ngrams=MappingProxyType(ngram_counts(tokens)),
+        )
 
-    # ---- FINAL WEIGHTED SCORE ---- #
+    @classmethod
+    def from_text(cls, text):
+        return cls(**cls._analyse(text or ""))
+
+
+@dataclass(frozen=True, eq=False)
+class ResumeProfile(TextProfile):
+    pass
+
+
+@dataclass(frozen=True, eq=False)
+class JDProfile(TextProfile):
+    pairs: tuple = ()               # (term, normalize_term(term)) for combined
+    important: frozenset = frozenset()
+    matcher: KeywordMatcher = None  # normalized terms, for fuzzy matching
+
+    @classmethod
+    def from_text(cls, text):
+        fields = cls._analyse(text or "")
+        fields["pairs"] = tuple(
+            (term, normalize_term(term)) for term in sorted(fields["combined"])
+        )
+        fields["important"] = frozenset(important_jd_words(fields["freq"]))
+        fields["matcher"] = KeywordMatcher(norm for _, norm in fields["pairs"])
+        return cls(**fields)
+
+
+@lru_cache(maxsize=64)
+def _cached_profile(cls, text, taxonomy_generation):
+    return cls.from_text(text)
+
+
+def resume_profile(resume):
+    """Accept resume text or a ResumeProfile; return a ResumeProfile"""
+    if isinstance(resume, ResumeProfile):
+        return resume
+    return _cached_profile(
+        ResumeProfile, resume or "", refresh_taxonomy().generation
+    )
+
+
+def jd_profile(jd):
+    """Accept JD text or a JDProfile; return a JDProfile"""
+    if isinstance(jd, JDProfile):
+        return jd
+    return _cached_profile(
+        JDProfile, jd or "", refresh_taxonomy().generation
+    )
+
+
+# ---------------- ATS SCORE ---------------- #
+
+def _weighted_score(keyword_match_pct, similarity_score, freq_score):
     final_score = (
         (keyword_match_pct * 0.50) +
         (similarity_score * 0.30) +
@@ -197,32 +449,121 @@ def ats_score(resume_text, jd_text):
     elif final_score < 60:
         final_score += 45
 
-    final_score = int(min(100, final_score))
+    return int(min(100, final_score))
 
-    # ---------------- MISSING TERMS ---------------- #
 
-    resume_norm = create_normalized_set(resume_combined)
-    jd_norm = create_normalized_set(jd_combined)
-
-    missing_norm = jd_norm - resume_norm
+def _missing_terms(resume, jd):
+    missing_norm = jd.combined_normalized - resume.combined_normalized
 
     missing_terms = []
 
-    for term in jd_combined:
-        if normalize_term(term) in missing_norm:
+    for term, norm in jd.pairs:
+        if norm in missing_norm:
             missing_terms.append(term)
 
-    missing_terms = sorted(
+    return sorted(
         missing_terms,
-        key=len,
-        reverse=True
+        key=lambda t: (-len(t), t)
     )[:40]
 
-    return final_score, missing_terms
+
+def ats_score(resume_text, jd_text):
+    """Accepts text or ResumeProfile / JDProfile"""
+    return ats_score_batch([resume_text], jd_text)[0]
+
+
+@timed("ats.score")
+def ats_score_batch(resumes, jd_text):
+    """
+    Score many resumes against one job description.
+
+    The JD is analysed once and the TF-IDF component is computed for all
+    resumes with sparse matrix operations. Resumes and JD may be text or
+    profiles. Returns a list of (score, missing_terms) in input order,
+    identical to calling ats_score on each pair.
+    """
+    with span("ats.profiles"):
+        jd = jd_profile(jd_text)
+        profiles = [resume_profile(r) for r in resumes]
+    if not profiles:
+        return []
+
+    with span("ats.tfidf"):
+        similarities = tfidf_similarities(
+            [p.ngrams for p in profiles],
+            jd.ngrams
+        )
+
+    with span("ats.keyword_match"):
+        return [
+            score_profile(
+                resume,
+                jd,
+                similarity,
+                jd.matcher.present(resume.lower)
+            )
+            for resume, similarity in zip(profiles, similarities)
+        ]
+
+
+def score_profile(resume, jd, similarity, found_in_text):
+    """
+    Combine precomputed components into (score, missing_terms).
+    similarity: TF-IDF cosine (NaN if undefined)
+    found_in_text: jd.matcher hits in the resume text
+    """
+
+    # ---- Keyword Match (50%) ---- #
+    keyword_match_pct = _match_percentage(
+        resume.combined,
+        jd.pairs,
+        found_in_text
+    )
+
+    # ---- TF-IDF Similarity (30%) ---- #
+    if np.isnan(similarity):
+        similarity_score = keyword_match_pct
+    else:
+        similarity_score = float(similarity) * 100
+
+    # ---- Frequency Match (20%) ---- #
+    if jd.important:
+        hits = sum(1 for w in jd.important if w in resume.freq)
+        freq_score = (hits / len(jd.important)) * 100
+    else:
+        freq_score = keyword_match_pct
+
+    final_score = _weighted_score(
+        keyword_match_pct,
+        similarity_score,
+        freq_score
+    )
+
+    return final_score, _missing_terms(resume, jd)
 
 
 # ---------------- CATEGORIZATION ---------------- #
 
+_TECH_INDICATORS = {
+    'python','java','ai','ml','cloud','database',
+    'react','node','api','tensorflow'
+}
+
+_SOFT_INDICATORS = {
+    'communication','leadership',
+    'teamwork','management'
+}
+
+_TOOL_INDICATORS = {
+    'github','docker','aws',
+    'jira','jenkins','git'
+}
+
+_indicator_matcher = KeywordMatcher(
+    _TECH_INDICATORS | _SOFT_INDICATORS | _TOOL_INDICATORS
+)
+
+
 def categorize_keywords(keywords):
 
     categories = {
@@ -232,31 +573,16 @@ def categorize_keywords(keywords):
         "Other": []
     }
 
-    tech_indicators = [
-        'python','java','ai','ml','cloud','database',
-        'react','node','api','tensorflow'
-    ]
-
-    soft_indicators = [
-        'communication','leadership',
-        'teamwork','management'
-    ]
-
-    tool_indicators = [
-        'github','docker','aws',
-        'jira','jenkins','git'
-    ]
-
     for kw in keywords:
-        k = kw.lower()
+        found = _indicator_matcher.present(kw)
 
-        if any(t in k for t in tech_indicators):
+        if found & _TECH_INDICATORS:
             categories["Technical Skills"].append(kw)
 
-        elif any(s in k for s in soft_indicators):
+        elif found & _SOFT_INDICATORS:
             categories["Soft Skills"].append(kw)
 
-        elif any(t in k for t in tool_indicators):
+        elif found & _TOOL_INDICATORS:
             categories["Tools & Platforms"].append(kw)
 
         else:
@@ -267,13 +593,11 @@ def categorize_keywords(keywords):
 
 # ---------------- COVERAGE ---------------- #
 
+@timed("ats.coverage")
 def analyze_coverage(resume_text, jd_text):
 
-    jd_terms = extract_all_terms(jd_text)
-    resume_terms = extract_all_terms(resume_text)
-
-    jd_norm = create_normalized_set(jd_terms)
-    resume_norm = create_normalized_set(resume_terms)
+    jd_norm = jd_profile(jd_text).terms_normalized
+    resume_norm = resume_profile(resume_text).terms_normalized
 
     covered = jd_norm.intersection(resume_norm)
     missing = jd_norm - resume_norm
@@ -291,6 +615,6 @@ def analyze_coverage(resume_text, jd_text):
         "covered_terms": covered_n,
         "missing_terms": len(missing),
         "coverage_percentage": coverage_pct,
-        "covered_list": list(covered)[:20],
-        "missing_list": list(missing)[:40],
+        "covered_list": sorted(covered)[:20],
+        "missing_list": sorted(missing)[:40],
     }
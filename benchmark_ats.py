@@ -0,0 +1,330 @@
+"""
+Micro-benchmarks for the ATS scoring functions.
+
+A seeded generator builds resumes and job descriptions of a given length
+from the skill taxonomy plus filler prose, so every run scores exactly
+the same documents. For each function and document size it reports
+latency percentiles, tracemalloc peak / retained memory and retained
+blocks, and can save the results as a baseline JSON or compare against
+one.
+
+    python benchmark_ats.py                          # default sizes
+    python benchmark_ats.py --save bench/base.json   # record a baseline
+    python benchmark_ats.py --compare bench/base.json --threshold 0.15
+
+Profile caches are cleared before every call (use --warm to keep them),
+so the numbers are for a cold resume/JD pair.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import ats_analyser
+from skill_taxonomy import get_taxonomy
+
+DEFAULT_SIZES = (200, 1000, 5000, 20000)
+DEFAULT_SEED = 42
+DEFAULT_REPEATS = 20
+DEFAULT_THRESHOLD = 0.10
+
+PERCENTILES = (50, 90, 99)
+
+
+# ---------------- SYNTHETIC CORPUS ---------------- #
+
+FILLER = (
+    "the a an and or of for with to in on at by from as team project "
+    "system service customer product business data process platform "
+    "developed designed built led managed improved reduced increased "
+    "delivered implemented owned migrated automated optimized supported "
+    "cross-functional stakeholders requirements production performance "
+    "reliability quality users features releases roadmap strategy "
+    "experience years strong ability excellent communication problem "
+    "solving collaborate environment fast-paced ownership impact"
+).split()
+
+RESUME_HEADERS = ("SUMMARY", "EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION")
+JD_HEADERS = ("About the Role", "Responsibilities", "Requirements", "Nice to Have")
+
+
+def _skill_pool():
+    """Skill spellings (canonical + variants) from the taxonomy, sorted"""
+    return sorted(get_taxonomy().index)
+
+
+def generate_document(kind, n_words, rng, skills):
+    """
+    One synthetic resume or JD of about n_words words.
+    Lines are 8-16 words; roughly one word in five is a skill, with some
+    written in upper case or with a version suffix like the real thing.
+    """
+    headers = RESUME_HEADERS if kind == "resume" else JD_HEADERS
+    lines = []
+    words = 0
+    section = 0
+
+    while words < n_words:
+        if words >= section * n_words / len(headers) and section < len(headers):
+            lines.append(headers[section])
+            section += 1
+
+        line = []
+        for _ in range(rng.randint(8, 16)):
+            if rng.random() < 0.2:
+                word = rng.choice(skills)
+                r = rng.random()
+                if r < 0.1:
+                    word = word.upper()
+                elif r < 0.15:
+                    word = f"{word}{rng.randint(2, 9)}"
+            else:
+                word = rng.choice(FILLER)
+            line.append(word)
+
+        prefix = "- " if kind == "resume" else "• "
+        lines.append(prefix + " ".join(line))
+        words += len(line)
+
+    return "\n".join(lines)
+
+
+def generate_pair(n_words, seed=DEFAULT_SEED):
+    """
+    (resume, jd) of n_words each. The two documents draw most of their
+    skills from a shared subset so the scores land in a realistic range.
+    """
+    rng = random.Random(f"{seed}:{n_words}")
+    skills = _skill_pool()
+
+    shared = rng.sample(skills, min(len(skills), 60))
+    resume_only = rng.sample(skills, min(len(skills), 40))
+    jd_only = rng.sample(skills, min(len(skills), 40))
+
+    resume = generate_document("resume", n_words, rng, shared + resume_only)
+    jd = generate_document("jd", n_words, rng, shared + jd_only)
+    return resume, jd
+
+
+# ---------------- BENCHMARKED FUNCTIONS ---------------- #
+
+def _missing_critical():
+    """Skipped if resume_generator can't be imported here"""
+    try:
+        from resume_generator import extract_missing_critical_keywords
+    except Exception as e:
+        print(f"Skipping extract_missing_critical_keywords: {e}")
+        return None
+    return lambda resume, jd, missing: extract_missing_critical_keywords(resume, jd)
+
+
+def benchmark_functions():
+    """name -> fn(resume, jd, missing_terms)"""
+    functions = {
+        "ats_score": lambda resume, jd, missing: ats_analyser.ats_score(resume, jd),
+        "analyze_coverage": lambda resume, jd, missing: ats_analyser.analyze_coverage(resume, jd),
+        "extract_all_terms": lambda resume, jd, missing: ats_analyser.extract_all_terms(resume),
+        "categorize_keywords": lambda resume, jd, missing: ats_analyser.categorize_keywords(missing),
+    }
+
+    missing_critical = _missing_critical()
+    if missing_critical is not None:
+        functions["extract_missing_critical_keywords"] = missing_critical
+
+    return functions
+
+
+def clear_caches():
+    ats_analyser._cached_profile.cache_clear()
+    ats_analyser._specificity.cache_clear()
+
+
+# ---------------- MEASUREMENT ---------------- #
+
+def percentile(sorted_values, p):
+    """Linear-interpolated percentile of an already sorted list"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * p / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def measure(fn, args, repeats, warm=False):
+    """Latency (ms) percentiles over repeats, then one traced call for memory"""
+    fn(*args)   # warm-up: imports, taxonomy load, regex compile
+
+    timings = []
+    for _ in range(repeats):
+        if not warm:
+            clear_caches()
+        gc.collect()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    if not warm:
+        clear_caches()
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+
+    result = fn(*args)
+
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+
+    stats = {f"p{p}_ms": round(percentile(timings, p), 3) for p in PERCENTILES}
+    stats.update({
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "min_ms": round(timings[0], 3),
+        "max_ms": round(timings[-1], 3),
+        "peak_kib": round((peak - base) / 1024, 1),
+        "retained_kib": round((current - base) / 1024, 1),
+        "retained_blocks": blocks,
+    })
+    return stats
+
+
+def run(sizes=DEFAULT_SIZES, repeats=DEFAULT_REPEATS, seed=DEFAULT_SEED,
+        functions=None, warm=False):
+    available = benchmark_functions()
+    names = functions or list(available)
+
+    results = {}
+    for n_words in sizes:
+        resume, jd = generate_pair(n_words, seed)
+        _, missing = ats_analyser.ats_score(resume, jd)
+
+        for name in names:
+            if name not in available:
+                continue
+            stats = measure(available[name], (resume, jd, missing), repeats, warm)
+            results.setdefault(name, {})[str(n_words)] = stats
+            print(
+                f"{name:<36} {n_words:>6}w  "
+                f"p50 {stats['p50_ms']:>9.2f}ms  p90 {stats['p90_ms']:>9.2f}ms  "
+                f"p99 {stats['p99_ms']:>9.2f}ms  peak {stats['peak_kib']:>9.1f}KiB"
+            )
+
+    return {
+        "meta": _run_meta(sizes, repeats, seed, warm),
+        "results": results,
+    }
+
+
+def _run_meta(sizes, repeats, seed, warm):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": list(sizes),
+        "repeats": repeats,
+        "seed": seed,
+        "warm": warm,
+        "taxonomy_version": get_taxonomy().version,
+    }
+
+
+# ---------------- BASELINES ---------------- #
+
+def save_baseline(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Baseline saved → {path}")
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD, metric="p50_ms"):
+    """
+    Print the change of each (function, size) against the baseline.
+    Returns the list of regressions (slower by more than threshold).
+    """
+    regressions = []
+    print(f"\nComparison on {metric} (baseline {baseline['meta'].get('commit')})")
+
+    for name, by_size in report["results"].items():
+        for size, stats in by_size.items():
+            old = baseline["results"].get(name, {}).get(size)
+            if not old or not old.get(metric):
+                continue
+
+            ratio = stats[metric] / old[metric]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  ⚠️ REGRESSION"
+                regressions.append((name, size, ratio))
+            elif ratio < 1 - threshold:
+                flag = "  faster"
+
+            mem = stats["peak_kib"] - old.get("peak_kib", 0)
+            print(
+                f"{name:<36} {size:>6}w  "
+                f"{old[metric]:>9.2f} → {stats[metric]:>9.2f}ms  "
+                f"x{ratio:5.2f}  peak {mem:+.1f}KiB{flag}"
+            )
+
+    return regressions
+
+
+# ---------------- CLI ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATS scoring micro-benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated document sizes in words")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--functions", help="comma-separated subset to run")
+    parser.add_argument("--warm", action="store_true",
+                        help="keep profile caches between calls")
+    parser.add_argument("--save", metavar="PATH", help="write results as baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative p50 slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    functions = args.functions.split(",") if args.functions else None
+
+    report = run(sizes, args.repeats, args.seed, functions, args.warm)
+
+    if args.save:
+        save_baseline(report, args.save)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Encoder backend benchmark: throughput and agreement with fp32.
+
+Encodes the same chunks with the reference backend (fp32 torch, model
+defaults) and each candidate, bypassing the embedding cache, and reports
+chunks/sec plus the cosine similarity between each candidate embedding
+and the reference one (mean / p5 / min). Chunks come from a text file
+(one per line) or seeded synthetic resumes split with utils.chunk_text,
+so they are as long as real RAG chunks.
+
+    python benchmark_encoder.py
+    python benchmark_encoder.py --chunks chunks.txt --threads 4
+    python benchmark_encoder.py --max-seq-length 128   # cost of truncating
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from encoder_backends import create_encoder
+from rag_engine import MODEL_NAME
+
+
+def synthetic_chunks(n, seed=42):
+    """
+    RAG-sized chunks of synthetic resumes / JDs (utils.chunk_text,
+    default 300-word chunks)
+    """
+    from benchmark_ats import generate_pair
+    from utils import chunk_text
+
+    chunks = []
+    size = 1000
+    while len(chunks) < n:
+        resume, jd = generate_pair(size, seed)
+        chunks.extend(chunk_text(resume) + chunk_text(jd))
+        size += 1
+    return chunks[:n]
+
+
+def throughput(encoder, chunks, repeats=3):
+    """(best chunks/sec, embeddings) after a warm-up batch"""
+    encoder.encode(chunks[:32])
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vecs = encoder.encode(chunks)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(chunks) / best, vecs
+
+
+def cosine_rows(a, b):
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return (a * b).sum(axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encoder backend benchmark")
+    parser.add_argument("--chunks", metavar="PATH", help="text file, one chunk per line")
+    parser.add_argument("--n", type=int, default=512, help="synthetic chunk count")
+    parser.add_argument("--backends", default="torch,torch-int8")
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--max-seq-length", type=int, help="default: the model's own limit")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.chunks:
+        with open(args.chunks, encoding="utf-8") as f:
+            chunks = [line.strip() for line in f if line.strip()]
+    else:
+        chunks = synthetic_chunks(args.n)
+
+    print(f"{len(chunks)} chunks, model {MODEL_NAME}\n")
+
+    reference = create_encoder(MODEL_NAME, "torch", threads=args.threads)
+    ref_rate, ref_vecs = throughput(reference, chunks, args.repeats)
+    print(f"{'backend':<30} {'chunks/s':>9} {'speedup':>8} {'cos mean':>9} {'cos p5':>8} {'cos min':>8}")
+    print(f"{'torch (reference)':<30} {ref_rate:>9.1f} {1.0:>8.2f} {1.0:>9.4f} {1.0:>8.4f} {1.0:>8.4f}")
+
+    for backend in args.backends.split(","):
+        encoder = create_encoder(
+            MODEL_NAME, backend,
+            threads=args.threads,
+            max_seq_length=args.max_seq_length
+        )
+        rate, vecs = throughput(encoder, chunks, args.repeats)
+        cos = cosine_rows(ref_vecs, vecs)
+        label = f"{encoder.name} (seq {encoder.max_seq_length or 'model'})"
+        print(
+            f"{label:<30} {rate:>9.1f} {rate / ref_rate:>8.2f} "
+            f"{cos.mean():>9.4f} {np.percentile(cos, 5):>8.4f} {cos.min():>8.4f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
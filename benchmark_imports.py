@@ -0,0 +1,161 @@
+"""
+Import-time benchmark.
+
+Each target is imported in a fresh interpreter (like a cold start) and
+timed; the report lists wall time, the slowest modules from
+`python -X importtime`, and whether any heavy ML / LLM module was pulled
+in. The "app" target runs exactly the module-level imports of app.py,
+which is what the first page render pays for.
+
+    python benchmark_imports.py
+    python benchmark_imports.py app rag_engine --repeats 5 --json imports.json
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_TARGETS = (
+    "app",
+    "ats_analyser",
+    "resume_parser",
+    "resume_generator",
+    "pdf_generator",
+    "rag_engine",
+)
+
+# Loading any of these at startup is a regression
+HEAVY_MODULES = (
+    "torch",
+    "sentence_transformers",
+    "transformers",
+    "faiss",
+    "google.generativeai",
+    "reportlab",
+)
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print("@@" + json.dumps({{
+    "seconds": elapsed,
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def app_imports(path=os.path.join(HERE, "app.py")):
+    """Source of the module-level import statements in app.py"""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+
+    tree = ast.parse(source)
+    return "\n".join(
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def _import_source(target):
+    return app_imports() if target == "app" else f"import {target}"
+
+
+def parse_importtime(stderr, top=8):
+    """Slowest (cumulative_ms, module) entries from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, rest = line.partition(":")
+        parts = [p.strip() for p in rest.split("|")]
+        if len(parts) != 3:
+            continue
+        rows.append((int(parts[1]) / 1000, parts[2].strip()))
+
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def measure(target, repeats=3):
+    """Cold import of one target, best wall time over repeats"""
+    probe = _PROBE.format(imports=_import_source(target), heavy=HEAVY_MODULES)
+    runs = []
+    slowest = []
+
+    for i in range(repeats):
+        cmd = [sys.executable]
+        if i == 0:
+            cmd += ["-X", "importtime"]
+        proc = subprocess.run(
+            cmd + ["-c", probe],
+            capture_output=True, text=True, cwd=HERE,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        )
+
+        result = None
+        for line in proc.stdout.splitlines():
+            if line.startswith("@@"):
+                result = json.loads(line[2:])
+        if result is None:
+            error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+            return {"target": target, "error": error}
+
+        if i == 0:
+            slowest = parse_importtime(proc.stderr)
+        else:
+            runs.append(result)
+
+    # The importtime run is slower; only use it when it's the only one
+    best = min(runs, key=lambda r: r["seconds"]) if runs else result
+
+    return {
+        "target": target,
+        "seconds": best["seconds"],
+        "modules": best["modules"],
+        "heavy": best["heavy"],
+        "slowest": slowest,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import-time benchmark")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for target in args.targets:
+        r = measure(target, args.repeats)
+        results.append(r)
+
+        if "error" in r:
+            print(f"{target:<20} ❌ {r['error']}")
+            continue
+
+        heavy = ", ".join(r["heavy"]) or "none"
+        print(f"{target:<20} {r['seconds'] * 1000:>9.1f} ms  {r['modules']:>5} modules  heavy: {heavy}")
+        for ms, module in r["slowest"][:5]:
+            print(f"{'':<22}{ms:>9.1f} ms  {module}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    app = next((r for r in results if r["target"] == "app"), None)
+    if app and app.get("heavy"):
+        print(f"\n⚠️ app startup imports heavy modules: {', '.join(app['heavy'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
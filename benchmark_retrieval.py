@@ -0,0 +1,110 @@
+"""
+Recall / memory / latency report for compressed vector storage.
+
+Builds the rag_engine index for a corpus with no compression, int8 scalar
+quantization (sq8) and product quantization (pq), and measures each with
+and without full-precision re-ranking against exact (flat) search:
+
+    recall@k      overlap with the exact top-k, averaged over queries
+    bytes/vec     serialized index size per vector (re-ranking also
+                  needs the 4*dim-byte vectors.f32 on disk, not in RAM)
+    ms/query      batched search time per query
+
+    python benchmark_retrieval.py --synthetic 200000
+    python benchmark_retrieval.py --chunks chunks.txt --metric cosine
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import rag_engine
+
+
+def synthetic_embeddings(n, dim=384, n_clusters=256, seed=0):
+    """Clustered unit vectors, roughly shaped like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n)
+    vecs = centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def recall_at_k(found, exact, k):
+    hits = sum(len(set(f[f >= 0]) & set(e[:k])) for f, e in zip(found, exact))
+    return hits / (len(exact) * k)
+
+
+def run_report(embeddings, queries, k=10, metric="cosine", index_type="auto",
+               rerank=rag_engine.RERANK_FACTOR):
+    import faiss
+
+    embeddings = rag_engine._prepare(embeddings, metric)
+    queries = rag_engine._prepare(queries, metric)
+    n, dim = embeddings.shape
+
+    exact_index = rag_engine.make_index(dim, n, metric, "flat")
+    rag_engine.fill_index(exact_index, embeddings)
+    _, exact = rag_engine.search_index(queries, exact_index, k, metric)
+
+    rows = []
+    for compression in rag_engine.COMPRESSIONS:
+        index = rag_engine.make_index(dim, n, metric, index_type, compression)
+        rag_engine.fill_index(index, embeddings)
+        size = faiss.serialize_index(index).nbytes / n
+
+        for vectors in ((None, embeddings) if compression else (None,)):
+            start = time.perf_counter()
+            _, found = rag_engine.search_index(queries, index, k, metric, vectors, rerank)
+            elapsed = time.perf_counter() - start
+
+            rows.append({
+                "index": type(index).__name__,
+                "compression": compression or "none",
+                "rerank": vectors is not None,
+                "recall": recall_at_k(found, exact, k),
+                "bytes_per_vector": size,
+                "ms_per_query": elapsed * 1000 / len(queries),
+            })
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compressed index recall report")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=int, metavar="N", help="N synthetic vectors")
+    source.add_argument("--chunks", metavar="PATH", help="text file, one chunk per line")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", default="cosine", choices=rag_engine.METRICS)
+    parser.add_argument("--index-type", default="auto")
+    parser.add_argument("--rerank", type=int, default=rag_engine.RERANK_FACTOR)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        vecs = synthetic_embeddings(args.synthetic + args.queries)
+    else:
+        with open(args.chunks, encoding="utf-8") as f:
+            chunks = [line.strip() for line in f if line.strip()]
+        vecs = rag_engine.encode(chunks)
+
+    # Held-out rows are the queries
+    rng = np.random.default_rng(1)
+    order = rng.permutation(len(vecs))
+    queries, corpus = vecs[order[:args.queries]], vecs[order[args.queries:]]
+
+    print(f"{len(corpus)} vectors x {corpus.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+    print(f"{'index':<28} {'storage':<8} {'rerank':<7} {'recall@k':>9} {'bytes/vec':>10} {'ms/query':>9}")
+
+    for r in run_report(corpus, queries, args.k, args.metric, args.index_type, args.rerank):
+        print(
+            f"{r['index']:<28} {r['compression']:<8} {'yes' if r['rerank'] else 'no':<7} "
+            f"{r['recall']:>9.3f} {r['bytes_per_vector']:>10.1f} {r['ms_per_query']:>9.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
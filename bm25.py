@@ -0,0 +1,157 @@
+"""
+BM25 sparse index over text chunks, stored as numpy postings.
+
+Tokens come from the shared tokenizer, so "C++", "node.js" and "CI/CD"
+stay whole, and are mapped through the skill taxonomy so "k8s" and
+"kubernetes" meet. Postings are CSR arrays (offsets / doc ids / term
+frequencies); a query gathers its terms' slices and accumulates scores
+with one np.bincount, so scoring is vectorized end to end.
+
+On-disk layout (save / load, memory-mappable):
+    vocab.json  term list (position = term id) + k1, b
+    offsets.npy int64 (V + 1)     doc_ids.npy int32     tfs.npy float32
+    doc_len.npy float32 (N)       idf.npy float32 (V)
+"""
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from skill_taxonomy import get_taxonomy
+from tokenizer import tokenize
+
+K1 = 1.5
+B = 0.75
+
+
+def analyze(text):
+    """BM25 terms of a text: lowercased tokens, taxonomy-normalized"""
+    normalize = get_taxonomy().normalize
+    return [normalize(t) for t in tokenize(text).lower]
+
+
+class BM25Index:
+
+    def __init__(self, vocab, offsets, doc_ids, tfs, doc_len, idf, k1=K1, b=B):
+        self.vocab = vocab
+        self.term_ids = {t: i for i, t in enumerate(vocab)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.idf = idf
+        self.k1 = k1
+        self.b = b
+        self._norm = k1 * (1 - b + b * doc_len / max(float(doc_len.mean()), 1e-9)) if len(doc_len) else doc_len
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    # ---------------- BUILD ---------------- #
+
+    @classmethod
+    def build(cls, texts, k1=K1, b=B):
+        vocab = {}
+        term_col, doc_col, tf_col = [], [], []
+        doc_len = []
+
+        for doc_id, text in enumerate(texts):
+            terms = analyze(text)
+            doc_len.append(len(terms))
+            for term, tf in Counter(terms).items():
+                term_col.append(vocab.setdefault(term, len(vocab)))
+                doc_col.append(doc_id)
+                tf_col.append(tf)
+
+        term_col = np.asarray(term_col, dtype=np.int64)
+        order = np.argsort(term_col, kind="stable")   # keeps doc order within a term
+
+        df = np.bincount(term_col, minlength=len(vocab))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+
+        n_docs = len(doc_len)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        return cls(
+            list(vocab),
+            offsets,
+            np.asarray(doc_col, dtype=np.int32)[order],
+            np.asarray(tf_col, dtype=np.float32)[order],
+            np.asarray(doc_len, dtype=np.float32),
+            idf,
+            k1,
+            b
+        )
+
+    # ---------------- SEARCH ---------------- #
+
+    def scores(self, query):
+        """BM25 score of every document for a query (float32, length N)"""
+        out = np.zeros(len(self.doc_len), dtype=np.float32)
+        ids = [self.term_ids[t] for t in set(analyze(query)) if t in self.term_ids]
+        if not ids:
+            return out
+
+        starts = self.offsets[ids]
+        ends = self.offsets[np.asarray(ids) + 1]
+        lengths = ends - starts
+
+        # Gather all postings slices at once
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        docs = self.doc_ids[positions]
+        tf = self.tfs[positions]
+        idf = np.repeat(self.idf[ids], lengths)
+
+        contrib = idf * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        return np.bincount(docs, weights=contrib, minlength=len(self.doc_len)).astype(np.float32)
+
+    def search(self, query, k=10):
+        """(scores, doc ids) of the top-k matching documents, best first"""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = np.lexsort((matched, -scores[matched]))
+        top = matched[order]
+        return scores[top], top
+
+    def search_many(self, queries, k=10):
+        """Padded (n_queries, k) scores / ids like faiss; -1 ids for no hit"""
+        out_scores = np.zeros((len(queries), k), dtype=np.float32)
+        out_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, query in enumerate(queries):
+            scores, ids = self.search(query, k)
+            out_scores[row, :len(ids)] = scores
+            out_ids[row, :len(ids)] = ids
+        return out_scores, out_ids
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    ARRAYS = ("offsets", "doc_ids", "tfs", "doc_len", "idf")
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            tmp = os.path.join(path, name + ".npy.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, getattr(self, name))
+            os.replace(tmp, os.path.join(path, name + ".npy"))
+
+        # Written last: its presence marks a complete index
+        tmp = os.path.join(path, "vocab.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"vocab": self.vocab, "k1": self.k1, "b": self.b}, f)
+        os.replace(tmp, os.path.join(path, "vocab.json"))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode)
+            for name in cls.ARRAYS
+        }
+        return cls(meta["vocab"], k1=meta["k1"], b=meta["b"], **arrays)
@@ -0,0 +1,3 @@
+# test_api.py and test_setup.py are manual setup scripts (they call the
+# Gemini API and print diagnostics), not pytest modules
+collect_ignore = ["test_api.py", "test_setup.py"]
@@ -0,0 +1,429 @@
+"""
+Persistent, content-addressed embedding cache.
+
+Embeddings are keyed by a hash of (model name, text), so unchanged resume
+chunks, JD sentences and repeated queries are encoded once and then read
+back from disk across sessions and restarts.
+
+On-disk layout (EMBEDDING_CACHE_DIR, default data/embedding_cache), one
+directory per model:
+    vectors.f32   raw float32 (capacity, dim) array, memory-mapped
+    keys.bin      16-byte key stored in each slot, memory-mapped
+    index.npy     (key, slot, last_used) rows for the live entries
+    meta.json     {"model", "dim", "capacity", "tick", "version"}
+    writer.lock   held (flock) by the one process allowed to write
+    data.lock     exclusive while slots are written, shared while read
+
+The cache holds at most EMBEDDING_CACHE_MAX entries; when full, the least
+recently used entries are evicted and their slots reused.
+
+Several Streamlit workers may share a directory. The first process to
+take writer.lock stores new vectors; every other process opens the cache
+read-only: it serves hits from the writer's files (re-reading index.npy
+when it changes), encodes misses without storing them, and takes over as
+writer once the lock is free. Each hit is checked against keys.bin under
+data.lock, so a slot the writer has evicted and reused is treated as a
+miss, never returned as another text's vector.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process writes (single-worker use)
+    fcntl = None
+
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "data",
+    "embedding_cache"
+)
+
+DEFAULT_MAX_ENTRIES = 100_000
+FORMAT_VERSION = 2
+
+INDEX_DTYPE = np.dtype([("key", "V16"), ("slot", "<i8"), ("tick", "<i8")])
+KEY_DTYPE = np.dtype("V16")
+
+
+def text_key(model_name, text):
+    """16-byte content hash of (model, text)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.digest()
+
+
+class EmbeddingCache:
+
+    def __init__(self, model_name, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = os.path.join(
+            path or DEFAULT_DIR,
+            re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        )
+
+        self.dim = None
+        self.capacity = 0
+        self._vectors = None
+        self._keys = None      # slot -> key, on disk
+        self._slots = {}       # key -> slot
+        self._ticks = {}       # key -> last use
+        self._tick = 0
+        self._free = []
+        self._lock = threading.Lock()
+
+        self.writer = False
+        self._writer_file = None
+        self._data_file = None
+        self._index_stamp = None
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        self._try_become_writer()
+        self._load()
+
+    def __len__(self):
+        return len(self._slots)
+
+    # ---------------- LOOKUP ---------------- #
+
+    def encode(self, texts, encode_fn):
+        """
+        float32 (n, dim) embeddings for texts. Cached rows are read from
+        disk; the rest are computed with encode_fn(list_of_texts) in one
+        call, stored (by the writer process), and returned in input order.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        keys = [text_key(self.model_name, t) for t in texts]
+
+        with self._lock:
+            if not self.writer and any(k not in self._slots for k in keys):
+                self._refresh()
+
+            # Hits are resolved and copied in this one critical section:
+            # once the lock is released their slots may be evicted and reused
+            found = self._read(set(keys))
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in found:
+                    missing.setdefault(key, text)
+
+            self.hits += len(texts) - sum(1 for k in keys if k in missing)
+            self.misses += len(missing)
+
+        if missing:
+            new_vecs = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            if new_vecs.ndim == 1:
+                new_vecs = new_vecs.reshape(1, -1)
+            computed = dict(zip(missing, new_vecs))
+            found.update(computed)
+
+            if self.writer:
+                with self._lock:
+                    self._store(computed, protect=set(keys))
+
+        return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+    def _read(self, keys):
+        """{key: vector copy} for cached keys (caller holds self._lock)"""
+        found = {}
+        if self.dim is None:
+            return found
+
+        with self._data_lock(exclusive=False):
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is None:
+                    continue
+                if slot >= self.capacity or self._keys[slot].tobytes() != key:
+                    # Slot reused by the writer since our index was read
+                    del self._slots[key]
+                    continue
+                found[key] = np.array(self._vectors[slot])
+                self._tick += 1
+                self._ticks[key] = self._tick
+        return found
+
+    # ---------------- STORE / EVICT ---------------- #
+
+    def _store(self, computed, protect=()):
+        """Write new vectors; evicts LRU entries (never `protect`) if full"""
+        computed = {k: v for k, v in computed.items() if k not in self._slots}
+        if not computed:
+            return
+        if self.dim is None:
+            self._open(next(iter(computed.values())).shape[0])
+
+        if len(computed) > self.max_entries:
+            computed = dict(list(computed.items())[:self.max_entries])
+
+        overflow = len(self._slots) + len(computed) - self.max_entries
+        if overflow > 0:
+            self._evict(overflow, protect)
+            # Evicted slots are about to be overwritten: persist the index
+            # without them first so a crash can't map a key to a wrong vector.
+            self._save_index()
+
+        needed = len(computed) - len(self._free)
+        if needed > 0:
+            self._grow(self.capacity + needed)
+
+        with self._data_lock(exclusive=True):
+            for key, vec in computed.items():
+                slot = self._free.pop()
+                self._vectors[slot] = vec
+                self._keys[slot] = np.void(key)
+                self._slots[key] = slot
+                self._tick += 1
+                self._ticks[key] = self._tick
+
+            self._vectors.flush()
+            self._keys.flush()
+        self._save_index()
+
+    def _evict(self, n, protect):
+        candidates = [k for k in self._slots if k not in protect]
+        if n < len(candidates):
+            ticks = np.fromiter((self._ticks.get(k, 0) for k in candidates), dtype=np.int64)
+            oldest = np.argpartition(ticks, n - 1)[:n]
+            candidates = [candidates[i] for i in oldest]
+
+        for key in candidates[:n]:
+            self._free.append(self._slots.pop(key))
+            self._ticks.pop(key, None)
+
+    def _grow(self, min_capacity):
+        capacity = min(
+            max(min_capacity, 2 * self.capacity, 1024),
+            max(self.max_entries, min_capacity)
+        )
+        # Files only ever grow, so readers' existing maps stay valid
+        with self._data_lock(exclusive=True):
+            with open(self._file("vectors.f32"), "ab") as f:
+                f.truncate(capacity * self.dim * 4)
+            with open(self._file("keys.bin"), "ab") as f:
+                f.truncate(capacity * KEY_DTYPE.itemsize)
+
+        # Hand out low slots first
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+        self._map()
+
+    # ---------------- PROCESS LOCKS ---------------- #
+
+    def _try_become_writer(self):
+        if self.writer:
+            return True
+        if fcntl is None:
+            self.writer = True
+            return True
+
+        f = open(self._file("writer.lock"), "a+")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._writer_file = f   # held until the process exits
+        self.writer = True
+        return True
+
+    @contextmanager
+    def _data_lock(self, exclusive):
+        # Threads of this process are already serialized by self._lock
+        if fcntl is None:
+            yield
+            return
+        if self._data_file is None:
+            self._data_file = open(self._file("data.lock"), "a+")
+        fd = self._data_file.fileno()
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Reader: pick up the writer's new entries, or take over writing"""
+        if self._try_become_writer() or self._stamp() != self._index_stamp:
+            self._reset()
+            self._load()
+
+    def _stamp(self):
+        try:
+            st = os.stat(self._file("index.npy"))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _map(self):
+        mode = "r+" if self.writer else "r"
+        self._vectors = np.memmap(
+            self._file("vectors.f32"),
+            dtype=np.float32,
+            mode=mode,
+            shape=(self.capacity, self.dim)
+        )
+        self._keys = np.memmap(
+            self._file("keys.bin"),
+            dtype=KEY_DTYPE,
+            mode=mode,
+            shape=(self.capacity,)
+        )
+
+    def _open(self, dim):
+        self.dim = int(dim)
+        self.capacity = 0
+        with self._data_lock(exclusive=True):
+            open(self._file("vectors.f32"), "wb").close()
+            open(self._file("keys.bin"), "wb").close()
+
+    def _reset(self):
+        self.dim = None
+        self.capacity = 0
+        self._vectors = self._keys = None
+        self._slots.clear()
+        self._ticks.clear()
+        self._free = []
+
+    def _load(self):
+        self._index_stamp = self._stamp()
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            index = np.load(self._file("index.npy"))
+            vec_bytes = os.path.getsize(self._file("vectors.f32"))
+            key_bytes = os.path.getsize(self._file("keys.bin"))
+        except (OSError, ValueError):
+            return
+
+        if meta.get("version") != FORMAT_VERSION or meta.get("model") != self.model_name:
+            print(f"Ignoring embedding cache at {self.path}: format or model mismatch")
+            return
+
+        dim = meta["dim"]
+        if self.writer:
+            capacity = meta["capacity"]
+            if min(vec_bytes // (dim * 4), key_bytes // KEY_DTYPE.itemsize) < capacity:
+                print(f"Ignoring truncated embedding cache at {self.path}")
+                return
+        else:
+            # index.npy and meta.json are replaced separately: map what exists
+            capacity = min(vec_bytes // (dim * 4), key_bytes // KEY_DTYPE.itemsize)
+
+        self.dim = dim
+        self.capacity = capacity
+        self._tick = max(self._tick, meta["tick"])
+        self._map()
+
+        with self._data_lock(exclusive=False):
+            slot_keys = np.array(self._keys)
+        for key, slot, tick in index.tolist():
+            # Only trust entries whose slot still holds their key
+            if slot < capacity and slot_keys[slot].tobytes() == key:
+                self._slots[key] = slot
+                self._ticks[key] = tick
+
+        used = set(self._slots.values())
+        self._free = [s for s in range(self.capacity - 1, -1, -1) if s not in used]
+
+        # A lowered cap applies on the next write
+        if self.writer and len(self._slots) > self.max_entries:
+            self._evict(len(self._slots) - self.max_entries, ())
+            self._save_index()
+
+    def _save_index(self):
+        index = np.empty(len(self._slots), dtype=INDEX_DTYPE)
+        for i, (key, slot) in enumerate(self._slots.items()):
+            index[i] = (key, slot, self._ticks.get(key, 0))
+
+        def replace(name, write):
+            tmp = self._file(name + ".tmp")
+            write(tmp)
+            os.replace(tmp, self._file(name))
+
+        def write_index(tmp):
+            with open(tmp, "wb") as f:
+                np.save(f, index)
+
+        def write_meta(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": FORMAT_VERSION,
+                    "model": self.model_name,
+                    "dim": self.dim,
+                    "capacity": self.capacity,
+                    "tick": self._tick,
+                }, f)
+
+        replace("index.npy", write_index)
+        replace("meta.json", write_meta)
+
+    def flush(self):
+        """Persist recency information (vectors are written as they arrive)"""
+        with self._lock:
+            if self.writer and self.dim is not None:
+                self._save_index()
+
+    def close(self):
+        """Release the writer role (another process may take it over)"""
+        with self._lock:
+            if self.writer and self.dim is not None:
+                self._save_index()
+            for f in (self._writer_file, self._data_file):
+                if f is not None:
+                    f.close()
+            self._writer_file = self._data_file = None
+            self.writer = False
+            self._reset()
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._ticks.clear()
+            self._free = list(range(self.capacity - 1, -1, -1))
+            if self.writer and self.dim is not None:
+                self._save_index()
+
+
+# ---------------- SHARED INSTANCES ---------------- #
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name):
+    """
+    Process-wide cache for a model, or None when disabled
+    (EMBEDDING_CACHE=0).
+    """
+    if os.getenv("EMBEDDING_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+
+    with _caches_lock:
+        cache = _caches.get(model_name)
+        if cache is None:
+            cache = _caches[model_name] = EmbeddingCache(
+                model_name,
+                path=os.getenv("EMBEDDING_CACHE_DIR") or DEFAULT_DIR,
+                max_entries=int(os.getenv("EMBEDDING_CACHE_MAX", DEFAULT_MAX_ENTRIES))
+            )
+    return cache
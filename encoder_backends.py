@@ -0,0 +1,126 @@
+"""
+Pluggable sentence-encoder backends for rag_engine.
+
+    torch       fp32 SentenceTransformer (the original behaviour)
+    torch-int8  same model with its Linear layers dynamically quantized
+                to int8 - typically 2-3x faster on CPU-only hosts
+
+Selected with ENCODER_BACKEND; ENCODER_THREADS sets torch's intra-op
+thread count. Both backends keep the model's own token limit (256 word
+pieces for MiniLM; utils.chunk_text's 300-word chunks already reach it),
+so int8 changes precision, not how much of each chunk is read.
+ENCODER_MAX_SEQ_LENGTH lowers the limit explicitly, trading truncation
+for speed; benchmark_encoder.py shows the cost in cosine agreement.
+With ENCODER_SOCKET set, the default backend is "remote": vectors come
+from a shared encoder_server process instead of a per-worker model.
+Register other backends with register_backend(name, factory).
+"""
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 64
+
+
+class TorchEncoder:
+    """SentenceTransformer on CPU, optionally int8 dynamic-quantized"""
+
+    def __init__(self, model_name, quantize=False, threads=None,
+                 max_seq_length=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.threads = threads
+        self.max_seq_length = max_seq_length   # None: the model's own limit
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return "torch-int8" if self.quantize else "torch"
+
+    @property
+    def cache_key(self):
+        """Embedding-cache namespace; differs whenever outputs can differ"""
+        key = self.model_name
+        if self.quantize:
+            key += f"+{self.name}"
+        if self.max_seq_length:
+            key += f"+seq{self.max_seq_length}"
+        return key
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def _load(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+
+        model = SentenceTransformer(self.model_name, device="cpu")
+        if self.max_seq_length:
+            model.max_seq_length = self.max_seq_length
+
+        if self.quantize:
+            engines = torch.backends.quantized.supported_engines
+            if "fbgemm" not in engines and "qnnpack" in engines:
+                torch.backends.quantized.engine = "qnnpack"   # ARM hosts
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        model.eval()
+        return model
+
+    def encode(self, texts):
+        vecs = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vecs, dtype=np.float32)
+
+
+# ---------------- REGISTRY ---------------- #
+
+BACKENDS = {
+    "torch": lambda model_name, **kw: TorchEncoder(model_name, **kw),
+    "torch-int8": lambda model_name, **kw: TorchEncoder(model_name, quantize=True, **kw),
+    "remote": lambda model_name, **kw: _remote_encoder(),
+}
+
+
+def _remote_encoder():
+    # The server picks the model / backend; this side only needs the socket
+    from encoder_server import RemoteEncoder
+    return RemoteEncoder()
+
+
+def register_backend(name, factory):
+    """factory(model_name, threads=..., max_seq_length=...) -> encoder"""
+    BACKENDS[name] = factory
+
+
+def create_encoder(model_name, backend=None, threads=None, max_seq_length=None):
+    """Encoder from arguments, falling back to the ENCODER_* env settings"""
+    backend = (
+        backend
+        or os.getenv("ENCODER_BACKEND")
+        or ("remote" if os.getenv("ENCODER_SOCKET") else "torch")
+    )
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}; choose from {sorted(BACKENDS)}")
+
+    threads = threads or int(os.getenv("ENCODER_THREADS") or 0) or None
+    max_seq_length = max_seq_length or int(os.getenv("ENCODER_MAX_SEQ_LENGTH") or 0) or None
+
+    return BACKENDS[backend](model_name, threads=threads, max_seq_length=max_seq_length)
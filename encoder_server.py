@@ -0,0 +1,295 @@
+"""
+Shared encoder sidecar.
+
+One process holds the sentence-transformer and serves every Streamlit
+worker over a Unix socket, so torch and MiniLM are loaded once per host
+instead of once per worker. Requests that arrive within WINDOW_MS of each
+other are coalesced into one model.encode micro-batch.
+
+    python encoder_server.py --socket /tmp/ats-encoder.sock
+    ENCODER_SOCKET=/tmp/ats-encoder.sock streamlit run app.py
+
+With ENCODER_SOCKET set, rag_engine encodes through RemoteEncoder
+(encoder_backends picks it automatically). The embedding cache lives on
+the server side only: the server is its single writer, and workers do
+not open a cache of their own.
+
+Wire format, both directions: 4-byte big-endian header length, a JSON
+header, then header["nbytes"] bytes of payload (float32 vectors in
+responses).
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_SOCKET = "/tmp/ats-encoder.sock"
+WINDOW_MS = 5
+MAX_BATCH = 128
+
+_LEN = struct.Struct(">I")
+
+
+# ---------------- FRAMING ---------------- #
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("encoder socket closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def send_frame(sock, header, payload=b""):
+    header = dict(header, nbytes=len(payload))
+    data = json.dumps(header).encode("utf-8")
+    sock.sendall(_LEN.pack(len(data)) + data + payload)
+
+
+def recv_frame(sock):
+    (length,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    header = json.loads(_recv_exact(sock, length))
+    payload = _recv_exact(sock, header["nbytes"]) if header["nbytes"] else b""
+    return header, payload
+
+
+# ---------------- MICRO-BATCHING ---------------- #
+
+class _Pending:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects encode requests from many connections; a single worker
+    thread encodes whatever arrived within window_ms (up to max_batch
+    texts) in one call and hands each request its rows back.
+    """
+
+    def __init__(self, encoder, window_ms=WINDOW_MS, max_batch=MAX_BATCH, cache=None):
+        self.encoder = encoder
+        self.cache = cache
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self.batches = 0
+        self.requests = 0
+        threading.Thread(target=self._run, name="encoder-batcher", daemon=True).start()
+
+    def encode(self, texts):
+        pending = _Pending(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.window
+
+            while size < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(pending)
+                size += len(pending.texts)
+
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch):
+        texts = [t for pending in batch for t in pending.texts]
+        try:
+            if self.cache is not None:
+                vecs = self.cache.encode(texts, self.encoder.encode)
+            else:
+                vecs = np.asarray(self.encoder.encode(texts), dtype=np.float32)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+                pending.done.set()
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        start = 0
+        for pending in batch:
+            end = start + len(pending.texts)
+            pending.result = vecs[start:end]
+            pending.done.set()
+            start = end
+
+
+# ---------------- SERVER ---------------- #
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                header, _ = recv_frame(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            try:
+                if header.get("op") == "info":
+                    send_frame(self.request, {
+                        "name": server.encoder.name,
+                        "cache_key": server.encoder.cache_key,
+                        "batches": server.batcher.batches,
+                        "requests": server.batcher.requests,
+                        "cached": server.batcher.cache is not None,
+                    })
+                    continue
+
+                vecs = server.batcher.encode(header["texts"])
+                send_frame(self.request, {"shape": list(vecs.shape)}, vecs.tobytes())
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                send_frame(self.request, {"error": f"{type(e).__name__}: {e}"})
+
+
+class EncoderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, encoder, window_ms=WINDOW_MS, max_batch=MAX_BATCH,
+                 cache=None):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, _Handler)
+        self.encoder = encoder
+        self.batcher = MicroBatcher(encoder, window_ms, max_batch, cache)
+
+
+# ---------------- CLIENT ---------------- #
+
+class RemoteEncoder:
+    """Encoder backend that forwards to an encoder_server over its socket"""
+
+    # The server runs the embedding cache; rag_engine must not add a
+    # client-side one (every worker would write the same directory)
+    caches_remotely = True
+
+    def __init__(self, socket_path=None, timeout=60.0):
+        self.socket_path = socket_path or os.getenv("ENCODER_SOCKET") or DEFAULT_SOCKET
+        self.timeout = timeout
+        self._local = threading.local()
+        self._info = None
+
+    def _sock(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                sock.close()
+                raise ConnectionError(
+                    f"Encoder server not reachable at {self.socket_path} "
+                    f"(start it with: python encoder_server.py): {e}"
+                ) from e
+            self._local.sock = sock
+        return sock
+
+    def _call(self, header):
+        # One reconnect covers a server restart between requests
+        for attempt in (0, 1):
+            try:
+                sock = self._sock()
+                send_frame(sock, header)
+                return recv_frame(sock)
+            except (ConnectionError, OSError):
+                sock = getattr(self._local, "sock", None)
+                if sock is not None:
+                    sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise
+
+    def info(self):
+        if self._info is None:
+            self._info, _ = self._call({"op": "info"})
+        return self._info
+
+    @property
+    def name(self):
+        return f"remote:{self.info()['name']}"
+
+    @property
+    def cache_key(self):
+        # Identifies the server's vectors (the cache itself is server-side)
+        return self.info()["cache_key"]
+
+    @property
+    def model(self):
+        raise RuntimeError("The encoder model lives in the encoder server process")
+
+    def encode(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        header, payload = self._call({"op": "encode", "texts": texts})
+        if "error" in header:
+            raise RuntimeError(f"Encoder server error: {header['error']}")
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+
+
+# ---------------- CLI ---------------- #
+
+def main(argv=None):
+    from embedding_cache import get_embedding_cache
+    from encoder_backends import create_encoder
+    from rag_engine import MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="Shared sentence-encoder server")
+    parser.add_argument("--socket", default=os.getenv("ENCODER_SOCKET") or DEFAULT_SOCKET)
+    parser.add_argument("--backend", default=os.getenv("ENCODER_SERVER_BACKEND") or "torch")
+    parser.add_argument("--window-ms", type=float, default=WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args(argv)
+
+    encoder = create_encoder(MODEL_NAME, args.backend)
+    encoder.encode(["warm up"])   # load the model before accepting requests
+
+    cache = get_embedding_cache(encoder.cache_key)
+    server = EncoderServer(args.socket, encoder, args.window_ms, args.max_batch, cache)
+    print(f"✅ Encoder server ({encoder.name}) listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Corpus-level IDF model for the TF-IDF similarity component.
+
+Fitting TfidfVectorizer on a [resume, jd] pair gives near-meaningless IDF
+weights. This model is built offline from a corpus of JDs and resumes,
+saved as memory-mappable arrays, loaded once per process and updated
+incrementally as new JDs arrive. Scoring becomes a lookup + dot product.
+
+On-disk layout (IDF_MODEL_DIR, default data/idf):
+    vocab.txt   one unigram/bigram per line, append-only (line = column)
+    df.npy      int64 document frequency per term
+    idf.npy     float64 smooth idf: ln((1 + n_docs) / (1 + df)) + 1
+    meta.json   {"n_docs": ..., "n_terms": ..., "version": ...}
+"""
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+from tokenizer import tokenize
+
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "data",
+    "idf"
+)
+
+FORMAT_VERSION = 1
+
+
+def _doc_terms(doc):
+    """Distinct TF-IDF features of a document (text or profile)"""
+    from ats_analyser import ngram_counts
+
+    ngrams = getattr(doc, "ngrams", None)
+    if ngrams is None:
+        ngrams = ngram_counts(tokenize(doc).lower)
+    return ngrams.keys()
+
+
+# ---------------- MODEL ---------------- #
+
+class IDFModel:
+
+    def __init__(self, vocab=None, df=None, n_docs=0):
+        self.vocab = list(vocab or [])
+        self.index = {t: i for i, t in enumerate(self.vocab)}
+        self.df = np.asarray(df if df is not None else [], dtype=np.int64)
+        self.n_docs = n_docs
+        self.idf = self._compute_idf()
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def _compute_idf(self):
+        return np.log((1 + self.n_docs) / (1 + self.df)) + 1
+
+    @property
+    def unseen_idf(self):
+        """idf of a term no corpus document contains"""
+        return np.log(1 + self.n_docs) + 1
+
+    # ---------------- BUILD / UPDATE ---------------- #
+
+    @classmethod
+    def from_documents(cls, docs):
+        model = cls()
+        model.update(docs)
+        return model
+
+    def update(self, docs):
+        """Add documents (texts or profiles) to the corpus statistics"""
+        increments = Counter()
+        n_docs = self.n_docs
+
+        for doc in docs:
+            n_docs += 1
+            for term in _doc_terms(doc):
+                i = self.index.get(term)
+                if i is None:
+                    i = self.index[term] = len(self.vocab)
+                    self.vocab.append(term)
+                increments[i] += 1
+
+        df = np.zeros(len(self.vocab), dtype=np.int64)
+        df[:len(self.df)] = self.df
+        if increments:
+            ids = np.fromiter(increments.keys(), dtype=np.int64, count=len(increments))
+            df[ids] += np.fromiter(increments.values(), dtype=np.int64, count=len(increments))
+
+        self.df = df
+        self.n_docs = n_docs
+        self.idf = self._compute_idf()
+
+    # ---------------- LOOKUP ---------------- #
+
+    def idf_of(self, terms):
+        """idf vector for a sequence of terms (unseen terms get unseen_idf)"""
+        ids = np.fromiter(
+            (self.index.get(t, -1) for t in terms),
+            dtype=np.int64,
+            count=len(terms)
+        )
+        known = ids >= 0
+        out = np.full(len(ids), self.unseen_idf)
+        out[known] = self.idf[ids[known]]
+        return out
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def save(self, path=DEFAULT_DIR):
+        """
+        Write the model. vocab.txt is append-only and meta.json is written
+        last, so a concurrent reader never sees arrays shorter than meta.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        def replace(name, write):
+            tmp = os.path.join(path, name + ".tmp")
+            write(tmp)
+            os.replace(tmp, os.path.join(path, name))
+
+        def write_vocab(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(t + "\n" for t in self.vocab)
+
+        def write_array(array):
+            def write(tmp):
+                with open(tmp, "wb") as f:
+                    np.save(f, array)
+            return write
+
+        def write_meta(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": FORMAT_VERSION,
+                    "n_docs": self.n_docs,
+                    "n_terms": len(self.vocab),
+                }, f)
+
+        replace("vocab.txt", write_vocab)
+        replace("df.npy", write_array(self.df))
+        replace("idf.npy", write_array(self.idf))
+        replace("meta.json", write_meta)
+
+    @classmethod
+    def load(cls, path=DEFAULT_DIR, mmap=True):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        n_terms = meta["n_terms"]
+
+        with open(os.path.join(path, "vocab.txt"), encoding="utf-8") as f:
+            vocab = [line.rstrip("\n") for _, line in zip(range(n_terms), f)]
+
+        mode = "r" if mmap else None
+        model = cls.__new__(cls)
+        model.vocab = vocab
+        model.index = {t: i for i, t in enumerate(vocab)}
+        model.df = np.load(os.path.join(path, "df.npy"), mmap_mode=mode)[:n_terms]
+        model.idf = np.load(os.path.join(path, "idf.npy"), mmap_mode=mode)[:n_terms]
+        model.n_docs = meta["n_docs"]
+        return model
+
+
+# ---------------- SHARED INSTANCE ---------------- #
+
+_lock = threading.Lock()
+_model = None
+_loaded = False
+
+
+def get_idf_model():
+    """
+    Process-wide corpus IDF model, loaded once from IDF_MODEL_DIR.
+    Returns None when no model has been built.
+    """
+    global _model, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                path = os.getenv("IDF_MODEL_DIR") or DEFAULT_DIR
+                if os.path.exists(os.path.join(path, "meta.json")):
+                    _model = IDFModel.load(path)
+                    print(f"Loaded IDF model: {len(_model)} terms, {_model.n_docs} docs")
+                _loaded = True
+    return _model
+
+
+def set_idf_model(model):
+    """Replace the process-wide model (e.g. after an incremental update)"""
+    global _model, _loaded
+    with _lock:
+        _model = model
+        _loaded = True
+
+
+# ---------------- CLI ---------------- #
+
+def _iter_corpus(paths):
+    """Texts from .txt files, .jsonl files ("text" field) and directories"""
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _, files in os.walk(p):
+                yield from _iter_corpus(
+                    os.path.join(root, name) for name in sorted(files)
+                )
+        elif p.endswith(".jsonl"):
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)["text"]
+        elif p.endswith(".txt"):
+            with open(p, encoding="utf-8", errors="ignore") as f:
+                yield f.read()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 4 or sys.argv[1] not in ("build", "update"):
+        print("Usage: python idf_model.py build|update <model_dir> <corpus paths...>")
+        sys.exit(1)
+
+    command, model_dir, corpus = sys.argv[1], sys.argv[2], sys.argv[3:]
+
+    if command == "build":
+        model = IDFModel.from_documents(_iter_corpus(corpus))
+    else:
+        model = IDFModel.load(model_dir, mmap=False)
+        model.update(_iter_corpus(corpus))
+
+    model.save(model_dir)
+    print(f"✅ IDF model: {len(model)} terms from {model.n_docs} documents → {model_dir}")
@@ -0,0 +1,207 @@
+"""
+Incremental ATS re-scoring for live editing.
+
+IncrementalScorer keeps per-line token, term, n-gram and keyword-hit
+counts for a resume. On each edit only the changed lines (and the few
+lines whose n-gram context they touch) are re-tokenized and re-counted;
+the aggregate counts are patched in place and the score is assembled
+from them with the same functions ats_score uses.
+"""
+from collections import Counter
+from difflib import SequenceMatcher
+from types import MappingProxyType
+
+from ats_analyser import (
+    TERM_COUNT_CAPACITY,
+    ResumeProfile,
+    count_terms,
+    create_normalized_set,
+    jd_profile,
+    ngram_counts,
+    score_profile,
+    select_terms,
+    tfidf_similarities,
+)
+from tokenizer import TokenStream, tokenize
+
+
+class _Line:
+    """One resume line: its tokens plus the counts it contributes"""
+
+    __slots__ = ("text", "stream", "freq", "tech", "found", "context", "terms", "ngrams")
+
+    def __init__(self, text, matcher):
+        self.text = text
+        self.stream = tokenize(text)
+        self.freq = Counter(self.stream.lower)
+        self.tech = self.stream.tech
+        # Keyword hits never span lines: JD terms contain no newline
+        self.found = matcher.present(text) if self.stream.lower else set()
+        self.context = None
+        self.terms = Counter()
+        self.ngrams = Counter()
+
+
+def _patch(total, counts, sign):
+    """total += sign * counts, dropping keys that reach zero"""
+    for key, n in counts.items():
+        left = total[key] + sign * n
+        if left:
+            total[key] = left
+        else:
+            del total[key]
+
+
+class IncrementalScorer:
+
+    def __init__(self, resume_text, jd_text):
+        self.jd = jd_profile(jd_text)
+        self._lines = []
+
+        self._freq = Counter()
+        self._tech = Counter()    # tech term -> lines containing it
+        self._found = Counter()   # JD term -> lines containing it
+        self._terms = Counter()
+        self._ngrams = Counter()
+
+        self._profile = None
+        self.update(resume_text or "")
+
+    # ---------------- EDITS ---------------- #
+
+    def update(self, new_text):
+        """Re-score after the text changed; only differing lines are redone"""
+        new_lines = (new_text or "").split("\n")
+        old_lines = self._lines
+        matcher = self.jd.matcher
+
+        matcher_ops = SequenceMatcher(
+            None,
+            [line.text for line in old_lines],
+            new_lines,
+            autojunk=False
+        ).get_opcodes()
+
+        lines = []
+        for tag, i1, i2, j1, j2 in matcher_ops:
+            if tag == "equal":
+                lines.extend(old_lines[i1:i2])
+                continue
+
+            for line in old_lines[i1:i2]:
+                self._add_line(line, -1)
+                self._set_contribution(line, None)
+
+            for text in new_lines[j1:j2]:
+                line = _Line(text, matcher)
+                self._add_line(line, +1)
+                lines.append(line)
+
+        self._lines = lines
+        self._refresh_contexts()
+        self._profile = None
+
+    def apply_edit(self, start, end, new_lines):
+        """Replace lines[start:end] with new_lines (an explicit text diff)"""
+        texts = [line.text for line in self._lines]
+        texts[start:end] = list(new_lines)
+        self.update("\n".join(texts))
+
+    def _add_line(self, line, sign):
+        _patch(self._freq, line.freq, sign)
+        _patch(self._tech, Counter(line.tech), sign)
+        _patch(self._found, Counter(line.found), sign)
+
+    def _set_contribution(self, line, context):
+        """Recount the n-grams ending on this line for a new context"""
+        _patch(self._terms, line.terms, -1)
+        _patch(self._ngrams, line.ngrams, -1)
+
+        if context is None:
+            line.context = None
+            line.terms = Counter()
+            line.ngrams = Counter()
+            return
+
+        prev, prev_ngram = context
+        tokens = line.stream.lower
+
+        # N-grams are owned by the line holding their last token
+        line.terms = count_terms(prev + tokens) - count_terms(prev)
+        line.ngrams = ngram_counts(prev_ngram + tokens) - ngram_counts(prev_ngram)
+        line.context = context
+
+        _patch(self._terms, line.terms, +1)
+        _patch(self._ngrams, line.ngrams, +1)
+
+    def _refresh_contexts(self):
+        """
+        A line's counts depend on the last two tokens before it (and the
+        last TF-IDF token). Recount only lines whose context changed.
+        """
+        prev = ()
+        prev_ngram = ()
+
+        for line in self._lines:
+            context = (prev, prev_ngram)
+            if line.context != context:
+                self._set_contribution(line, context)
+
+            tokens = line.stream.lower
+            if tokens:
+                prev = (prev + tokens)[-2:]
+                long_tokens = [t for t in tokens if len(t) > 1]
+                if long_tokens:
+                    prev_ngram = (long_tokens[-1],)
+
+    # ---------------- SCORING ---------------- #
+
+    @property
+    def text(self):
+        return "\n".join(line.text for line in self._lines)
+
+    def profile(self):
+        """ResumeProfile assembled from the maintained counts"""
+        if self._profile is not None:
+            return self._profile
+
+        text = self.text
+        spans, raw, lower = [], [], []
+        offset = 0
+        for line in self._lines:
+            spans.extend((s + offset, e + offset) for s, e in line.stream.spans)
+            raw.extend(line.stream.raw)
+            lower.extend(line.stream.lower)
+            offset += len(line.text) + 1
+
+        tech = frozenset(self._tech)
+        counts = self._terms
+        if len(counts) > TERM_COUNT_CAPACITY:
+            # ats_score prunes rare terms while counting a document this
+            # long, which depends on the whole token order: recount like it
+            counts = count_terms(lower, capacity=TERM_COUNT_CAPACITY)
+        terms = frozenset(select_terms(counts, tech))
+        combined = terms | tech
+        stream = TokenStream(tuple(spans), tuple(raw), tuple(lower), tech)
+
+        self._profile = ResumeProfile(
+            text=text,
+            lower=text.lower(),
+            cleaned=stream.cleaned,
+            stream=stream,
+            tokens=stream.lower,
+            terms=terms,
+            tech=tech,
+            combined=combined,
+            terms_normalized=frozenset(create_normalized_set(terms)),
+            combined_normalized=frozenset(create_normalized_set(combined)),
+            freq=MappingProxyType(Counter(self._freq)),
+            ngrams=MappingProxyType(Counter(self._ngrams)),
+        )
+        return self._profile
+
+    def score(self):
+        """(score, missing_terms), same as ats_score(current_text, jd)"""
+        resume = self.profile()
+        similarity = tfidf_similarities([resume.ngrams], self.jd.ngrams)[0]
+        return score_profile(resume, self.jd, similarity, set(self._found))
@@ -0,0 +1,420 @@
+"""
+Bulk resume ingestion from directories and zip archives.
+
+    python ingest.py data/corpus intake/batch_01.zip intake/loose_pdfs/
+
+Members are streamed straight out of zip archives (nothing is extracted
+to disk), deduplicated by SHA-256 of their bytes, parsed in a process
+pool and written to a local corpus store with precomputed analysis
+features. A bad file is recorded as a failure and never stops the run;
+the run ends with a throughput and failure report.
+
+Lightly edited copies of an already stored resume are flagged through a
+MinHash LSH index (minhash.py): their record gets near_duplicate_of /
+similarity, and CorpusStore.canonical() maps them to the first version
+so scoring and enhancement results can be reused.
+
+Corpus store layout:
+    documents.jsonl   one record per document (append-only)
+    texts/<sha>.txt   normalized text (utils.clean_text)
+    minhash/          LSH signature store (checkpointed; missing entries
+                      are re-signed from texts/ on open)
+    runs/<time>.json  ingestion reports
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from minhash import LSHIndex, MinHasher, shingle_hashes
+from resume_parser import MAX_BYTES, MAX_PAGES, MAX_TEXT_CHARS
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))
+
+LSH_SAVE_EVERY = 200   # documents between signature-store checkpoints
+
+SUPPORTED = (".pdf", ".txt")
+
+
+# ---------------- SOURCES ---------------- #
+
+class SourceError(Exception):
+    """A member that can't be read (too large, corrupt archive entry)"""
+
+
+def iter_sources(paths, max_bytes=MAX_BYTES):
+    """
+    Yield (source_name, data_or_SourceError) for every supported file in
+    the given files, directories and .zip archives, one at a time.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                yield from iter_sources(
+                    (os.path.join(root, name) for name in sorted(files)),
+                    max_bytes
+                )
+        elif path.lower().endswith(".zip"):
+            yield from _iter_zip(path, max_bytes)
+        elif path.lower().endswith(SUPPORTED):
+            try:
+                if os.path.getsize(path) > max_bytes:
+                    raise SourceError(f"larger than {max_bytes:,} bytes")
+                with open(path, "rb") as f:
+                    yield path, f.read()
+            except (OSError, SourceError) as e:
+                yield path, SourceError(str(e))
+
+
+def _iter_zip(path, max_bytes):
+    try:
+        archive = zipfile.ZipFile(path)
+    except (OSError, zipfile.BadZipFile) as e:
+        yield path, SourceError(f"unreadable archive: {e}")
+        return
+
+    with archive:
+        for info in archive.infolist():
+            name = f"{path}!{info.filename}"
+            if info.is_dir() or not info.filename.lower().endswith(SUPPORTED):
+                continue
+            # Declared size is checked before inflating (zip bombs)
+            if info.file_size > max_bytes:
+                yield name, SourceError(f"larger than {max_bytes:,} bytes")
+                continue
+            try:
+                yield name, archive.read(info)
+            except (OSError, zipfile.BadZipFile, RuntimeError, ValueError) as e:
+                yield name, SourceError(f"unreadable member: {e}")
+
+
+# ---------------- WORKER ---------------- #
+
+def analyse_document(name, data, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+    """Extract and analyse one document (runs in a worker process)"""
+    from ats_analyser import resume_profile
+    from resume_parser import iter_pages
+    from utils import clean_text, detect_sections
+
+    if name.lower().endswith(".txt"):
+        raw = data.decode("utf-8", errors="replace")[:max_chars]
+        n_pages = 1
+    else:
+        pages = list(iter_pages(data, max_pages, max_chars, parallel=False))
+        raw = "".join(p.text for p in pages)
+        n_pages = len(pages)
+
+    text = clean_text(raw)
+    if not text:
+        raise ValueError("no extractable text (scanned image?)")
+
+    profile = resume_profile(raw)
+    found, _ = detect_sections(raw)
+
+    return text, {
+        "n_pages": n_pages,
+        "n_chars": len(text),
+        "n_tokens": len(profile.tokens),
+        "sections": found,
+        "tech": sorted(profile.tech),
+        "terms": sorted(profile.terms),
+    }
+
+
+def _work(name, data, num_perm):
+    try:
+        text, features = analyse_document(name, data)
+        signature = MinHasher(num_perm).signature(shingle_hashes(text))
+        return name, text, features, signature, None
+    except Exception as e:
+        return name, None, None, None, f"{type(e).__name__}: {e}"
+
+
+class _Job:
+    """One file handed to the pool: its current future and crash count"""
+
+    __slots__ = ("future", "pool_id", "name", "data", "sha", "crashes")
+
+    def __init__(self, name, data, sha):
+        self.future = None
+        self.pool_id = None
+        self.name = name
+        self.data = data
+        self.sha = sha
+        self.crashes = 0
+
+
+# ---------------- CORPUS STORE ---------------- #
+
+class CorpusStore:
+
+    def __init__(self, path):
+        self.path = path
+        self.texts_dir = os.path.join(path, "texts")
+        os.makedirs(self.texts_dir, exist_ok=True)
+        self.records_path = os.path.join(path, "documents.jsonl")
+        self.hashes = {}   # sha -> None, in ingestion order
+        self.near = {}     # sha -> sha of the earlier near-duplicate
+
+        if os.path.exists(self.records_path):
+            with open(self.records_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self.hashes[record["sha256"]] = None
+                    except (ValueError, KeyError):
+                        continue   # torn last line after a crash
+                    if record.get("near_duplicate_of"):
+                        self.near[record["sha256"]] = record["near_duplicate_of"]
+
+        self.lsh = LSHIndex.open(os.path.join(path, "minhash"))
+        self._sync_lsh()
+
+    def __contains__(self, sha):
+        return sha in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, sha, source, text, features):
+        # Text first, record last: a record always has its text file
+        text_path = os.path.join(self.texts_dir, sha + ".txt")
+        tmp = text_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, text_path)
+
+        record = {"sha256": sha, "source": source, "ingested": time.time(), **features}
+        with open(self.records_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.hashes[sha] = None
+        if record.get("near_duplicate_of"):
+            self.near[sha] = record["near_duplicate_of"]
+        return record
+
+    def canonical(self, sha):
+        """The first stored version of a document (itself if not a near-duplicate)"""
+        while sha in self.near:
+            sha = self.near[sha]
+        return sha
+
+    def save_lsh(self):
+        self.lsh.save(os.path.join(self.path, "minhash"))
+
+    def _sync_lsh(self):
+        """
+        Re-sign documents missing from the signature store (a run killed
+        between checkpoints), so they can still be matched as originals
+        """
+        missing = [sha for sha in self.hashes if sha not in self.lsh]
+        if not missing:
+            return
+
+        print(f"⚠️ Rebuilding {len(missing)} MinHash signatures from stored texts")
+        hasher = self.lsh.hasher
+        for sha in missing:
+            try:
+                text = self.text(sha)
+            except OSError:
+                continue
+            self.lsh.add(sha, hasher.signature(shingle_hashes(text)))
+        self.save_lsh()
+
+    def documents(self):
+        with open(self.records_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def text(self, sha):
+        with open(os.path.join(self.texts_dir, sha + ".txt"), encoding="utf-8") as f:
+            return f.read()
+
+
+# ---------------- PIPELINE ---------------- #
+
+def ingest(paths, store, workers=INGEST_WORKERS, on_document=None):
+    """
+    Ingest every supported file under paths into store. Returns a report
+    dict with counts, throughput and per-file failures. on_document(record)
+    is called for each newly stored document.
+    """
+    report = {
+        "ingested": 0, "duplicates": 0, "near_duplicates": 0,
+        "failed": 0, "bytes": 0, "failures": [],
+    }
+    start = time.perf_counter()
+    seen = {}   # sha -> source, for this run
+
+    def fail(name, error):
+        report["failed"] += 1
+        report["failures"].append({"source": name, "error": error})
+        print(f"❌ {name}: {error}")
+
+    ctx = multiprocessing.get_context("spawn")
+    pool = None
+    pool_id = 0
+    in_flight = []   # _Jobs, in submit order
+
+    def new_pool():
+        nonlocal pool, pool_id
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        pool_id += 1
+
+    def submit(job):
+        job.future = pool.submit(_work, job.name, job.data, store.lsh.num_perm)
+        job.pool_id = pool_id
+
+    def isolate(job):
+        """Run one file alone: a crash now can only be this file's"""
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as solo:
+                outcome = solo.submit(_work, job.name, job.data, store.lsh.num_perm).result()
+        except BrokenProcessPool:
+            outcome = job.name, None, None, None, "worker process crashed on this file"
+        except Exception as e:
+            outcome = job.name, None, None, None, f"{type(e).__name__}: {e}"
+        job.future = Future()
+        job.future.set_result(outcome)
+
+    def lost(future):
+        if not future.done() or future.cancelled():
+            return True
+        return isinstance(future.exception(), BrokenProcessPool)
+
+    def recover(dead_id):
+        """
+        A worker died (segfault, OOM kill) and took every queued file with
+        it. Replace the pool once and resubmit all of its lost files as one
+        batch; a file caught in a second crash is re-run alone, so only a
+        file that crashes by itself is recorded as a failure.
+        """
+        if dead_id == pool_id:
+            new_pool()
+        batch = []
+        for job in in_flight:
+            if job.pool_id == dead_id and lost(job.future):
+                job.crashes += 1
+                if job.crashes > 1:
+                    isolate(job)
+                else:
+                    batch.append(job)
+        for job in batch:
+            submit(job)
+
+    def result(job):
+        while True:
+            try:
+                return job.future.result()
+            except (BrokenProcessPool, CancelledError):
+                recover(job.pool_id)
+            except Exception as e:
+                return job.name, None, None, None, f"{type(e).__name__}: {e}"
+
+    def collect(job):
+        name, text, features, signature, error = result(job)
+        if error:
+            fail(name, error)
+            return
+
+        matches = store.lsh.query(signature)
+        if matches:
+            original, similarity = matches[0]
+            features = dict(features, near_duplicate_of=original, similarity=round(similarity, 3))
+            report["near_duplicates"] += 1
+
+        record = store.add(job.sha, name, text, features)
+        store.lsh.add(job.sha, signature)
+        report["ingested"] += 1
+        if report["ingested"] % LSH_SAVE_EVERY == 0:
+            store.save_lsh()
+        if on_document is not None:
+            on_document(record)
+
+    new_pool()
+    try:
+        for name, data in iter_sources(paths):
+            if isinstance(data, SourceError):
+                fail(name, str(data))
+                continue
+
+            sha = hashlib.sha256(data).hexdigest()
+            if sha in store or sha in seen:
+                report["duplicates"] += 1
+                continue
+            seen[sha] = name
+            report["bytes"] += len(data)
+
+            job = _Job(name, data, sha)
+            in_flight.append(job)
+            try:
+                submit(job)
+            except BrokenProcessPool:
+                recover(pool_id)
+                submit(job)
+            # Bound memory: never hold more than a few documents per worker
+            while len(in_flight) >= 4 * workers:
+                collect(in_flight[0])
+                in_flight.pop(0)
+
+        while in_flight:
+            collect(in_flight[0])
+            in_flight.pop(0)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        # Checkpoints bound the work CorpusStore redoes after a killed run
+        store.save_lsh()
+
+    elapsed = time.perf_counter() - start
+    processed = report["ingested"] + report["failed"]
+    report.update({
+        "seconds": round(elapsed, 3),
+        "files_per_sec": round(processed / elapsed, 2) if elapsed else 0.0,
+        "mb_per_sec": round(report["bytes"] / 1e6 / elapsed, 2) if elapsed else 0.0,
+    })
+    return report
+
+
+def save_report(store, report):
+    runs = os.path.join(store.path, "runs")
+    os.makedirs(runs, exist_ok=True)
+    path = os.path.join(runs, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk resume ingestion")
+    parser.add_argument("store", help="corpus store directory")
+    parser.add_argument("paths", nargs="+", help="PDFs, directories or .zip archives")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    args = parser.parse_args(argv)
+
+    store = CorpusStore(args.store)
+    report = ingest(args.paths, store, args.workers)
+    report_path = save_report(store, report)
+
+    print(
+        f"\n✅ {report['ingested']} ingested ({report['near_duplicates']} near-duplicates), "
+        f"{report['duplicates']} duplicates, "
+        f"{report['failed']} failed in {report['seconds']}s "
+        f"({report['files_per_sec']} files/s, {report['mb_per_sec']} MB/s)"
+    )
+    print(f"📄 Report → {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
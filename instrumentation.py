@@ -0,0 +1,182 @@
+"""
+Per-stage timing for the analysis pipeline.
+
+Wrap a stage in a named span:
+
+    with span("pdf.extract"):
+        text = ...
+
+Spans are off unless ATS_METRICS=1 (or set_enabled(True)); a disabled
+span is one flag check and a shared no-op context manager. Enabled spans
+feed an in-process latency histogram per stage, exportable as Prometheus
+text, and are also recorded in a per-thread trace so the UI can show the
+stage breakdown of the last request (new_trace() / last_trace()).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Seconds; +Inf is implicit
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_NAME = "ats_stage_duration_seconds"
+
+_enabled = os.getenv("ATS_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+# ---------------- HISTOGRAMS ---------------- #
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms = {}
+
+
+def observe(name, seconds):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds)
+
+
+def reset():
+    """Drop all aggregated histograms"""
+    with _lock:
+        _histograms.clear()
+
+
+def summary():
+    """{stage: {"count", "sum_s", "mean_ms"}} for every observed stage"""
+    with _lock:
+        return {
+            name: {
+                "count": h.count,
+                "sum_s": h.sum,
+                "mean_ms": h.sum / h.count * 1000 if h.count else 0.0,
+            }
+            for name, h in sorted(_histograms.items())
+        }
+
+
+def export_prometheus():
+    """Snapshot of all stage histograms in the Prometheus text format"""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each analysis pipeline stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+
+    with _lock:
+        items = sorted((name, list(h.counts), h.sum, h.count) for name, h in _histograms.items())
+
+    for name, counts, total, count in items:
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for le, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="+Inf"}} {count}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{label}"}} {total}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{label}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+# ---------------- TRACES ---------------- #
+
+_local = threading.local()
+
+
+def new_trace():
+    """Start a fresh per-thread stage breakdown (e.g. at a button click)"""
+    _local.records = []
+    _local.depth = 0
+
+
+def last_trace():
+    """[(stage, depth, duration_ms)] recorded since new_trace, in start order"""
+    records = getattr(_local, "records", None) or []
+    return [(name, depth, ms) for _, name, depth, ms in sorted(records, key=lambda r: r[0])]
+
+
+# ---------------- SPANS ---------------- #
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "depth")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = getattr(_local, "depth", 0)
+        _local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.depth = self.depth
+        observe(self.name, elapsed)
+
+        records = getattr(_local, "records", None)
+        if records is not None:
+            records.append((self.start, self.name, self.depth, elapsed * 1000))
+        return False
+
+
+def span(name):
+    """Context manager timing one pipeline stage"""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
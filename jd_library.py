@@ -0,0 +1,247 @@
+"""
+Job description library for reverse matching.
+
+Answers "which of these open roles fits this resume best" without calling
+ats_score on every stored JD:
+
+1. Term postings (normalized terms -> JD ids) give a fast keyword overlap.
+2. MiniLM embeddings from rag_engine give a dense similarity.
+3. The blended score shortlists a few hundred JDs and only the top-K of
+   those are scored with the full ats_score.
+"""
+import json
+import os
+
+import numpy as np
+
+from ats_analyser import ats_score, jd_profile, resume_profile
+
+
+# ---------------- HELPERS ---------------- #
+
+def _encode(texts):
+    """Unit-length MiniLM embeddings (the model is only loaded on use)"""
+    from rag_engine import encode
+
+    return encode(texts, normalize=True)
+
+
+# ---------------- LIBRARY ---------------- #
+
+class JDLibrary:
+    """
+    Persistent collection of job descriptions with a hybrid
+    (postings + embeddings) shortlist index.
+    """
+
+    def __init__(self, use_embeddings=True):
+        self.use_embeddings = use_embeddings
+        self.jds = []           # [{"id", "title", "text"}]
+        self.postings = {}      # normalized term -> list/array of JD rows
+        self.term_counts = []   # number of index terms per JD
+        self.embeddings = None  # (n_jds, dim) float32, unit length
+
+    def __len__(self):
+        return len(self.jds)
+
+    # ---------------- BUILD ---------------- #
+
+    def add(self, jd_id, text, title=""):
+        self.add_many([{"id": jd_id, "text": text, "title": title}])
+
+    def add_many(self, jds):
+        """Add JDs given as dicts with "id", "text" and optional "title"."""
+        jds = [
+            {"id": str(jd["id"]), "title": jd.get("title", ""), "text": jd["text"]}
+            for jd in jds
+        ]
+        if not jds:
+            return
+
+        for jd in jds:
+            row = len(self.jds)
+            terms = jd_profile(jd["text"]).combined_normalized
+
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = []
+                elif not isinstance(posting, list):
+                    # Loaded postings are array views; copy on first write
+                    posting = self.postings[term] = posting.tolist()
+                posting.append(row)
+
+            self.term_counts.append(len(terms))
+            self.jds.append(jd)
+
+        if self.use_embeddings:
+            self._sync_embeddings()
+
+    def _sync_embeddings(self):
+        """Encode the JDs that have no embedding row yet (row i <-> jds[i])"""
+        have = 0 if self.embeddings is None else len(self.embeddings)
+        if have > len(self.jds):
+            raise ValueError(
+                f"{have} embedding rows for {len(self.jds)} JDs; rebuild the library"
+            )
+        if have == len(self.jds):
+            return
+
+        vecs = _encode(jd["text"] for jd in self.jds[have:])
+        if self.embeddings is None:
+            self.embeddings = vecs
+        else:
+            self.embeddings = np.vstack([self.embeddings, vecs])
+
+    # ---------------- SEARCH ---------------- #
+
+    def shortlist(self, resume_text, n=200, keyword_weight=0.5):
+        """
+        Cheap candidate selection (resume text or ResumeProfile).
+        Returns (rows, scores) for the n best JDs, best first.
+        """
+        resume = resume_profile(resume_text)
+        total = len(self.jds)
+        if total == 0:
+            return np.array([], dtype=np.int64), np.array([])
+
+        # ---- Keyword overlap: share of each JD's terms found in resume ---- #
+        hits = [
+            self.postings[t]
+            for t in resume.combined_normalized
+            if t in self.postings
+        ]
+        if hits:
+            counts = np.bincount(np.concatenate(hits), minlength=total)
+        else:
+            counts = np.zeros(total)
+        overlap = counts / np.maximum(np.asarray(self.term_counts), 1)
+
+        # ---- Dense similarity ---- #
+        if self.use_embeddings and self.embeddings is not None:
+            query = _encode([resume.text])[0]
+            dense = self.embeddings @ query
+            scores = keyword_weight * overlap + (1 - keyword_weight) * dense
+        else:
+            scores = overlap
+
+        n = min(n, total)
+        rows = np.argpartition(-scores, n - 1)[:n]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+
+        return rows, scores[rows]
+
+    def rank(self, resume_text, top_k=10, shortlist_size=200):
+        """
+        Rank stored JDs for a resume.
+        Runs the full ats_score on the shortlist_size best prefilter
+        matches only, and returns the top_k of those.
+        """
+        resume = resume_profile(resume_text)
+        rows, prefilter = self.shortlist(resume, n=max(shortlist_size, top_k))
+
+        results = []
+        for row, pre in zip(rows, prefilter):
+            jd = self.jds[row]
+            score, missing = ats_score(resume, jd["text"])
+            results.append({
+                "id": jd["id"],
+                "title": jd["title"],
+                "score": score,
+                "prefilter_score": float(pre),
+                "missing_terms": missing,
+            })
+
+        results.sort(key=lambda r: (r["score"], r["prefilter_score"]), reverse=True)
+        return results[:top_k]
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def save(self, path):
+        """
+        Write the library to a directory:
+        jds.jsonl, terms.json, postings.npz and embeddings.npy.
+        Every file is written to a temp file and swapped in, so saving
+        over the directory this library was (memory-mapped) loaded from
+        is safe.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        def replace(name, write, mode="w"):
+            final = os.path.join(path, name)
+            tmp = final + ".tmp"
+            encoding = "utf-8" if "b" not in mode else None
+            with open(tmp, mode, encoding=encoding) as f:
+                write(f)
+            os.replace(tmp, final)
+
+        replace("jds.jsonl", lambda f: f.writelines(json.dumps(jd) + "\n" for jd in self.jds))
+
+        terms = sorted(self.postings)
+        lists = [np.asarray(self.postings[t], dtype=np.int64) for t in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        if lists:
+            offsets[1:] = np.cumsum([len(p) for p in lists])
+        rows = np.concatenate(lists) if lists else np.array([], dtype=np.int64)
+
+        replace("terms.json", lambda f: json.dump(terms, f))
+        replace("postings.npz", lambda f: np.savez(
+            f,
+            offsets=offsets,
+            rows=rows,
+            term_counts=np.asarray(self.term_counts, dtype=np.int64),
+        ), "wb")
+
+        # A library opened with use_embeddings=False never saw the
+        # embeddings, so it leaves an existing file alone
+        if not self.use_embeddings:
+            return
+        emb_path = os.path.join(path, "embeddings.npy")
+        if self.embeddings is not None:
+            replace("embeddings.npy", lambda f: np.save(f, self.embeddings), "wb")
+        elif os.path.exists(emb_path):
+            os.remove(emb_path)
+
+    @classmethod
+    def load(cls, path, use_embeddings=True, mmap=True):
+        library = cls(use_embeddings=use_embeddings)
+
+        with open(os.path.join(path, "jds.jsonl"), encoding="utf-8") as f:
+            library.jds = [json.loads(line) for line in f if line.strip()]
+
+        with open(os.path.join(path, "terms.json"), encoding="utf-8") as f:
+            terms = json.load(f)
+        data = np.load(os.path.join(path, "postings.npz"))
+        offsets, rows = data["offsets"], data["rows"]
+
+        library.postings = {
+            t: rows[offsets[i]:offsets[i + 1]]
+            for i, t in enumerate(terms)
+        }
+        library.term_counts = data["term_counts"].tolist()
+
+        emb_path = os.path.join(path, "embeddings.npy")
+        if use_embeddings:
+            if os.path.exists(emb_path):
+                library.embeddings = np.load(emb_path, mmap_mode="r" if mmap else None)
+            # JDs added while the library was used without embeddings
+            library._sync_embeddings()
+
+        return library
+
+
+# TEST IT
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python jd_library.py <library_dir> <resume.txt>")
+        sys.exit(1)
+
+    library = JDLibrary.load(sys.argv[1])
+    with open(sys.argv[2], encoding="utf-8") as f:
+        resume = f.read()
+
+    for r in library.rank(resume):
+        print(f"{r['score']:>3}%  {r['id']}  {r['title']}")
+        print(f"      missing: {', '.join(r['missing_terms'][:10])}")
@@ -0,0 +1,220 @@
+"""
+MinHash / LSH near-duplicate detection for resumes.
+
+Documents are reduced to word shingles of utils.clean_text output, and
+each is summarised by a NUM_PERM-value MinHash signature (uint32). The
+fraction of equal signature values estimates the Jaccard similarity of
+the shingle sets. Signatures are split into bands; documents sharing any
+band land in the same bucket, so a lookup only compares a handful of
+candidates instead of the whole corpus. Candidates are then checked
+against MINHASH_THRESHOLD on the full signature.
+
+Store layout (LSHIndex.save / load):
+    signatures.npy   (n, NUM_PERM) uint32
+    keys.json        document key per signature row, plus parameters
+Bucket tables are rebuilt from the signatures on load.
+"""
+import json
+import os
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+NUM_PERM = int(os.getenv("MINHASH_PERM", 128))
+SHINGLE_SIZE = int(os.getenv("MINHASH_SHINGLE", 5))
+THRESHOLD = float(os.getenv("MINHASH_THRESHOLD", 0.8))
+SEED = 1
+
+_PRIME = np.uint64(4294967291)   # largest prime below 2**32
+_CHUNK = 4096                    # shingles hashed per step (bounds memory)
+
+
+# ---------------- SHINGLING ---------------- #
+
+def shingle_hashes(text, k=SHINGLE_SIZE):
+    """Unique uint32 hashes of the k-word shingles of clean_text(text)"""
+    from utils import clean_text
+
+    words = clean_text(text).lower().split()
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+
+    # crc32 is stable across processes (hash() is salted per interpreter)
+    tokens = np.fromiter(
+        (zlib.crc32(w.encode("utf-8")) for w in words),
+        dtype=np.uint64, count=len(words)
+    )
+    k = min(k, len(tokens))
+    n = len(tokens) - k + 1
+
+    # Polynomial hash of each window, mod 2**32
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        h = (h * np.uint64(1000003) + tokens[j:j + n]) & np.uint64(0xFFFFFFFF)
+    return np.unique(h)
+
+
+# ---------------- SIGNATURES ---------------- #
+
+class MinHasher:
+
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        self.num_perm = num_perm
+        rng = np.random.default_rng(seed)
+        # a, b < 2**31 keep a * x + b inside uint64 for x < 2**32
+        self.a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+
+    def signature(self, hashes):
+        """MinHash signature of a set of uint32 shingle hashes"""
+        sig = np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint64)
+        for start in range(0, len(hashes), _CHUNK):
+            x = hashes[start:start + _CHUNK, None]
+            values = (x * self.a + self.b) % _PRIME
+            np.minimum(sig, values.min(axis=0), out=sig)
+        return sig.astype(np.uint32)
+
+    def text_signature(self, text, k=SHINGLE_SIZE):
+        return self.signature(shingle_hashes(text, k))
+
+
+def jaccard(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(sig_a == sig_b))
+
+
+@lru_cache(maxsize=None)
+def lsh_params(threshold, num_perm, fp_weight=0.2, fn_weight=0.8):
+    """
+    (bands, rows) with bands * rows <= num_perm minimising the weighted
+    area of false positives below threshold and false negatives above it.
+    Missed copies cost a full re-score, while false positives only cost a
+    signature comparison, so false negatives weigh more.
+    """
+    below = np.linspace(0, threshold, 100)
+    above = np.linspace(threshold, 1, 100)
+
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+            fn = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+            error = fp_weight * fp + fn_weight * fn
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+# ---------------- INDEX ---------------- #
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures. query() returns the stored keys
+    whose estimated Jaccard similarity is at least the threshold.
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, seed=SEED):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+
+        self.keys = []
+        self._rows_of = {}
+        self._signatures = np.empty((64, num_perm), dtype=np.uint32)
+        self._tables = [{} for _ in range(self.bands)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._rows_of
+
+    @property
+    def num_perm(self):
+        return self.hasher.num_perm
+
+    @property
+    def signatures(self):
+        return self._signatures[:len(self.keys)]
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, key, sig):
+        if key in self._rows_of:
+            return
+        row = len(self.keys)
+        if row == len(self._signatures):
+            grown = np.empty((2 * row, self.num_perm), dtype=np.uint32)
+            grown[:row] = self._signatures
+            self._signatures = grown
+
+        self._signatures[row] = sig
+        self.keys.append(key)
+        self._rows_of[key] = row
+        for table, band in zip(self._tables, self._band_keys(sig)):
+            table.setdefault(band, []).append(row)
+
+    def query(self, sig, threshold=None):
+        """[(key, similarity)] of near-duplicates, most similar first"""
+        threshold = self.threshold if threshold is None else threshold
+
+        candidates = set()
+        for table, band in zip(self._tables, self._band_keys(sig)):
+            candidates.update(table.get(band, ()))
+        if not candidates:
+            return []
+
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        sims = (self._signatures[rows] == sig).mean(axis=1)
+        keep = sims >= threshold
+        return sorted(
+            ((self.keys[r], float(s)) for r, s in zip(rows[keep], sims[keep])),
+            key=lambda item: -item[1]
+        )
+
+    def signature(self, key):
+        return self._signatures[self._rows_of[key]]
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+
+        tmp = os.path.join(path, "signatures.npy.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, self.signatures)
+        os.replace(tmp, os.path.join(path, "signatures.npy"))
+
+        tmp = os.path.join(path, "keys.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "threshold": self.threshold,
+                "num_perm": self.num_perm,
+                "keys": self.keys,
+            }, f)
+        os.replace(tmp, os.path.join(path, "keys.json"))
+
+    @classmethod
+    def load(cls, path, threshold=None, seed=SEED):
+        with open(os.path.join(path, "keys.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        signatures = np.load(os.path.join(path, "signatures.npy"))
+
+        index = cls(
+            threshold if threshold is not None else meta["threshold"],
+            meta["num_perm"], seed
+        )
+        # keys.json is written last, so it never lists a missing row
+        for key, sig in zip(meta["keys"], signatures):
+            index.add(key, sig)
+        return index
+
+    @classmethod
+    def open(cls, path, threshold=None, num_perm=NUM_PERM):
+        """Load the index at path, or start an empty one"""
+        if os.path.exists(os.path.join(path, "keys.json")):
+            return cls.load(path, threshold)
+        return cls(THRESHOLD if threshold is None else threshold, num_perm)
@@ -0,0 +1,184 @@
+"""
+Content-hash cache for PDF text extraction.
+
+Streamlit reruns the whole script on every interaction, so an uploaded
+resume would otherwise be re-parsed on each keystroke in the JD box.
+Extracted text is cached by a SHA-256 of the uploaded bytes (plus the
+extraction budgets):
+
+- in process: an LRU shared by every session, bounded by entry count
+  (PDF_CACHE_SIZE) and total characters (PDF_CACHE_MAX_CHARS)
+- on disk, optionally: PDF_CACHE_DIR/<hash>.txt, bounded by
+  PDF_CACHE_DISK_FILES (least recently used files are removed)
+
+Concurrent requests for the same bytes wait for the one extraction in
+progress instead of parsing the PDF again.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from resume_parser import MAX_PAGES, MAX_TEXT_CHARS, extract_text_from_pdf, read_pdf_bytes
+
+CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", 128))
+CACHE_MAX_CHARS = int(os.getenv("PDF_CACHE_MAX_CHARS", 20_000_000))
+DISK_FILES = int(os.getenv("PDF_CACHE_DISK_FILES", 1000))
+
+CACHE_VERSION = 1
+
+
+class PDFTextCache:
+
+    def __init__(self, max_entries=CACHE_SIZE, max_chars=CACHE_MAX_CHARS,
+                 disk_dir=None, disk_files=DISK_FILES):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.disk_dir = disk_dir
+        self.disk_files = disk_files
+
+        self._entries = OrderedDict()   # key -> text, oldest first
+        self._chars = 0
+        self._in_flight = {}            # key -> Event
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(data, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+        h = hashlib.sha256(data)
+        h.update(f"|v{CACHE_VERSION}|{max_pages}|{max_chars}".encode())
+        return h.hexdigest()
+
+    # ---------------- LOOKUP ---------------- #
+
+    def extract(self, pdf_file, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+        """Extracted text for an uploaded PDF, parsing it at most once"""
+        data = read_pdf_bytes(pdf_file)
+        key = self.key(data, max_pages, max_chars)
+
+        while True:
+            with self._lock:
+                text = self._get(key)
+                if text is not None:
+                    self.hits += 1
+                    return text
+
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = self._in_flight[key] = threading.Event()
+                    break
+
+            # Another session is extracting these bytes: wait, then re-check
+            event.wait()
+
+        try:
+            text = self._disk_get(key)
+            if text is None:
+                with self._lock:
+                    self.misses += 1
+                text = extract_text_from_pdf(data, max_pages, max_chars)
+                self._disk_put(key, text)
+            else:
+                with self._lock:
+                    self.hits += 1
+
+            with self._lock:
+                self._put(key, text)
+            return text
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def _get(self, key):
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+        return text
+
+    def _put(self, key, text):
+        if key in self._entries or len(text) > self.max_chars:
+            return
+        self._entries[key] = text
+        self._chars += len(text)
+        while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+            _, old = self._entries.popitem(last=False)
+            self._chars -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    # ---------------- DISK ---------------- #
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key + ".txt")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)   # recency for eviction
+        except OSError:
+            pass
+        return text
+
+    def _disk_put(self, key, text):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            tmp = self._disk_path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self._disk_path(key))
+            self._disk_prune()
+        except OSError as e:
+            print(f"PDF cache write failed: {e}")
+
+    def _disk_prune(self):
+        files = [
+            entry for entry in os.scandir(self.disk_dir)
+            if entry.name.endswith(".txt") and entry.is_file()
+        ]
+        excess = len(files) - self.disk_files
+        if excess <= 0:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:excess]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+# ---------------- SHARED INSTANCE ---------------- #
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache():
+    """Process-wide cache (shared by all Streamlit sessions)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PDFTextCache(disk_dir=os.getenv("PDF_CACHE_DIR") or None)
+    return _cache
+
+
+def extract_text_cached(pdf_file, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+    """extract_text_from_pdf, served from the content-hash cache"""
+    return get_pdf_cache().extract(pdf_file, max_pages, max_chars)
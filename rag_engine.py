@@ -1,53 +1,486 @@
-from sentence_transformers import SentenceTransformer
-import faiss
+import json
+import os
+import threading
+
 import numpy as np
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# torch / sentence-transformers / faiss are heavy: they are imported on
+# first use, not when this module is imported.
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder():
+    """The shared encoder backend (ENCODER_BACKEND, see encoder_backends)"""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from encoder_backends import create_encoder
+                _encoder = create_encoder(MODEL_NAME)
+    return _encoder
+
+
+def set_encoder(encoder):
+    """Swap the encoder backend (e.g. for benchmarks)"""
+    global _encoder
+    with _encoder_lock:
+        _encoder = encoder
+
+
+def get_model():
+    """The shared SentenceTransformer, loaded on first call"""
+    return get_encoder().model
+
+
+def _encode_uncached(texts):
+    return get_encoder().encode(texts)
+
+
+def encode(texts, normalize=False):
+    """
+    float32 (n, dim) embeddings for a list of texts. Goes through the
+    persistent embedding cache, so known texts are not re-encoded
+    (for a remote encoder, the server's cache does this).
+    """
+    from embedding_cache import get_embedding_cache
+
+    texts = list(texts)
+    encoder = get_encoder()
+    cache = None
+    if not getattr(encoder, "caches_remotely", False):
+        cache = get_embedding_cache(encoder.cache_key)
+    if cache is not None:
+        vecs = cache.encode(texts, _encode_uncached)
+    else:
+        vecs = np.asarray(_encode_uncached(texts), dtype=np.float32)
+
+    if vecs.ndim == 1:
+        vecs = vecs.reshape(1, -1)
+    if normalize:
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        vecs = vecs / np.maximum(norms, 1e-12)
+    return np.ascontiguousarray(vecs, dtype=np.float32)
+
+
+def __getattr__(name):
+    # Keeps `from rag_engine import model` working, without loading at import
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------------- INDEX SELECTION ---------------- #
+
+# Corpus size thresholds for the automatic index choice
+FLAT_MAX = 20_000        # exact search is fast enough below this
+HNSW_MAX = 1_000_000     # graph index up to here, IVF beyond
+
+METRICS = ("l2", "cosine", "ip")
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 16
+ADD_BATCH = 65_536
+
+# Compressed storage: int8 scalar quantization (4x smaller) or product
+# quantization (~32x). Search over codes, then re-rank RERANK_FACTOR * k
+# candidates against full-precision vectors kept on disk.
+COMPRESSIONS = (None, "sq8", "pq")
+PQ_MIN_TRAIN = 39 * 256   # 8-bit PQ needs this many points to train
+RERANK_FACTOR = 4
+
+
+def choose_index_type(n_vectors):
+    """"flat", "hnsw" or "ivf" for a corpus size (VECTOR_INDEX_TYPE overrides)"""
+    forced = os.getenv("VECTOR_INDEX_TYPE")
+    if forced:
+        return forced
+    if n_vectors <= FLAT_MAX:
+        return "flat"
+    if n_vectors <= HNSW_MAX:
+        return "hnsw"
+    return "ivf"
+
+
+def _ivf_nlist(n_vectors):
+    """~4 * sqrt(n) lists, with enough points per list to train (>= 39)"""
+    nlist = min(65_536, max(16, int(4 * np.sqrt(n_vectors))))
+    return max(1, min(nlist, n_vectors // 39))
+
+
+def _pq_m(dim):
+    """Sub-quantizer count: ~8 dimensions each (48 bytes for MiniLM's 384)"""
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+
+
+def _compressed_index(dim, n_vectors, faiss_metric, index_type, compression):
+    import faiss
+
+    codes = "SQ8" if compression == "sq8" else f"PQ{_pq_m(dim)}x8"
+
+    if index_type == "flat":
+        spec = codes
+    elif index_type == "hnsw":
+        spec = f"HNSW{HNSW_M}_{codes.replace('x8', '')}"
+    elif index_type == "ivf":
+        spec = f"IVF{_ivf_nlist(n_vectors)},{codes}"
+    else:
+        raise ValueError(f"Unknown index type: {index_type!r}")
+
+    index = faiss.index_factory(dim, spec, faiss_metric)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    if hasattr(index, "nprobe"):
+        index.nprobe = min(index.nlist, IVF_NPROBE)
+    return index
+
+
+def make_index(dim, n_vectors, metric="l2", index_type="auto", compression=None):
+    """Empty (possibly untrained) faiss index for the corpus size"""
+    import faiss
+
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {COMPRESSIONS}, got {compression!r}")
+    if index_type == "auto":
+        index_type = choose_index_type(n_vectors)
+
+    faiss_metric = faiss.METRIC_L2 if metric == "l2" else faiss.METRIC_INNER_PRODUCT
+
+    if compression == "pq" and n_vectors < PQ_MIN_TRAIN:
+        print(f"Only {n_vectors} vectors: too few to train PQ, using sq8")
+        compression = "sq8"
+    if compression:
+        return _compressed_index(dim, n_vectors, faiss_metric, index_type, compression)
+
+    if index_type == "flat":
+        return faiss.IndexFlat(dim, faiss_metric)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss_metric)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    if index_type == "ivf":
+        nlist = _ivf_nlist(n_vectors)
+        quantizer = faiss.IndexFlat(dim, faiss_metric)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss_metric)
+        index.nprobe = min(nlist, IVF_NPROBE)
+        return index
+
+    raise ValueError(f"Unknown index type: {index_type!r}")
+
+
+def fill_index(index, embeddings, seed=0, ids=None):
+    """
+    Train (IVF / quantizers) on a sample, then add in bounded batches
+    (with explicit int64 ids for ID-mapped indexes)
+    """
+    if not index.is_trained:
+        n_train = min(len(embeddings), max(64 * getattr(index, "nlist", 0), 100_000))
+        rng = np.random.default_rng(seed)
+        sample = embeddings[np.sort(rng.choice(len(embeddings), n_train, replace=False))]
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+
+    for start in range(0, len(embeddings), ADD_BATCH):
+        batch = np.ascontiguousarray(embeddings[start:start + ADD_BATCH], dtype=np.float32)
+        if ids is None:
+            index.add(batch)
+        else:
+            index.add_with_ids(batch, np.ascontiguousarray(ids[start:start + ADD_BATCH], dtype=np.int64))
+    return index
+
+
+def _prepare(vectors, metric):
+    """float32, 2D, contiguous; unit length for cosine"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def _index_metric(index):
+    """Metric of an index built here: inner-product indexes are cosine"""
+    import faiss
+
+    return "l2" if index.metric_type == faiss.METRIC_L2 else "cosine"
+
+
+# ---------------- VECTOR STORE ---------------- #
 
-def build_vector_store(text_chunks):
+def build_vector_store(text_chunks, metric="l2", index_type="auto", path=None,
+                       compression=None):
+    """
+    Encode chunks and index them. The index type follows the corpus size
+    (flat / HNSW / IVF, see choose_index_type). metric is "l2", "cosine"
+    (unit vectors + inner product) or "ip" (raw inner product).
+    compression ("sq8" / "pq") stores quantized codes in the index; pass
+    the returned embeddings (or load_vectors(path)) as `vectors` to
+    retrieve_many to re-rank with full precision. With path, the index,
+    chunks and full-precision vectors are saved for load_vector_store.
+    """
     # Check if text_chunks is empty
     if not text_chunks or len(text_chunks) == 0:
         raise ValueError("text_chunks cannot be empty")
     
-    # Encode the text chunks
-    embeddings = model.encode(text_chunks)
-    
-    # Convert to float32 numpy array (CRITICAL for FAISS)
-    embeddings = np.array(embeddings, dtype=np.float32)
-    
-    # Ensure it's 2D array
-    if embeddings.ndim == 1:
-        embeddings = embeddings.reshape(1, -1)
+    # Encode the text chunks (cached across sessions)
+    embeddings = _prepare(encode(text_chunks), metric)
     
     print(f"Embeddings shape: {embeddings.shape}")
-    print(f"Embeddings dtype: {embeddings.dtype}")
     
-    # Create FAISS index
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
+    index = make_index(embeddings.shape[1], len(embeddings), metric, index_type, compression)
+    fill_index(index, embeddings)
     
-    # Ensure embeddings are contiguous float32 (required by FAISS) then add
-    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
-    index.add(embeddings) #ignore
-
+    print(f"Index size: {index.ntotal} ({type(index).__name__}, {metric})")
     
-    print(f"Index size: {index.ntotal}")  # Should show number of vectors added
+    if path:
+        save_vector_store(path, index, text_chunks, metric, vectors=embeddings)
+        # Sparse side of hybrid retrieval, built over the same chunk offsets
+        from bm25 import BM25Index
+        BM25Index.build(text_chunks).save(os.path.join(path, "bm25"))
     
     return index, embeddings
 
-def retrieve(query, text_chunks, index, k=5):
-    q_embedding = model.encode([query])
-    q_embedding = np.array(q_embedding, dtype=np.float32)
-    
-    # Ensure 2D shape
-    if q_embedding.ndim == 1:
-        q_embedding = q_embedding.reshape(1, -1)
-    
-    # Make contiguous
-    q_embedding = np.ascontiguousarray(q_embedding, dtype=np.float32)
-    
-    _, indices = index.search(q_embedding, k)
-    return [text_chunks[i] for i in indices[0]]
+
+def save_vector_store(path, index, text_chunks, metric="l2", vectors=None):
+    """
+    Write index.faiss, chunks.jsonl, optionally vectors.f32 (full
+    precision, for re-ranking) and meta.json (last, atomically), so a
+    reader never sees a meta.json without its index.
+    """
+    import faiss
+
+    os.makedirs(path, exist_ok=True)
+
+    if vectors is not None:
+        tmp = os.path.join(path, "vectors.f32.tmp")
+        np.ascontiguousarray(vectors, dtype=np.float32).tofile(tmp)
+        os.replace(tmp, os.path.join(path, "vectors.f32"))
+
+    tmp = os.path.join(path, "index.faiss.tmp")
+    faiss.write_index(index, tmp)
+    os.replace(tmp, os.path.join(path, "index.faiss"))
+
+    tmp = os.path.join(path, "chunks.jsonl.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for chunk in text_chunks:
+            f.write(json.dumps(chunk) + "\n")
+    os.replace(tmp, os.path.join(path, "chunks.jsonl"))
+
+    tmp = os.path.join(path, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": MODEL_NAME,
+            "metric": metric,
+            "index_type": type(index).__name__,
+            "dim": index.d,
+            "ntotal": index.ntotal,
+            "vectors": vectors is not None,
+        }, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+def load_vector_store(path, mmap=True):
+    """
+    (index, text_chunks, meta) saved by save_vector_store. With mmap the
+    index data is memory-mapped read-only instead of loaded into RAM
+    (falls back to a normal read for index types faiss can't map).
+    """
+    import faiss
+
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    index_file = os.path.join(path, "index.faiss")
+    if mmap:
+        try:
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            index = faiss.read_index(index_file)
+    else:
+        index = faiss.read_index(index_file)
+
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    if hasattr(index, "nprobe"):
+        index.nprobe = min(index.nlist, IVF_NPROBE)
+
+    with open(os.path.join(path, "chunks.jsonl"), encoding="utf-8") as f:
+        text_chunks = [json.loads(line) for line in f]
+
+    return index, text_chunks, meta
+
+
+def load_bm25(path):
+    """BM25 index saved next to the vector store, or None"""
+    from bm25 import BM25Index
+
+    bm25_path = os.path.join(path, "bm25")
+    if not os.path.exists(os.path.join(bm25_path, "vocab.json")):
+        return None
+    return BM25Index.load(bm25_path)
+
+
+def load_vectors(path):
+    """Full-precision vectors saved with the store (memory-mapped), or None"""
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if not meta.get("vectors"):
+        return None
+    return np.memmap(
+        os.path.join(path, "vectors.f32"),
+        dtype=np.float32,
+        mode="r",
+        shape=(meta["ntotal"], meta["dim"])
+    )
+
+
+# ---------------- SEARCH ---------------- #
+
+def _exact_scores(q, candidates, metric):
+    """Higher-is-better scores of candidate rows against one query"""
+    if metric == "l2":
+        return -((candidates - q) ** 2).sum(axis=1)
+    return candidates @ q
+
+
+def search_index(q_embeddings, index, k, metric, vectors=None, rerank=RERANK_FACTOR):
+    """
+    (scores, ids) for prepared query vectors, higher score first, -1 ids
+    for missing results. With full-precision `vectors`, rerank * k
+    candidates are fetched from the (compressed) index and re-scored
+    exactly.
+    """
+    k = min(k, index.ntotal)
+    n_candidates = min(index.ntotal, k * rerank) if vectors is not None else k
+
+    distances, indices = index.search(q_embeddings, n_candidates)
+    scores = -distances if metric == "l2" else distances
+
+    if vectors is None:
+        return scores, indices
+
+    out_scores = np.full((len(indices), k), -np.inf, dtype=np.float32)
+    out_ids = np.full((len(indices), k), -1, dtype=np.int64)
+
+    for row, (q, ids) in enumerate(zip(q_embeddings, indices)):
+        ids = ids[ids >= 0]
+        if not len(ids):
+            continue
+        # Sorted reads are sequential on the memory-mapped file
+        ids = np.sort(ids)
+        exact = _exact_scores(q, np.asarray(vectors[ids]), metric)
+        top = np.argsort(-exact, kind="stable")[:k]
+        out_scores[row, :len(top)] = exact[top]
+        out_ids[row, :len(top)] = ids[top]
+
+    return out_scores, out_ids
+
+
+def retrieve_many(queries, text_chunks, index, k=5, metric=None, vectors=None,
+                  rerank=RERANK_FACTOR):
+    """
+    Top-k chunks for every query: one batched encode and one index.search.
+    k is clamped to index.ntotal and missing results (-1) are dropped.
+    Pass full-precision `vectors` to re-rank results of a compressed index.
+
+    Returns, per query, a list of {"offset", "score", "chunk"} best first.
+    score is higher-is-better: the similarity for inner-product indexes,
+    the negated squared L2 distance for L2 indexes.
+    """
+    queries = list(queries)
+    k = min(k, index.ntotal)
+    if not queries or k <= 0:
+        return [[] for _ in queries]
+
+    metric = metric or _index_metric(index)
+    q_embeddings = _prepare(encode(queries), metric)
+
+    distances, indices = search_index(q_embeddings, index, k, metric, vectors, rerank)
+
+    results = []
+    for row_scores, row_ids in zip(distances, indices):
+        results.append([
+            {"offset": int(i), "score": float(score), "chunk": text_chunks[i]}
+            for score, i in zip(row_scores, row_ids)
+            if i >= 0
+        ])
+    return results
+
+
+def retrieve(query, text_chunks, index, k=5, metric=None, vectors=None):
+    """Top-k chunks for one query (metric defaults to the index's own)"""
+    hits = retrieve_many([query], text_chunks, index, k, metric, vectors)[0]
+    return [hit["chunk"] for hit in hits]
+
+# ---------------- HYBRID ---------------- #
+
+RRF_K = 60
+HYBRID_CANDIDATES = 50
+
+
+def rrf_fuse(rankings, k, rrf_k=RRF_K):
+    """
+    Reciprocal-rank fusion: sum of 1 / (rrf_k + rank) over rankings.
+    rankings: lists of ids, best first. Returns [(id, score)] top-k.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def hybrid_retrieve_many(queries, text_chunks, index, bm25, k=5, metric=None,
+                         candidates=HYBRID_CANDIDATES, vectors=None, rrf_k=RRF_K):
+    """
+    Dense (faiss) + sparse (BM25) retrieval fused by reciprocal rank.
+    BM25 catches exact tech tokens ("C++", "k8s", versions) that MiniLM
+    blurs. Both sides fetch `candidates` hits per query; results have the
+    same shape as retrieve_many, with the RRF score plus each side's rank
+    (None when that side missed the chunk).
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+
+    metric = metric or _index_metric(index)
+    q_embeddings = _prepare(encode(queries), metric)
+    _, dense_ids = search_index(q_embeddings, index, candidates, metric, vectors)
+    _, sparse_ids = bm25.search_many(queries, candidates)
+
+    results = []
+    for dense_row, sparse_row in zip(dense_ids, sparse_ids):
+        dense = [int(i) for i in dense_row if i >= 0]
+        sparse = [int(i) for i in sparse_row if i >= 0]
+        dense_rank = {doc: r for r, doc in enumerate(dense, 1)}
+        sparse_rank = {doc: r for r, doc in enumerate(sparse, 1)}
+
+        results.append([
+            {
+                "offset": doc,
+                "score": score,
+                "chunk": text_chunks[doc],
+                "dense_rank": dense_rank.get(doc),
+                "sparse_rank": sparse_rank.get(doc),
+            }
+            for doc, score in rrf_fuse([dense, sparse], k, rrf_k)
+        ])
+    return results
+
 
 # TEST IT
 if __name__ == "__main__":
@@ -57,5 +490,9 @@ if __name__ == "__main__":
         index, emb = build_vector_store(texts)
         results = retrieve("coding", texts, index, k=2)
         print(f"Results: {results}")
+        
+        # k larger than the corpus is clamped
+        for query, hits in zip(["coding", "search"], retrieve_many(["coding", "search"], texts, index, k=10)):
+            print(f"{query}: {[(h['offset'], round(h['score'], 3)) for h in hits]}")
     except Exception as e:
         print(f"ERROR: {type(e).__name__}: {e}")
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Disk-backed cache for LLM responses.
+
+generate_enhanced_resume takes 30-60 s and spends API quota, so a
+response is cached under a hash of everything that determines it
+(resume text, JD text, prompt template version, models and generation
+config) and served again for an identical request.
+
+    RESPONSE_CACHE=0             disable
+    RESPONSE_CACHE_DIR           default data/response_cache
+    RESPONSE_CACHE_TTL           seconds an entry stays valid (default 7 days)
+    RESPONSE_CACHE_MAX_MB        total size bound; least recently used
+                                 entries are removed first
+
+Concurrent identical requests in this process (every Streamlit session)
+are single-flighted: one caller makes the upstream call, the others wait
+for and reuse its result, or its failure. refresh=True skips the lookup
+and replaces the cached response (a "generate again" click).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "data",
+    "response_cache"
+)
+
+TTL = float(os.getenv("RESPONSE_CACHE_TTL", 7 * 24 * 3600))
+MAX_BYTES = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", 50)) * 1024 * 1024)
+
+
+class _Flight:
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def response_key(*parts):
+    """SHA-256 over the JSON encoding of everything that shapes a response"""
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+
+    def __init__(self, path=DEFAULT_DIR, ttl=TTL, max_bytes=MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._in_flight = {}   # key -> _Flight
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    # ---------------- LOOKUP ---------------- #
+
+    def get(self, key):
+        """Cached response, or None if missing or expired"""
+        path = self._file(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.utime(path)   # recency for eviction
+        except OSError:
+            pass
+        return entry.get("response")
+
+    def put(self, key, response, **meta):
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            tmp = self._file(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "response": response, **meta}, f)
+            os.replace(tmp, self._file(key))
+            self._prune()
+        except OSError as e:
+            print(f"Response cache write failed: {e}")
+
+    def get_or_compute(self, key, compute, refresh=False, **meta):
+        """
+        Cached response for key, else compute() once for all concurrent
+        callers. If compute() raises, nothing is cached and every caller
+        waiting on that call gets the same exception instead of retrying.
+        """
+        if not refresh:
+            response = self.get(key)   # disk read outside the lock
+            if response is not None:
+                with self._lock:
+                    self.hits += 1
+                return response
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+
+        if not leader:
+            # Someone else is making this exact call: share its outcome
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self.hits += 1
+            return flight.response
+
+        try:
+            # A flight may have finished between our lookup and the lock
+            response = None if refresh else self.get(key)
+            if response is None:
+                with self._lock:
+                    self.misses += 1
+                response = compute()
+                self.put(key, response, **meta)
+            flight.response = response
+            return response
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    # ---------------- EVICTION ---------------- #
+
+    def _prune(self):
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.path):
+            if not (entry.name.endswith(".json") and entry.is_file()):
+                continue
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        files.sort()   # least recently used first
+        for mtime, size, path in files:
+            # mtime >= created, so an entry untouched for ttl is expired
+            if total <= self.max_bytes and now - mtime <= self.ttl:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        if not os.path.isdir(self.path):
+            return
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".json"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+# ---------------- SHARED INSTANCE ---------------- #
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide cache, or None when RESPONSE_CACHE=0"""
+    global _cache
+    if os.getenv("RESPONSE_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(os.getenv("RESPONSE_CACHE_DIR") or DEFAULT_DIR)
+    return _cache
@@ -1,20 +1,145 @@
-import google.generativeai as genai
 import os
+import threading
 from dotenv import load_dotenv
 
+from instrumentation import span, timed
+from response_cache import get_response_cache, response_key
+
 load_dotenv()
 
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not found in .env file")
+# Bump whenever the enhancement prompt template changes, so cached
+# responses to the old prompt are no longer served
+PROMPT_VERSION = 1
+
+# Updated model list for 2024-2025 Gemini API
+MODEL_PRIORITY = [
+    "models/gemini-2.5-flash",      # Latest and fastest
+    "models/gemini-flash-latest",   # Auto-updates to latest
+    "models/gemini-2.5-pro",        # More powerful
+    "models/gemini-2.0-flash",              # Stable pro version,        # Experimental 2.0 (if available)
+]
+
+GENERATION_CONFIG = dict(
+    temperature=0.85,  # Balance creativity and consistency
+    max_output_tokens=8000,
+    top_p=0.95,
+    top_k=40
+)
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+class EnhancementFailed(Exception):
+    """No model produced a usable resume; args[0] is the last error"""
+
+
+def get_genai():
+    """
+    google.generativeai, imported and configured on first use so that
+    importing this module (and starting the app) stays cheap.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY not found in .env file")
+
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
+
+
+def _call_gemini(prompt, resume_text):
+    """
+    Try each model in MODEL_PRIORITY until one returns a usable resume.
+    Returns (enhanced, None) or (None, last_error).
+    """
+    model_priority = MODEL_PRIORITY
+    
+    last_error = None
+    
+    try:
+        genai = get_genai()
+    except (ImportError, ValueError) as e:
+        print(f"❌ Gemini unavailable: {e}")
+        last_error = e
+        model_priority = []  # fall through to the troubleshooting message
+    
+    for model_name in model_priority:
+        try:
+            print(f"🔄 Trying model: {model_name}")
+            model = genai.GenerativeModel(model_name)
+            
+            with span("enhance.gemini_call"):
+                response = model.generate_content(
+                    prompt,
+                    generation_config=genai.types.GenerationConfig(**GENERATION_CONFIG)
+                )
+            
+            enhanced = response.text.strip()
+            
+            # Validation checks
+            if len(enhanced) < 100:
+                print(f"⚠️ {model_name}: Output too short ({len(enhanced)} chars)")
+                continue
+                
+            # Check for actual enhancement (should be significantly longer)
+            if len(enhanced) < len(resume_text) * 0.8:
+                print(f"⚠️ {model_name}: Insufficient enhancement (only {len(enhanced)} vs {len(resume_text)} chars)")
+                continue
+            
+            # Success!
+            print(f"✅ SUCCESS using {model_name}")
+            print(f"📊 Original: {len(resume_text)} chars → Enhanced: {len(enhanced)} chars ({len(enhanced)/len(resume_text)*100:.0f}% of original)")
+            
+            # Add quality marker
+            enhancement_ratio = len(enhanced) / len(resume_text)
+            if enhancement_ratio >= 1.4:
+                quality = "🌟 EXCELLENT"
+            elif enhancement_ratio >= 1.2:
+                quality = "✅ GOOD"
+            else:
+                quality = "⚠️ MODERATE"
+            
+            print(f"🎯 Enhancement Quality: {quality}")
+            
+            return enhanced, None
+            
+        except Exception as e:
+            error_msg = str(e)
+            last_error = e
+            print(f"❌ {model_name} failed: {error_msg[:200]}")
+            
+            # Specific error handling
+            if "quota" in error_msg.lower():
+                print("💡 TIP: API quota exceeded. Wait a few minutes or upgrade your API plan.")
+            elif "not found" in error_msg.lower() or "404" in error_msg:
+                print(f"💡 TIP: Model {model_name} not available. Trying next...")
+                continue
+            elif "api key" in error_msg.lower():
+                print("💡 TIP: Check your GEMINI_API_KEY in .env file")
+                break
+            
+            continue
+    
+    return None, last_error
 
-genai.configure(api_key=api_key)
 
-def generate_enhanced_resume(resume_text, jd_text):
+@timed("enhance.generate")
+def generate_enhanced_resume(resume_text, jd_text, force=False):
     """
     Generate a HIGHLY ENHANCED and ATS-optimized resume targeting 75-95% ATS match score.
     Uses aggressive keyword integration and strategic content enhancement.
+    Accepts text or ResumeProfile / JDProfile.
+    An identical request is served from the response cache; force=True
+    asks Gemini for a fresh version and caches that one instead.
     """
+    resume_text = getattr(resume_text, "text", resume_text)
+    jd_text = getattr(jd_text, "text", jd_text)
     
     prompt = f"""
 You are an elite ATS resume optimizer with 15+ years of experience. Your mission is to transform this resume to achieve a MINIMUM 75% ATS match score, targeting 85-95%.
@@ -123,77 +248,30 @@ REMEMBER: The difference between 50% and 75%+ ATS score is AGGRESSIVE keyword in
 Generate the enhanced resume now:
 """
     
-    # Updated model list for 2024-2025 Gemini API
-    model_priority = [
-        "models/gemini-2.5-flash",      # Latest and fastest
-        "models/gemini-flash-latest",   # Auto-updates to latest
-        "models/gemini-2.5-pro",        # More powerful
-        "models/gemini-2.0-flash",              # Stable pro version,        # Experimental 2.0 (if available)
-    ]
-    
-    last_error = None
-    
-    for model_name in model_priority:
-        try:
-            print(f"🔄 Trying model: {model_name}")
-            model = genai.GenerativeModel(model_name)
-            
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.85,  # Balance creativity and consistency
-                    max_output_tokens=8000,
-                    top_p=0.95,
-                    top_k=40
-                )
-            )
-            
-            enhanced = response.text.strip()
-            
-            # Validation checks
-            if len(enhanced) < 100:
-                print(f"⚠️ {model_name}: Output too short ({len(enhanced)} chars)")
-                continue
-                
-            # Check for actual enhancement (should be significantly longer)
-            if len(enhanced) < len(resume_text) * 0.8:
-                print(f"⚠️ {model_name}: Insufficient enhancement (only {len(enhanced)} vs {len(resume_text)} chars)")
-                continue
-            
-            # Success!
-            print(f"✅ SUCCESS using {model_name}")
-            print(f"📊 Original: {len(resume_text)} chars → Enhanced: {len(enhanced)} chars ({len(enhanced)/len(resume_text)*100:.0f}% of original)")
-            
-            # Add quality marker
-            enhancement_ratio = len(enhanced) / len(resume_text)
-            if enhancement_ratio >= 1.4:
-                quality = "🌟 EXCELLENT"
-            elif enhancement_ratio >= 1.2:
-                quality = "✅ GOOD"
-            else:
-                quality = "⚠️ MODERATE"
-            
-            print(f"🎯 Enhancement Quality: {quality}")
-            
-            return enhanced
-            
-        except Exception as e:
-            error_msg = str(e)
-            last_error = e
-            print(f"❌ {model_name} failed: {error_msg[:200]}")
-            
-            # Specific error handling
-            if "quota" in error_msg.lower():
-                print("💡 TIP: API quota exceeded. Wait a few minutes or upgrade your API plan.")
-            elif "not found" in error_msg.lower() or "404" in error_msg:
-                print(f"💡 TIP: Model {model_name} not available. Trying next...")
-                continue
-            elif "api key" in error_msg.lower():
-                print("💡 TIP: Check your GEMINI_API_KEY in .env file")
-                break
-            
-            continue
-    
+    called = []
+
+    def call():
+        called.append(True)
+        enhanced, error = _call_gemini(prompt, resume_text)
+        if enhanced is None:
+            raise EnhancementFailed(error)
+        return enhanced
+
+    try:
+        cache = get_response_cache()
+        if cache is None:
+            return call()
+
+        key = response_key(
+            resume_text, jd_text, PROMPT_VERSION, MODEL_PRIORITY, GENERATION_CONFIG
+        )
+        enhanced = cache.get_or_compute(key, call, refresh=force)
+        if not called:
+            print("✅ Served enhanced resume from response cache")
+        return enhanced
+    except EnhancementFailed as e:
+        last_error = e.args[0]
+
     # All models failed - provide helpful error message
     error_msg = f"""
 ╔════════════════════════════════════════════════════════════╗
@@ -257,22 +335,24 @@ Generate the enhanced resume now:
     return error_msg
 
 
+@timed("enhance.verify")
 def verify_enhancement(original_resume, enhanced_resume, jd_text):
     """
     Verify enhancement quality and provide detailed metrics.
     Returns comprehensive quality report.
+    Accepts text or ResumeProfile / JDProfile.
     """
-    from ats_analyser import extract_all_terms, create_normalized_set
+    from ats_analyser import jd_profile, resume_profile
     
-    # Extract terms
-    jd_terms = extract_all_terms(jd_text)
-    original_terms = extract_all_terms(original_resume)
-    enhanced_terms = extract_all_terms(enhanced_resume)
+    original = resume_profile(original_resume)
+    enhanced = resume_profile(enhanced_resume)
+    original_resume = original.text
+    enhanced_resume = enhanced.text
     
-    # Normalize for comparison
-    jd_normalized = create_normalized_set(jd_terms)
-    original_normalized = create_normalized_set(original_terms)
-    enhanced_normalized = create_normalized_set(enhanced_terms)
+    # Normalized terms for comparison
+    jd_normalized = jd_profile(jd_text).terms_normalized
+    original_normalized = original.terms_normalized
+    enhanced_normalized = enhanced.terms_normalized
     
     # Calculate matches
     original_matches = original_normalized.intersection(jd_normalized)
@@ -322,37 +402,34 @@ def verify_enhancement(original_resume, enhanced_resume, jd_text):
     return quality_report
 
 
+@timed("enhance.priority_keywords")
 def extract_missing_critical_keywords(resume_text, jd_text, top_n=15):
     """
     Extract the most critical missing keywords that should be added.
     Helps users manually enhance their resume.
+    Accepts text or ResumeProfile / JDProfile.
     """
-    from ats_analyser import extract_all_terms, create_normalized_set
-    from collections import Counter
-    import re
-    
-    jd_terms = extract_all_terms(jd_text)
-    resume_terms = extract_all_terms(resume_text)
+    from ats_analyser import jd_profile, resume_profile
+    from keyword_matcher import KeywordMatcher
     
-    jd_normalized = create_normalized_set(jd_terms)
-    resume_normalized = create_normalized_set(resume_terms)
+    jd = jd_profile(jd_text)
     
     # Find missing terms
-    missing = jd_normalized - resume_normalized
+    missing = jd.terms_normalized - resume_profile(resume_text).terms_normalized
     
     # Count frequency in JD (more frequent = more important)
-    jd_text_lower = jd_text.lower()
+    jd_counts = KeywordMatcher(missing).counts(jd.lower)
     term_importance = {}
     
     for term in missing:
         # Count occurrences in JD
-        count = jd_text_lower.count(term.lower())
+        count = jd_counts[term.lower()]
         # Longer terms are often more specific/important
         length_bonus = len(term) / 10
         term_importance[term] = count + length_bonus
     
     # Sort by importance
-    sorted_terms = sorted(term_importance.items(), key=lambda x: x[1], reverse=True)
+    sorted_terms = sorted(term_importance.items(), key=lambda x: (-x[1], x[0]))
     
     # Get top N critical keywords
     critical_keywords = [term for term, score in sorted_terms[:top_n]]
@@ -0,0 +1,316 @@
+"""
+Long-lived, multi-tenant index over every candidate's resume chunks.
+
+One faiss index holds all chunk vectors under external ids (an
+IndexIDMap2 over a flat index, or an IVF index storing the ids itself);
+each vector id maps to a (candidate_id, chunk offset, text) row.
+Candidates can be added, updated and deleted incrementally, and a JD
+query returns candidates ranked by how well their chunks cover the JD's
+requirement lines.
+
+Persistence is crash-safe: save() writes a new generation of files
+(index-<gen>.faiss, chunks-<gen>.jsonl), fsyncs them, then atomically
+replaces meta.json to point at it. A crash at any point leaves the
+previous generation intact.
+"""
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+import rag_engine
+
+FORMAT_VERSION = 1
+
+# Candidate scores average similarities, with 0 for an unmatched line;
+# l2 distances would rank missing lines above real hits
+METRICS = ("cosine", "ip")
+
+MIN_QUERY_WORDS = 3
+MAX_QUERIES = 64
+
+
+def split_lines(text, min_words=MIN_QUERY_WORDS):
+    """Bullet / sentence sized pieces of a resume or JD, deduplicated"""
+    pieces = []
+    for line in re.split(r"[\n•]+|(?<=[.;])\s+", text or ""):
+        line = line.strip(" \t-*·")
+        if len(line.split()) >= min_words:
+            pieces.append(line)
+    return list(dict.fromkeys(pieces))
+
+
+def jd_queries(jd_text):
+    """Requirement-sized query lines from a job description"""
+    return split_lines(jd_text)[:MAX_QUERIES]
+
+
+def _fsync_write(path, write):
+    with open(path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path):
+    """Make a rename durable (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ResumeIndex:
+
+    def __init__(self, path=None, metric="cosine"):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+        self.path = path
+        self.metric = metric
+        self.index = None          # created on first add
+        self.chunks = {}           # chunk id -> (candidate_id, offset, text)
+        self.by_candidate = {}     # candidate_id -> [chunk ids]
+        self.next_id = 0
+        self.generation = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.by_candidate)
+
+    @property
+    def ntotal(self):
+        return self.index.ntotal if self.index is not None else 0
+
+    # ---------------- MUTATIONS ---------------- #
+
+    def _new_index(self, dim, n_vectors=0, index_type="flat"):
+        import faiss
+
+        # HNSW can't remove vectors; large stores use IVF instead
+        if index_type == "auto":
+            index_type = rag_engine.choose_index_type(n_vectors)
+        if index_type == "hnsw":
+            index_type = "ivf"
+        index = rag_engine.make_index(dim, n_vectors, self.metric, index_type)
+
+        if isinstance(index, faiss.IndexIVF):
+            # IVF stores the ids itself and keeps them on remove_ids, which
+            # IndexIDMap2 (built for renumbering flat indexes) does not expect
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)   # reconstruct by id
+            return index
+        return faiss.IndexIDMap2(index)
+
+    def add(self, candidate_id, chunks):
+        """
+        Append chunks to a candidate; returns their ids. chunks is a list
+        of texts, or a resume text which is split with split_lines.
+        """
+        if isinstance(chunks, str):
+            chunks = split_lines(chunks)
+        chunks = [c for c in chunks if c and c.strip()]
+        if not chunks:
+            return []
+
+        vectors = rag_engine._prepare(rag_engine.encode(chunks), self.metric)
+
+        with self._lock:
+            if self.index is None:
+                self.index = self._new_index(vectors.shape[1])
+
+            existing = self.by_candidate.setdefault(candidate_id, [])
+            first_offset = len(existing)
+
+            ids = np.arange(self.next_id, self.next_id + len(chunks), dtype=np.int64)
+            self.index.add_with_ids(vectors, ids)
+            self.next_id += len(chunks)
+
+            for i, (chunk_id, text) in enumerate(zip(ids.tolist(), chunks)):
+                self.chunks[chunk_id] = (candidate_id, first_offset + i, text)
+                existing.append(chunk_id)
+
+            return ids.tolist()
+
+    def delete(self, candidate_id):
+        """Remove a candidate and all of its chunks; returns chunks removed"""
+        with self._lock:
+            ids = self.by_candidate.pop(candidate_id, None)
+            if not ids:
+                return 0
+
+            self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+            for chunk_id in ids:
+                del self.chunks[chunk_id]
+            return len(ids)
+
+    def update(self, candidate_id, chunks):
+        """Replace a candidate's chunks (unchanged texts hit the embedding cache)"""
+        with self._lock:
+            self.delete(candidate_id)
+            return self.add(candidate_id, chunks)
+
+    def rebuild(self, index_type="auto"):
+        """
+        Re-create the underlying index for the current size (e.g. flat ->
+        IVF once the store has grown), keeping all ids.
+        """
+        import faiss
+
+        with self._lock:
+            if not self.ntotal:
+                return
+            if isinstance(self.index, faiss.IndexIDMap2):
+                # The flat index holds row i under id_map[i]
+                ids = faiss.vector_to_array(self.index.id_map).astype(np.int64)
+                vectors = self.index.index.reconstruct_n(0, self.ntotal)
+            else:
+                ids = np.fromiter(sorted(self.chunks), dtype=np.int64, count=len(self.chunks))
+                vectors = self.index.reconstruct_batch(ids)
+
+            index = self._new_index(vectors.shape[1], len(vectors), index_type)
+            rag_engine.fill_index(index, vectors, ids=ids)
+            self.index = index
+
+    # ---------------- QUERY ---------------- #
+
+    def find_candidates(self, jd_text, top_candidates=10, k_chunks=50, queries=None):
+        """
+        Rank candidates for a JD. Every requirement line is searched in
+        one batch; a candidate's score is the mean over lines of its best
+        chunk similarity (0 when none of its chunks is in that line's top
+        k_chunks).
+
+        Returns [{"candidate_id", "score", "coverage", "hits"}], where hits
+        are the best chunk per matched line: {"query", "offset", "chunk", "score"}.
+        """
+        queries = queries or jd_queries(jd_text) or [jd_text]
+
+        with self._lock:
+            if not self.ntotal:
+                return []
+
+            q = rag_engine._prepare(rag_engine.encode(queries), self.metric)
+            scores, ids = rag_engine.search_index(q, self.index, k_chunks, self.metric)
+
+            best = defaultdict(dict)    # candidate -> {query row: (score, chunk id)}
+            for row, (row_scores, row_ids) in enumerate(zip(scores, ids)):
+                for score, chunk_id in zip(row_scores.tolist(), row_ids.tolist()):
+                    if chunk_id < 0:
+                        continue
+                    candidate_id = self.chunks[chunk_id][0]
+                    current = best[candidate_id].get(row)
+                    if current is None or score > current[0]:
+                        best[candidate_id][row] = (score, chunk_id)
+
+            results = []
+            for candidate_id, per_query in best.items():
+                hits = []
+                for row, (score, chunk_id) in sorted(per_query.items()):
+                    _, offset, text = self.chunks[chunk_id]
+                    hits.append({"query": queries[row], "offset": offset, "chunk": text, "score": score})
+
+                results.append({
+                    "candidate_id": candidate_id,
+                    "score": sum(h["score"] for h in hits) / len(queries),
+                    "coverage": len(hits) / len(queries),
+                    "hits": hits,
+                })
+
+        results.sort(key=lambda r: (-r["score"], str(r["candidate_id"])))
+        return results[:top_candidates]
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def save(self, path=None):
+        import faiss
+
+        path = path or self.path
+        os.makedirs(path, exist_ok=True)
+
+        with self._lock:
+            generation = self.generation + 1
+            index_name = f"index-{generation}.faiss"
+            chunks_name = f"chunks-{generation}.jsonl"
+
+            if self.index is not None:
+                data = faiss.serialize_index(self.index)
+                _fsync_write(os.path.join(path, index_name), lambda f: f.write(data.tobytes()))
+
+            def write_chunks(f):
+                for chunk_id, (candidate_id, offset, text) in self.chunks.items():
+                    f.write((json.dumps([chunk_id, candidate_id, offset, text]) + "\n").encode("utf-8"))
+
+            _fsync_write(os.path.join(path, chunks_name), write_chunks)
+
+            meta = {
+                "version": FORMAT_VERSION,
+                "generation": generation,
+                "metric": self.metric,
+                "next_id": self.next_id,
+                "ntotal": self.ntotal,
+                "encoder": rag_engine.get_encoder().cache_key,
+                "index": index_name if self.index is not None else None,
+                "chunks": chunks_name,
+            }
+            tmp = os.path.join(path, "meta.json.tmp")
+            _fsync_write(tmp, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+            os.replace(tmp, os.path.join(path, "meta.json"))
+            _fsync_dir(path)
+
+            self.generation = generation
+            self.path = path
+            self._remove_stale(path, keep={index_name, chunks_name})
+
+    @staticmethod
+    def _remove_stale(path, keep):
+        for name in os.listdir(path):
+            if re.fullmatch(r"(index|chunks)-\d+\.(faiss|jsonl)", name) and name not in keep:
+                try:
+                    os.remove(os.path.join(path, name))
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, path):
+        """Open a saved index, or an empty one if path has none yet"""
+        import faiss
+
+        store = cls(path)
+        meta_file = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_file):
+            return store
+
+        with open(meta_file, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        store = cls(path, meta["metric"])
+        store.next_id = meta["next_id"]
+        store.generation = meta["generation"]
+
+        encoder = rag_engine.get_encoder().cache_key
+        if meta.get("encoder") != encoder:
+            print(f"⚠️ Resume index was built with {meta.get('encoder')}, encoder is now {encoder}")
+
+        if meta["index"]:
+            store.index = faiss.read_index(os.path.join(path, meta["index"]))
+            if isinstance(store.index, faiss.IndexIVF):
+                store.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+        with open(os.path.join(path, meta["chunks"]), encoding="utf-8") as f:
+            for line in f:
+                chunk_id, candidate_id, offset, text = json.loads(line)
+                store.chunks[chunk_id] = (candidate_id, offset, text)
+                store.by_candidate.setdefault(candidate_id, []).append(chunk_id)
+
+        for ids in store.by_candidate.values():
+            ids.sort(key=lambda i: store.chunks[i][1])
+
+        return store
@@ -1,8 +1,154 @@
+"""
+PDF text extraction with page, byte and text budgets.
+
+iter_pages() streams (page number, char offset, text) per page instead of
+building one growing string. Inputs above PDF_MAX_BYTES are rejected,
+only the first PDF_MAX_PAGES pages are read, and extraction stops once
+PDF_MAX_TEXT_CHARS characters have been produced. Documents with at least
+PDF_PARALLEL_MIN_PAGES pages are split across a process pool
+(PDF_WORKERS processes) and still yielded in page order.
+"""
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
 from pypdf import PdfReader
 
-def extract_text_from_pdf(pdf_file):
-    reader = PdfReader(pdf_file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text()
-    return text
+from instrumentation import timed
+
+MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", 20 * 1024 * 1024))
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+MAX_TEXT_CHARS = int(os.getenv("PDF_MAX_TEXT_CHARS", 200_000))
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 16))
+WORKERS = int(os.getenv("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+PAGES_PER_TASK = 4
+
+
+class PageText(NamedTuple):
+    number: int    # 0-based page index
+    offset: int    # character offset of this page in the joined text
+    text: str
+
+
+class PDFTooLarge(ValueError):
+    pass
+
+
+# ---------------- INPUT ---------------- #
+
+def read_pdf_bytes(pdf_file, max_bytes=MAX_BYTES):
+    """Raw bytes from a path, bytes, Streamlit upload or file object"""
+    if isinstance(pdf_file, (bytes, bytearray)):
+        data = bytes(pdf_file)
+    elif isinstance(pdf_file, (str, os.PathLike)):
+        if os.path.getsize(pdf_file) > max_bytes:
+            raise PDFTooLarge(f"PDF exceeds the {max_bytes:,} byte limit")
+        with open(pdf_file, "rb") as f:
+            data = f.read()
+    elif hasattr(pdf_file, "getvalue"):
+        data = pdf_file.getvalue()
+    else:
+        data = pdf_file.read(max_bytes + 1)
+
+    if len(data) > max_bytes:
+        raise PDFTooLarge(f"PDF exceeds the {max_bytes:,} byte limit")
+    return data
+
+
+# ---------------- WORKERS ---------------- #
+
+def _extract_range(path, start, end):
+    """Page texts [start, end) of a PDF on disk (runs in a worker process)"""
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import multiprocessing
+                # spawn: forking a threaded Streamlit server is not safe
+                _pool = ProcessPoolExecutor(
+                    max_workers=WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def _parallel_texts(data, n_pages):
+    """Page texts in order, computed a page range at a time by the pool"""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(data)
+        path = f.name
+
+    pool = _get_pool()
+    # Each task re-opens the PDF, so give it a worthwhile share of pages
+    per_task = max(PAGES_PER_TASK, -(-n_pages // (2 * WORKERS)))
+    ranges = [(s, min(s + per_task, n_pages)) for s in range(0, n_pages, per_task)]
+    in_flight = []
+    try:
+        next_task = 0
+        while next_task < len(ranges) or in_flight:
+            # Keep the pool busy, but never run far ahead of the consumer
+            while next_task < len(ranges) and len(in_flight) < 2 * WORKERS:
+                in_flight.append(pool.submit(_extract_range, path, *ranges[next_task]))
+                next_task += 1
+            yield from in_flight.pop(0).result()
+    finally:
+        # Reached when the caller stops early: drop queued work
+        for future in in_flight:
+            future.cancel()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _serial_texts(reader, n_pages):
+    for i in range(n_pages):
+        yield reader.pages[i].extract_text() or ""
+
+
+# ---------------- EXTRACTION ---------------- #
+
+def iter_pages(pdf_file, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS,
+               max_bytes=MAX_BYTES, parallel=None):
+    """
+    Yield PageText per page, in order, within the page / byte / text
+    budgets (the last page is cut at max_chars). parallel=None uses the
+    process pool for documents of PARALLEL_MIN_PAGES pages or more.
+    """
+    data = read_pdf_bytes(pdf_file, max_bytes)
+    reader = PdfReader(io.BytesIO(data))
+
+    n_pages = min(len(reader.pages), max_pages)
+    if parallel is None:
+        parallel = WORKERS > 1 and n_pages >= PARALLEL_MIN_PAGES
+
+    texts = _parallel_texts(data, n_pages) if parallel else _serial_texts(reader, n_pages)
+
+    offset = 0
+    try:
+        for number, text in enumerate(texts):
+            if offset + len(text) >= max_chars:
+                yield PageText(number, offset, text[:max_chars - offset])
+                return
+            yield PageText(number, offset, text)
+            offset += len(text)
+    finally:
+        texts.close()
+
+
+@timed("pdf.extract")
+def extract_text_from_pdf(pdf_file, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+    return "".join(page.text for page in iter_pages(pdf_file, max_pages, max_chars))
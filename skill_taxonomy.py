@@ -0,0 +1,138 @@
+"""
+Skill / synonym taxonomy.
+
+The taxonomy lives in a versioned JSON data file (data/skill_taxonomy.json
+by default, override with SKILL_TAXONOMY_PATH):
+
+    {"version": "1.0.0", "skills": {"kubernetes": ["k8s", "kube"], ...}}
+
+At load time it is compiled into one flat variant -> canonical dict, so
+normalizing a term is a single hash lookup whatever the taxonomy size.
+The file is re-read when it changes on disk (checked at most every
+RELOAD_INTERVAL seconds).
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "data",
+    "skill_taxonomy.json"
+)
+
+RELOAD_INTERVAL = 5.0
+
+
+# ---------------- COMPILE ---------------- #
+
+class Taxonomy:
+    """Compiled taxonomy: flat variant -> canonical index"""
+
+    def __init__(self, index, version="", source=None, mtime=None, generation=0):
+        self.index = index
+        self.version = version
+        self.source = source
+        self.mtime = mtime
+        # Bumped on every (re)load; use it in cache keys
+        self.generation = generation
+
+    def __len__(self):
+        return len(self.index)
+
+    def normalize(self, term):
+        """Canonical form of an already lowercased/stripped term"""
+        return self.index.get(term, term)
+
+
+def compile_taxonomy(skills):
+    """
+    Build the variant -> canonical index from {canonical: [variants]}.
+    Raises ValueError if a variant is claimed by two canonical skills.
+    """
+    index = {}
+
+    for canon, variants in skills.items():
+        canon = canon.lower().strip()
+        for variant in [canon, *variants]:
+            variant = variant.lower().strip()
+            owner = index.setdefault(variant, canon)
+            if owner != canon:
+                raise ValueError(
+                    f"Taxonomy variant '{variant}' maps to both "
+                    f"'{owner}' and '{canon}'"
+                )
+
+    return index
+
+
+def load_taxonomy(path=None, generation=0):
+    path = path or os.getenv("SKILL_TAXONOMY_PATH") or DEFAULT_PATH
+
+    mtime = os.stat(path).st_mtime
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    return Taxonomy(
+        compile_taxonomy(data["skills"]),
+        version=str(data.get("version", "")),
+        source=path,
+        mtime=mtime,
+        generation=generation
+    )
+
+
+# ---------------- SHARED INSTANCE ---------------- #
+
+_lock = threading.Lock()
+_current = None
+_last_check = 0.0
+
+
+def get_taxonomy():
+    """Current taxonomy (loaded on first use)"""
+    global _current
+    if _current is None:
+        with _lock:
+            if _current is None:
+                _current = load_taxonomy()
+    return _current
+
+
+def reload_taxonomy(path=None):
+    """Force a reload, optionally from a different file"""
+    global _current, _last_check
+    with _lock:
+        generation = _current.generation + 1 if _current else 0
+        _current = load_taxonomy(path or (_current and _current.source), generation)
+        _last_check = time.monotonic()
+    return _current
+
+
+def refresh_taxonomy():
+    """
+    Reload the taxonomy if its file changed on disk.
+    A broken file keeps the previous taxonomy in place.
+    """
+    global _last_check
+    taxonomy = get_taxonomy()
+
+    now = time.monotonic()
+    if now - _last_check < RELOAD_INTERVAL:
+        return taxonomy
+    _last_check = now
+
+    try:
+        changed = os.stat(taxonomy.source).st_mtime != taxonomy.mtime
+    except OSError:
+        return taxonomy
+
+    if changed:
+        try:
+            taxonomy = reload_taxonomy()
+            print(f"Reloaded skill taxonomy v{taxonomy.version} ({len(taxonomy)} terms)")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Skill taxonomy reload failed, keeping v{taxonomy.version}: {e}")
+
+    return taxonomy
@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import ats_analyser
+from ats_analyser import (
+    TFIDF_MAX_FEATURES,
+    ats_score,
+    ats_score_batch,
+    resume_profile,
+    jd_profile,
+    tfidf_similarities,
+)
+from tokenizer import tokenize
+
+JD = """Senior Backend Engineer
+We need Python, Django and PostgreSQL experience, Docker and Kubernetes,
+CI/CD pipelines on AWS, and REST API design. Python testing with pytest."""
+
+RESUMES = [
+    "Python developer. Built Django REST APIs on PostgreSQL, shipped with Docker on AWS.",
+    "Nurse with ICU experience and patient care.",
+    "C++ and node.js engineer; CI/CD with Jenkins; Kubernetes operators in Go.",
+    JD,                     # identical text
+    "a b c",                # only single-character tokens
+    "",
+]
+
+
+def analyzer(text):
+    """Unigrams + bigrams of the shared tokenizer, as TfidfVectorizer would build them"""
+    words = [t for t in tokenize(text).lower if len(t) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def sklearn_similarity(resume, jd):
+    """TF-IDF cosine from a TfidfVectorizer fit on just this pair"""
+    vectorizer = TfidfVectorizer(analyzer=analyzer, max_features=TFIDF_MAX_FEATURES)
+    try:
+        X = vectorizer.fit_transform([resume, jd])
+    except ValueError:   # empty vocabulary
+        return np.nan
+    return float((X[0] @ X[1].T).toarray()[0, 0])
+
+
+def long_text(seed, n_words, vocab_size):
+    """Many distinct words with tied counts, to exercise max_features"""
+    rng = np.random.default_rng(seed)
+    return " ".join(f"term{i}" for i in rng.integers(0, vocab_size, n_words))
+
+
+@pytest.fixture(autouse=True)
+def no_corpus_idf(monkeypatch):
+    monkeypatch.setattr(ats_analyser, "get_idf_model", lambda: None)
+
+
+def similarities(resumes, jd):
+    return tfidf_similarities(
+        [resume_profile(r).ngrams for r in resumes],
+        jd_profile(jd).ngrams
+    )
+
+
+def test_batch_matches_pairwise_sklearn():
+    expected = [sklearn_similarity(r, JD) for r in RESUMES]
+    np.testing.assert_allclose(similarities(RESUMES, JD), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_vocabulary_over_max_features_matches_sklearn():
+    jd = JD + " " + long_text(1, 1200, 2500)
+    resumes = [
+        long_text(2, 3000, 2500),         # joint vocabulary far over 1500
+        RESUMES[0] + " " + long_text(3, 400, 2500),
+        RESUMES[0],                       # small pair in the same batch
+    ]
+    sizes = [len(set(analyzer(r)) | set(analyzer(jd))) for r in resumes]
+    assert sizes[0] > TFIDF_MAX_FEATURES
+
+    expected = [sklearn_similarity(r, jd) for r in resumes]
+    np.testing.assert_allclose(similarities(resumes, jd), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_batch_scores_equal_single_scores():
+    resumes = RESUMES + [long_text(4, 3000, 2500)]
+    assert ats_score_batch(resumes, JD) == [ats_score(r, JD) for r in resumes]
+
+
+SCORE_SCRIPT = """
+import json, sys
+from ats_analyser import ats_score_batch, extract_all_terms
+resumes, jd = json.load(sys.stdin)
+print(json.dumps({
+    "scores": ats_score_batch(resumes, jd),
+    "terms": sorted(extract_all_terms(resumes[0])),
+}))
+"""
+
+
+def score_in_subprocess(hash_seed, resumes, jd):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    env.pop("IDF_MODEL_DIR", None)
+    out = subprocess.run(
+        [sys.executable, "-c", SCORE_SCRIPT],
+        input=json.dumps([resumes, jd]),
+        capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(ats_analyser.__file__)),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_scores_do_not_depend_on_hash_seed():
+    # Long enough that term selection and pruning hit ties
+    resumes = RESUMES[:3] + [long_text(5, 30000, 20000)]
+    runs = [score_in_subprocess(seed, resumes, JD + " " + long_text(6, 500, 800))
+            for seed in (1, 2, 12345)]
+
+    assert runs[0]["scores"][0][1]   # some missing keywords, in order
+    assert runs[0] == runs[1] == runs[2]
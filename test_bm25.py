@@ -0,0 +1,78 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from bm25 import BM25Index, analyze
+from rag_engine import rrf_fuse
+
+DOCS = [
+    "Senior Python developer with Django, PostgreSQL and AWS experience",
+    "C++ engineer building low-latency trading systems on Linux",
+    "DevOps: Kubernetes, Terraform, CI/CD pipelines and AWS",
+    "Frontend developer, React and node.js, some Python scripting",
+    "Data scientist: Python, pandas, scikit-learn, SQL",
+]
+
+
+def brute_force(docs, query, k1=1.5, b=0.75):
+    """BM25 straight from the formula"""
+    terms = [analyze(d) for d in docs]
+    avg = sum(map(len, terms)) / len(terms)
+    scores = []
+    for doc in terms:
+        tf = Counter(doc)
+        score = 0.0
+        for term in set(analyze(query)):
+            df = sum(term in t for t in terms)
+            if not df:
+                continue
+            idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+            f = tf[term]
+            score += idf * f * (k1 + 1) / (f + k1 * (1 - b + b * len(doc) / avg))
+        scores.append(score)
+    return np.array(scores)
+
+
+@pytest.mark.parametrize("query", ["python aws", "C++ linux", "k8s terraform", "rust"])
+def test_scores_match_formula(query):
+    index = BM25Index.build(DOCS)
+    np.testing.assert_allclose(index.scores(query), brute_force(DOCS, query), rtol=1e-5)
+
+
+def test_search_returns_best_first():
+    index = BM25Index.build(DOCS)
+    scores, ids = index.search("python", k=2)
+    expected = brute_force(DOCS, "python")
+
+    assert len(ids) == 2
+    assert list(scores) == sorted(scores, reverse=True)
+    assert set(ids) <= set(np.flatnonzero(expected > 0))
+    assert expected[ids[0]] == expected.max()
+
+
+def test_search_many_pads_missing_hits():
+    index = BM25Index.build(DOCS)
+    scores, ids = index.search_many(["rust", "python"], k=3)
+
+    assert (ids[0] == -1).all()
+    assert (ids[1] >= 0).all()
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    index = BM25Index.build(DOCS)
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path), mmap=mmap)
+
+    assert loaded.vocab == index.vocab
+    for query in ("python aws", "react node.js"):
+        np.testing.assert_array_equal(loaded.scores(query), index.scores(query))
+
+
+def test_rrf_fuse_rewards_agreement():
+    fused = rrf_fuse([[1, 2, 3], [3, 1, 4]], k=3, rrf_k=60)
+
+    assert [doc for doc, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
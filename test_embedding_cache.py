@@ -0,0 +1,134 @@
+import hashlib
+import threading
+
+import numpy as np
+import pytest
+
+from embedding_cache import EmbeddingCache
+
+DIM = 8
+
+
+def vector(text):
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+class Encoder:
+    """Deterministic encode_fn that records what it was asked to encode"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.vstack([vector(t) for t in texts])
+
+    @property
+    def encoded(self):
+        return [t for call in self.calls for t in call]
+
+
+@pytest.fixture
+def caches(tmp_path):
+    opened = []
+
+    def open_cache(**kw):
+        cache = EmbeddingCache("test-model", path=str(tmp_path), **kw)
+        opened.append(cache)
+        return cache
+
+    yield open_cache
+    for cache in opened:
+        cache.close()
+
+
+def expected(texts):
+    return np.vstack([vector(t) for t in texts])
+
+
+def test_hits_are_not_re_encoded(caches):
+    cache, fn = caches(), Encoder()
+    assert np.array_equal(cache.encode(["a", "b", "a"], fn), expected(["a", "b", "a"]))
+    assert np.array_equal(cache.encode(["b", "c"], fn), expected(["b", "c"]))
+    assert fn.encoded == ["a", "b", "c"]
+    assert (cache.hits, cache.misses) == (1, 3)   # the repeated "a" in a batch is one miss
+
+
+def test_persists_across_reopen(caches):
+    cache = caches()
+    cache.encode(["a", "b"], Encoder())
+    cache.close()
+
+    reopened, fn = caches(), Encoder()
+    assert reopened.writer
+    assert np.array_equal(reopened.encode(["b", "a"], fn), expected(["b", "a"]))
+    assert fn.calls == []
+
+
+def test_lru_eviction(caches):
+    cache, fn = caches(max_entries=3), Encoder()
+    cache.encode(["a", "b", "c"], fn)
+    cache.encode(["a"], fn)          # a is now the most recent
+    cache.encode(["d"], fn)          # evicts b
+
+    assert len(cache) == 3
+    fn.calls.clear()
+    assert np.array_equal(cache.encode(["a", "c", "d", "b"], fn), expected(["a", "c", "d", "b"]))
+    assert fn.encoded == ["b"]
+
+
+def test_second_process_is_read_only(caches):
+    writer, reader = caches(), caches()
+    assert writer.writer and not reader.writer
+
+    writer.encode(["a"], Encoder())
+    fn = Encoder()
+    assert np.array_equal(reader.encode(["a", "z"], fn), expected(["a", "z"]))
+    assert fn.encoded == ["z"]       # a came from the writer's files
+    assert len(writer) == 1          # the reader stored nothing
+
+
+def test_reader_never_serves_a_reused_slot(caches):
+    writer, reader = caches(max_entries=1), caches(max_entries=1)
+    writer.encode(["a"], Encoder())
+    reader.encode(["a"], Encoder())  # reader now maps a -> slot 0
+
+    writer.encode(["b"], Encoder())  # evicts a, b reuses slot 0
+    fn = Encoder()
+    assert np.array_equal(reader.encode(["a"], fn), expected(["a"]))
+    assert fn.encoded == ["a"]
+
+
+def test_reader_takes_over_when_writer_closes(caches):
+    writer, reader = caches(), caches()
+    writer.encode(["a"], Encoder())
+    writer.close()
+
+    reader.encode(["b"], Encoder())
+    assert reader.writer
+    assert len(reader) == 2
+
+
+def test_concurrent_encode_with_eviction(caches):
+    cache = caches(max_entries=8)
+    texts = [f"text {i}" for i in range(32)]
+    errors = []
+
+    def worker(seed):
+        rng = np.random.default_rng(seed)
+        try:
+            for _ in range(200):
+                batch = list(rng.choice(texts, size=3))
+                assert np.array_equal(cache.encode(batch, Encoder()), expected(batch))
+        except Exception as e:   # surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(cache) <= 8
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+import embedding_cache
+import rag_engine
+from embedding_cache import EmbeddingCache
+from encoder_server import EncoderServer, RemoteEncoder
+
+
+class FakeEncoder:
+    name = "fake"
+    cache_key = "fake-model"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        texts = list(texts)
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def server(tmp_path):
+    # Unix socket paths are limited to ~100 chars: keep it short
+    sock_dir = tempfile.mkdtemp(prefix="enc")
+    sock = os.path.join(sock_dir, "s")
+    encoder = FakeEncoder()
+    cache = EmbeddingCache(encoder.cache_key, path=str(tmp_path))
+    srv = EncoderServer(sock, encoder, window_ms=20, cache=cache)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+    yield srv, RemoteEncoder(sock)
+
+    srv.shutdown()
+    srv.server_close()
+    cache.close()
+    os.remove(sock)
+    os.rmdir(sock_dir)
+
+
+def test_remote_encode_round_trip(server):
+    srv, client = server
+    vecs = client.encode(["abc", "banana"])
+    assert np.array_equal(vecs, FakeEncoder().encode(["abc", "banana"]))
+    assert client.cache_key == "fake-model"
+    assert client.info()["cached"]
+
+
+def test_server_cache_serves_repeats(server):
+    srv, client = server
+    client.encode(["abc", "banana"])
+    client.encode(["banana", "cherry"])
+    assert srv.encoder.encoded == ["abc", "banana", "cherry"]
+
+
+def test_concurrent_clients_are_batched(server):
+    srv, client = server
+    results = {}
+
+    def call(i):
+        results[i] = client.encode([f"text {i}"])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(np.array_equal(results[i], FakeEncoder().encode([f"text {i}"])) for i in range(8))
+    assert srv.batcher.batches < 8
+
+
+def test_rag_engine_skips_client_cache_for_remote(server, monkeypatch):
+    srv, client = server
+
+    def no_client_cache(name):
+        raise AssertionError("workers must not open an embedding cache")
+
+    monkeypatch.setattr(embedding_cache, "get_embedding_cache", no_client_cache)
+    previous = rag_engine._encoder
+    rag_engine.set_encoder(client)
+    try:
+        vecs = rag_engine.encode(["abc"])
+    finally:
+        rag_engine.set_encoder(previous)
+    assert np.array_equal(vecs, FakeEncoder().encode(["abc"]))
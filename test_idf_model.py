@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+import idf_model
+from ats_analyser import jd_profile, ngram_counts, resume_profile, tfidf_similarities
+from idf_model import IDFModel, set_idf_model
+from tokenizer import tokenize
+
+CORPUS = [
+    "Python developer with Django",
+    "Python data engineer with Spark",
+    "Python and Go backend developer",
+    "Kubernetes platform engineer",
+]
+
+
+@pytest.fixture(autouse=True)
+def no_shared_model(monkeypatch):
+    # set_idf_model() in a test must not leak into other tests
+    monkeypatch.setattr(idf_model, "_model", None)
+    monkeypatch.setattr(idf_model, "_loaded", True)
+
+
+def test_document_frequencies_and_idf():
+    model = IDFModel.from_documents(CORPUS)
+
+    df = dict(zip(model.vocab, model.df))
+    assert model.n_docs == 4
+    assert df["python"] == 3 and df["kubernetes"] == 1
+    assert df["python developer"] == 1
+    np.testing.assert_allclose(
+        model.idf_of(["python", "kubernetes", "never seen"]),
+        [np.log(5 / 4) + 1, np.log(5 / 2) + 1, np.log(5) + 1]
+    )
+
+
+def test_update_matches_building_at_once():
+    model = IDFModel.from_documents(CORPUS[:2])
+    model.update(CORPUS[2:])
+    full = IDFModel.from_documents(CORPUS)
+
+    assert model.vocab == full.vocab
+    np.testing.assert_array_equal(model.df, full.df)
+    np.testing.assert_allclose(model.idf, full.idf)
+
+
+def test_profiles_count_like_texts():
+    by_text = IDFModel.from_documents(CORPUS)
+    by_profile = IDFModel.from_documents(resume_profile(d) for d in CORPUS)
+    np.testing.assert_array_equal(by_text.df, by_profile.df)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    model = IDFModel.from_documents(CORPUS)
+    model.save(str(tmp_path))
+    loaded = IDFModel.load(str(tmp_path), mmap=mmap)
+
+    assert loaded.vocab == model.vocab
+    assert loaded.n_docs == model.n_docs
+    assert isinstance(loaded.idf, np.memmap) == mmap
+    np.testing.assert_array_equal(loaded.df, model.df)
+    np.testing.assert_allclose(loaded.idf, model.idf)
+
+
+def test_update_after_mmap_load_and_resave(tmp_path):
+    IDFModel.from_documents(CORPUS[:2]).save(str(tmp_path))
+    model = IDFModel.load(str(tmp_path))
+    model.update(CORPUS[2:])
+    model.save(str(tmp_path))   # over the files it was mapped from
+
+    loaded = IDFModel.load(str(tmp_path))
+    full = IDFModel.from_documents(CORPUS)
+    assert loaded.vocab == full.vocab
+    np.testing.assert_array_equal(loaded.df, full.df)
+
+
+def test_get_idf_model_loads_from_env(tmp_path, monkeypatch):
+    IDFModel.from_documents(CORPUS).save(str(tmp_path))
+    monkeypatch.setenv("IDF_MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(idf_model, "_loaded", False)
+
+    assert idf_model.get_idf_model().n_docs == 4
+
+
+def counts(text):
+    return ngram_counts(tokenize(text).lower)
+
+
+def test_similarity_uses_the_corpus_idf():
+    jd = counts("python kubernetes")
+    common = counts("python")          # shares a term most documents have
+    rare = counts("kubernetes")        # shares a rare term
+    pair = tfidf_similarities([common, rare], jd)
+
+    # Without a model the two are symmetric
+    assert pair[0] == pytest.approx(pair[1])
+
+    model = IDFModel.from_documents(CORPUS)
+    set_idf_model(model)
+    corpus = tfidf_similarities([common, rare], jd)
+    assert corpus[1] > corpus[0]
+
+    # cosine of [idf(python), idf(kubernetes), idf("python kubernetes")]
+    # weighted JD with the single shared term
+    idf = model.idf_of(["python", "kubernetes", "python kubernetes"])
+    expected = idf[1] / np.linalg.norm(idf)
+    assert corpus[1] == pytest.approx(expected)
+
+    # An explicit model takes precedence over the process-wide one
+    other = IDFModel.from_documents(["kubernetes"] * 3 + ["python"])
+    explicit = tfidf_similarities([common, rare], jd, idf_model=other)
+    assert explicit[0] > explicit[1]
+
+
+def test_score_changes_with_a_model():
+    resume = resume_profile("Kubernetes operators in Go")
+    jd = jd_profile("Python and Kubernetes engineer")
+
+    without = tfidf_similarities([resume.ngrams], jd.ngrams)[0]
+    set_idf_model(IDFModel.from_documents(CORPUS))
+    assert tfidf_similarities([resume.ngrams], jd.ngrams)[0] != pytest.approx(without)
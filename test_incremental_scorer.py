@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from ats_analyser import TERM_COUNT_CAPACITY, ats_score, count_terms, resume_profile
+from incremental_scorer import IncrementalScorer
+
+JD = """Backend Engineer
+Requirements: Python, Django, PostgreSQL, Docker, Kubernetes, AWS.
+Experience with REST APIs, CI/CD and machine learning pipelines is a plus."""
+
+RESUME = """Jane Doe
+Software Engineer
+
+Experience
+Built REST APIs in Python and Flask
+Deployed services with Docker on AWS
+
+Skills
+Python, SQL, Git"""
+
+
+def long_resume(seed=0, n_lines=1500):
+    """Enough distinct n-grams that ats_score prunes its term counts"""
+    rng = np.random.default_rng(seed)
+    words = [f"skill{i}" for i in range(6000)] + ["python", "docker", "aws"]
+    return "\n".join(" ".join(rng.choice(words, 10)) for _ in range(n_lines))
+
+
+def assert_matches(scorer):
+    assert scorer.profile().terms == resume_profile(scorer.text).terms
+    score, missing = scorer.score()
+    expected_score, expected_missing = ats_score(scorer.text, JD)
+    assert score == pytest.approx(expected_score)
+    assert sorted(missing) == sorted(expected_missing)
+
+
+def test_initial_score_matches_ats_score():
+    assert_matches(IncrementalScorer(RESUME, JD))
+
+
+@pytest.mark.parametrize("edit", [
+    lambda t: t.replace("Python, SQL, Git", "Python, SQL, Git, Kubernetes, PostgreSQL"),
+    lambda t: t + "\nSet up CI/CD pipelines with GitHub Actions",
+    lambda t: t.replace("Deployed services with Docker on AWS\n", ""),
+    lambda t: t.replace("Flask", "Django"),
+    lambda t: "",
+])
+def test_edit_matches_full_rescore(edit):
+    scorer = IncrementalScorer(RESUME, JD)
+    scorer.update(edit(RESUME))
+    assert_matches(scorer)
+
+
+def test_edit_sequence_stays_in_step():
+    scorer = IncrementalScorer(RESUME, JD)
+    text = RESUME
+    for line in ("Machine learning pipelines in Python", "Kubernetes", "Django REST APIs"):
+        text += "\n" + line
+        scorer.update(text)
+        assert_matches(scorer)
+
+    scorer.apply_edit(0, 2, ["John Roe", "Backend Engineer"])
+    assert_matches(scorer)
+
+
+def test_long_document_matches_full_rescore():
+    text = long_resume()
+    assert len(count_terms(text.split())) > TERM_COUNT_CAPACITY
+
+    scorer = IncrementalScorer(text, JD)
+    assert_matches(scorer)
+
+    lines = text.split("\n")
+    lines[700:705] = ["Deployed Kubernetes and PostgreSQL with Django REST APIs"]
+    scorer.update("\n".join(lines))
+    assert_matches(scorer)
@@ -0,0 +1,142 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+import ingest
+from ingest import CorpusStore
+
+RESUME = (
+    "Jane Doe. Senior Python developer with Django, PostgreSQL, AWS and "
+    "Kubernetes. Built CI/CD pipelines, led a team of 6 and cut costs 30%. "
+)
+
+
+def crashing_work(name, data, num_perm):
+    """_work, except files with "crash" in their name kill their worker process"""
+    if "crash" in os.path.basename(name):
+        os._exit(1)
+    return ingest._work(name, data, num_perm)   # the real one: workers import ingest afresh
+
+
+@pytest.fixture
+def intake(tmp_path):
+    root = tmp_path / "intake"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.txt").write_text(RESUME * 5)
+    (root / "sub" / "copy.txt").write_text(RESUME * 5)        # exact duplicate
+    (root / "bad.pdf").write_bytes(b"%PDF-1.4 not really a pdf")
+    with zipfile.ZipFile(root / "batch.zip", "w") as zf:
+        zf.writestr("b.txt", "Nurse with ICU and patient care experience. " * 20)
+        zf.writestr("notes/readme.md", "ignored")
+        zf.writestr("empty.txt", "   ")
+    return root
+
+
+def run(paths, store_dir, **kw):
+    return ingest.ingest([str(p) for p in paths], CorpusStore(str(store_dir)), workers=2, **kw)
+
+
+def test_ingests_dedups_and_reports_failures(intake, tmp_path):
+    report = run([intake], tmp_path / "corpus")
+
+    assert report["ingested"] == 2
+    assert report["duplicates"] == 1
+    assert sorted(os.path.basename(f["source"]) for f in report["failures"]) == \
+        ["bad.pdf", "batch.zip!empty.txt"]
+
+    store = CorpusStore(str(tmp_path / "corpus"))
+    docs = list(store.documents())
+    assert {os.path.basename(d["source"]) for d in docs} == {"a.txt", "batch.zip!b.txt"}
+    for doc in docs:
+        assert store.text(doc["sha256"])
+        assert doc["n_tokens"] > 0
+
+
+def test_second_run_skips_stored_documents(intake, tmp_path):
+    run([intake], tmp_path / "corpus")
+    report = run([intake], tmp_path / "corpus")
+    assert report["ingested"] == 0
+    assert report["duplicates"] == 3
+
+
+def test_worker_crash_fails_only_that_file(tmp_path, monkeypatch):
+    intake = tmp_path / "intake"
+    intake.mkdir()
+    for i in range(6):
+        (intake / f"doc{i}.txt").write_text(f"Candidate {i}. " + RESUME * 3)
+    (intake / "crash.txt").write_text("this file kills its worker")
+
+    monkeypatch.setattr(ingest, "_work", crashing_work)
+    report = run([intake], tmp_path / "corpus")
+
+    assert report["ingested"] == 6
+    assert [os.path.basename(f["source"]) for f in report["failures"]] == ["crash.txt"]
+    assert "crashed" in report["failures"][0]["error"]
+
+
+def test_crashes_never_fail_files_queued_behind_them(tmp_path, monkeypatch):
+    intake = tmp_path / "intake"
+    intake.mkdir()
+    for i in range(16):
+        (intake / f"doc{i:02d}.txt").write_text(f"Candidate {i}. " + RESUME * 3)
+    # Sorted between the documents, so each crash has files queued behind it
+    (intake / "doc03_crash.txt").write_text("kills its worker")
+    (intake / "doc11_crash.txt").write_text("kills its worker too")
+
+    monkeypatch.setattr(ingest, "_work", crashing_work)
+    report = run([intake], tmp_path / "corpus")
+
+    assert report["ingested"] == 16
+    assert sorted(os.path.basename(f["source"]) for f in report["failures"]) == \
+        ["doc03_crash.txt", "doc11_crash.txt"]
+    assert all("crashed" in f["error"] for f in report["failures"])
+
+
+def test_oversized_zip_member_is_rejected_before_reading(tmp_path):
+    archive = tmp_path / "big.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("huge.txt", "a" * 10_000)
+
+    sources = list(ingest.iter_sources([str(archive)], max_bytes=1000))
+    assert len(sources) == 1
+    assert isinstance(sources[0][1], ingest.SourceError)
+
+
+def test_report_is_saved(intake, tmp_path):
+    store = CorpusStore(str(tmp_path / "corpus"))
+    report = ingest.ingest([str(intake)], store, workers=1)
+    with open(ingest.save_report(store, report), encoding="utf-8") as f:
+        assert json.load(f)["ingested"] == 2
+
+
+def test_near_duplicates_are_flagged(tmp_path):
+    intake = tmp_path / "intake"
+    intake.mkdir()
+    text = " ".join(f"Built service {i} with Python, Kafka and AWS for team {i % 5}." for i in range(80))
+    (intake / "v1.txt").write_text(text)
+    (intake / "v2.txt").write_text(text.replace("service 7 ", "service seven ") + " Also Rust.")
+
+    report = run([intake], tmp_path / "corpus")
+    assert report["near_duplicates"] == 1
+
+    store = CorpusStore(str(tmp_path / "corpus"))
+    docs = {os.path.basename(d["source"]): d["sha256"] for d in store.documents()}
+    assert store.canonical(docs["v2.txt"]) == docs["v1.txt"]
+
+
+def test_killed_run_signatures_are_rebuilt(intake, tmp_path):
+    run([intake], tmp_path / "corpus")
+    # As if the run was killed before the signature store was written
+    lsh_dir = tmp_path / "corpus" / "minhash"
+    for name in os.listdir(lsh_dir):
+        os.remove(lsh_dir / name)
+
+    store = CorpusStore(str(tmp_path / "corpus"))
+    assert len(store.lsh) == 2
+    assert len(CorpusStore(str(tmp_path / "corpus")).lsh) == 2   # persisted
+
+    (intake / "a_v2.txt").write_text(RESUME * 5 + "Also Terraform.")
+    report = ingest.ingest([str(intake / "a_v2.txt")], store, workers=1)
+    assert report["near_duplicates"] == 1
@@ -0,0 +1,67 @@
+import pytest
+
+import instrumentation
+from instrumentation import BUCKETS, METRIC_NAME, span, timed
+
+
+@pytest.fixture
+def metrics():
+    was = instrumentation.enabled()
+    instrumentation.set_enabled(True)
+    instrumentation.reset()
+    instrumentation.new_trace()
+    yield instrumentation
+    instrumentation.set_enabled(was)
+    instrumentation.reset()
+
+
+def test_disabled_spans_record_nothing(metrics):
+    metrics.set_enabled(False)
+
+    with span("stage"):
+        pass
+    timed("decorated")(lambda: None)()
+
+    assert metrics.summary() == {}
+    assert metrics.last_trace() == []
+
+
+def test_nested_spans_and_trace(metrics):
+    @timed("outer")
+    def outer():
+        with span("inner"):
+            pass
+        with span("inner"):
+            pass
+
+    outer()
+
+    summary = metrics.summary()
+    assert summary["outer"]["count"] == 1
+    assert summary["inner"]["count"] == 2
+    assert [(name, depth) for name, depth, _ in metrics.last_trace()] == [
+        ("outer", 0), ("inner", 1), ("inner", 1)
+    ]
+
+
+def test_histogram_buckets_are_cumulative(metrics):
+    for seconds in (0.0005, 0.003, 0.003, 100.0):
+        metrics.observe("stage", seconds)
+
+    lines = metrics.export_prometheus().splitlines()
+    buckets = [line for line in lines if line.startswith(METRIC_NAME + "_bucket")]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+
+    assert len(buckets) == len(BUCKETS) + 1
+    assert counts == sorted(counts)
+    assert counts[:2] == [1, 3]          # le=0.001, le=0.005
+    assert counts[-2:] == [3, 4]         # le=60, le=+Inf
+    assert f'{METRIC_NAME}_count{{stage="stage"}} 4' in lines
+
+
+def test_span_records_on_exception(metrics):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError
+
+    assert metrics.summary()["failing"]["count"] == 1
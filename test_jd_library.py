@@ -0,0 +1,108 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+import jd_library
+from jd_library import JDLibrary
+
+JDS = [
+    {"id": "py", "title": "Python Developer", "text": "Python developer with Django, PostgreSQL and AWS experience"},
+    {"id": "fe", "title": "Frontend Engineer", "text": "Frontend engineer: React, TypeScript, CSS and Node.js"},
+    {"id": "ops", "title": "DevOps", "text": "DevOps engineer with Kubernetes, Docker, Terraform and CI/CD"},
+]
+
+
+def fake_encode(texts):
+    """Deterministic unit vectors, one per text (no model download)"""
+    vecs = []
+    for text in texts:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+        v = np.random.default_rng(seed).standard_normal(16).astype(np.float32)
+        vecs.append(v / np.linalg.norm(v))
+    return np.vstack(vecs)
+
+
+@pytest.fixture(autouse=True)
+def no_model(monkeypatch):
+    monkeypatch.setattr(jd_library, "_encode", fake_encode)
+
+
+def build(jds=JDS, **kw):
+    library = JDLibrary(**kw)
+    library.add_many(jds)
+    return library
+
+
+def test_save_load_round_trip(tmp_path):
+    library = build()
+    library.save(tmp_path)
+
+    loaded = JDLibrary.load(tmp_path)
+    assert loaded.jds == library.jds
+    assert loaded.term_counts == library.term_counts
+    assert np.array_equal(loaded.embeddings, library.embeddings)
+    assert list(loaded.shortlist("Python and Django on AWS", n=3)[0]) == \
+        list(library.shortlist("Python and Django on AWS", n=3)[0])
+
+
+def test_save_over_memory_mapped_load(tmp_path):
+    build().save(tmp_path)
+
+    loaded = JDLibrary.load(tmp_path, mmap=True)
+    loaded.save(tmp_path)
+    assert np.array_equal(JDLibrary.load(tmp_path, mmap=False).embeddings, loaded.embeddings)
+
+    loaded.add("ml", "Machine learning engineer with PyTorch")
+    loaded.save(tmp_path)
+
+    reloaded = JDLibrary.load(tmp_path)
+    assert len(reloaded) == 4
+    assert reloaded.embeddings.shape == (4, 16)
+    assert np.allclose(reloaded.embeddings, fake_encode(jd["text"] for jd in reloaded.jds))
+
+
+def test_save_without_embeddings_keeps_file(tmp_path):
+    build().save(tmp_path)
+    before = np.load(tmp_path / "embeddings.npy")
+
+    JDLibrary.load(tmp_path, use_embeddings=False).save(tmp_path)
+
+    assert np.array_equal(np.load(tmp_path / "embeddings.npy"), before)
+
+
+def test_missing_embedding_rows_are_backfilled(tmp_path):
+    library = build(use_embeddings=False)
+    library.save(tmp_path)
+    assert not (tmp_path / "embeddings.npy").exists()
+
+    loaded = JDLibrary.load(tmp_path)
+    loaded.add("ml", "Machine learning engineer with PyTorch")
+
+    assert loaded.embeddings.shape == (4, 16)
+    assert np.allclose(loaded.embeddings, fake_encode(jd["text"] for jd in loaded.jds))
+
+
+def test_rank_prefers_matching_jd():
+    results = build().rank("Senior Python developer, Django REST APIs on AWS", top_k=3)
+    assert results[0]["id"] == "py"
+
+
+def test_rank_rescores_the_whole_shortlist():
+    from ats_analyser import ats_score
+
+    resume = "Senior Python developer, Django REST APIs on AWS with Docker"
+    jds = JDS + [
+        {"id": f"jd{i}", "title": f"Role {i}", "text": f"{words} and team player number {i}"}
+        for i, words in enumerate([
+            "Python Django AWS Docker REST APIs developer",
+            "Java Spring developer",
+            "Python data scientist with pandas",
+            "Docker Kubernetes AWS platform engineer",
+        ])
+    ]
+    full = sorted((ats_score(resume, jd["text"])[0] for jd in jds), reverse=True)
+
+    # The whole library is shortlisted, so the top 2 are the best ATS scores
+    results = build(jds).rank(resume, top_k=2, shortlist_size=len(jds))
+    assert [r["score"] for r in results] == full[:2]
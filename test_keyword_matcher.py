@@ -0,0 +1,25 @@
+from keyword_matcher import KeywordMatcher
+
+TEXT = "Java and JavaScript developer. Built Node.js + C++ services; CI/CD with Jenkins. java!"
+
+
+def test_present_matches_substring_semantics():
+    terms = ["java", "javascript", "node.js", "c++", "ci/cd", "go", "rust"]
+    lower = TEXT.lower()
+    assert KeywordMatcher(terms).present(TEXT) == {t for t in terms if t in lower}
+
+
+def test_counts_match_str_count():
+    terms = ["java", "script", "c++", "aa", "ci/cd"]
+    text = TEXT + " aaaa"
+    lower = text.lower()
+    counts = KeywordMatcher(terms).counts(text)
+    assert counts == {t: lower.count(t) for t in terms if lower.count(t)}
+    assert counts["aa"] == 2   # non-overlapping, like str.count
+
+
+def test_terms_are_lowercased_and_deduplicated():
+    matcher = KeywordMatcher(["Python", "python", "", "SQL"])
+    assert matcher.terms == ("python", "sql")
+    assert len(matcher) == 2
+    assert matcher.present("PYTHON developer") == {"python"}
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from minhash import LSHIndex, MinHasher, jaccard, lsh_params, shingle_hashes
+
+BASE = " ".join(
+    f"Worked on project {i} using Python, AWS and Kubernetes; led team {i % 7} "
+    f"delivering feature {i * 3} on time"
+    for i in range(60)
+)
+
+
+def edited(text, n):
+    """text with n words replaced"""
+    words = text.split()
+    for i in range(0, n * 7, 7):
+        words[i] = f"edit{i}"
+    return " ".join(words)
+
+
+def test_shingles_are_stable_and_normalized():
+    a = shingle_hashes("Python developer, AWS & Kubernetes!")
+    b = shingle_hashes("python   developer AWS Kubernetes")
+    assert np.array_equal(a, b)
+    assert len(shingle_hashes("")) == 0
+
+
+def test_signature_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a, b = shingle_hashes(BASE), shingle_hashes(edited(BASE, 20))
+    exact = len(np.intersect1d(a, b)) / len(np.union1d(a, b))
+    estimate = jaccard(hasher.signature(a), hasher.signature(b))
+    assert abs(estimate - exact) < 0.1
+
+
+def test_lsh_params_fit_num_perm():
+    bands, rows = lsh_params(0.8, 128)
+    assert bands * rows <= 128
+    # Recall-weighted: pairs at the threshold are found most of the time
+    assert 1 - (1 - 0.8 ** rows) ** bands > 0.6
+
+
+@pytest.fixture
+def index():
+    index = LSHIndex(threshold=0.7)
+    sign = index.hasher.text_signature
+    index.add("base", sign(BASE))
+    index.add("other", sign("Registered nurse, ICU rotation and patient care plans. " * 30))
+    return index
+
+
+def test_query_finds_near_duplicate_only(index):
+    matches = index.query(index.hasher.text_signature(edited(BASE, 5)))
+    assert [key for key, _ in matches] == ["base"]
+    assert matches[0][1] >= 0.7
+
+
+def test_query_ignores_unrelated_text(index):
+    unrelated = "Frontend engineer: React, TypeScript, accessibility and design systems. " * 30
+    assert index.query(index.hasher.text_signature(unrelated)) == []
+
+
+def test_save_load_round_trip(index, tmp_path):
+    index.save(str(tmp_path))
+    loaded = LSHIndex.load(str(tmp_path))
+
+    assert loaded.keys == index.keys
+    assert np.array_equal(loaded.signatures, index.signatures)
+    sig = index.hasher.text_signature(edited(BASE, 5))
+    assert loaded.query(sig) == index.query(sig)
+
+
+def test_open_missing_dir_is_empty(tmp_path):
+    assert len(LSHIndex.open(str(tmp_path / "none"))) == 0
+
+
+def test_add_grows_and_ignores_duplicate_keys():
+    index = LSHIndex()
+    sig = index.hasher.text_signature(BASE)
+    for i in range(100):
+        index.add(f"k{i}", sig)
+    index.add("k0", sig)
+    assert len(index) == 100
+    assert index.signatures.shape == (100, index.num_perm)
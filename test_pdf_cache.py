@@ -0,0 +1,102 @@
+import io
+import threading
+import time
+
+import pytest
+
+import pdf_cache
+from pdf_cache import PDFTextCache
+
+
+class Extractor:
+    """Stands in for extract_text_from_pdf and counts the parses"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, data, max_pages, max_chars):
+        self.calls.append(data)
+        time.sleep(self.delay)
+        return "text of " + data.decode()
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    extractor = Extractor()
+    monkeypatch.setattr(pdf_cache, "extract_text_from_pdf", extractor)
+    return extractor
+
+
+def test_same_bytes_parsed_once(extractor):
+    cache = PDFTextCache()
+
+    assert cache.extract(b"resume") == "text of resume"
+    # A re-uploaded file object with the same bytes is a hit
+    assert cache.extract(io.BytesIO(b"resume")) == "text of resume"
+    assert len(extractor.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_budgets_are_part_of_the_key(extractor):
+    cache = PDFTextCache()
+    cache.extract(b"resume", max_pages=2)
+    cache.extract(b"resume", max_pages=3)
+    assert len(extractor.calls) == 2
+
+
+def test_lru_bounds_entries_and_chars(extractor):
+    cache = PDFTextCache(max_entries=2)
+    cache.extract(b"a")
+    cache.extract(b"b")
+    cache.extract(b"a")   # "b" is now least recently used
+    cache.extract(b"c")
+
+    assert len(cache) == 2
+    cache.extract(b"a")
+    cache.extract(b"b")
+    assert extractor.calls == [b"a", b"b", b"c", b"b"]
+
+    small = PDFTextCache(max_chars=len("text of a") + 1)
+    small.extract(b"a")
+    small.extract(b"b")
+    assert len(small) == 1
+
+
+def test_disk_cache_survives_a_new_instance(extractor, tmp_path):
+    PDFTextCache(disk_dir=str(tmp_path)).extract(b"resume")
+    assert PDFTextCache(disk_dir=str(tmp_path)).extract(b"resume") == "text of resume"
+    assert len(extractor.calls) == 1
+
+
+def test_disk_prune_keeps_newest_files(extractor, tmp_path):
+    cache = PDFTextCache(disk_dir=str(tmp_path), disk_files=2)
+    for data in (b"a", b"b", b"c"):
+        cache.extract(data)
+        time.sleep(0.01)
+
+    assert len(list(tmp_path.glob("*.txt"))) == 2
+    cache.clear()
+    cache.extract(b"a")
+    assert extractor.calls == [b"a", b"b", b"c", b"a"]
+
+
+def test_concurrent_uploads_parse_once(monkeypatch):
+    extractor = Extractor(delay=0.2)
+    monkeypatch.setattr(pdf_cache, "extract_text_from_pdf", extractor)
+    cache = PDFTextCache()
+    barrier = threading.Barrier(8)
+    results = []
+
+    def run():
+        barrier.wait()
+        results.append(cache.extract(b"resume"))
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert results == ["text of resume"] * 8
+    assert len(extractor.calls) == 1
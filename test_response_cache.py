@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import pytest
+
+from response_cache import ResponseCache, response_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path), ttl=60, max_bytes=1 << 20)
+
+
+def test_key_depends_on_every_part():
+    assert response_key("resume", "jd", 1) == response_key("resume", "jd", 1)
+    assert response_key("resume", "jd", 1) != response_key("resume", "jd", 2)
+
+
+def test_put_get_round_trip(cache):
+    cache.put("k", "enhanced resume")
+    assert cache.get("k") == "enhanced resume"
+    assert cache.get("missing") is None
+
+
+def test_expired_entry_is_a_miss_and_removed(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0.05)
+    cache.put("k", "old")
+    time.sleep(0.1)
+
+    assert cache.get("k") is None
+    assert not os.path.exists(cache._file("k"))
+
+
+def test_prune_removes_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60, max_bytes=350)
+    cache.put("a", "x" * 100)
+    cache.put("b", "x" * 100)
+    # Touch "a" so "b" is the least recently used
+    past = time.time() - 10
+    os.utime(cache._file("b"), (past, past))
+    cache.get("a")
+
+    cache.put("c", "x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_refresh_recomputes_and_replaces(cache):
+    assert cache.get_or_compute("k", lambda: "first") == "first"
+    assert cache.get_or_compute("k", lambda: "second") == "first"
+    assert cache.get_or_compute("k", lambda: "second", refresh=True) == "second"
+    assert cache.get("k") == "second"
+
+
+def concurrent(cache, compute, n=8):
+    """Run n get_or_compute calls at once; returns (results, errors)"""
+    results, errors = [], []
+    barrier = threading.Barrier(n)
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(cache.get_or_compute("k", compute))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_misses_compute_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "enhanced"
+
+    results, errors = concurrent(cache, compute)
+
+    assert not errors
+    assert results == ["enhanced"] * 8
+    assert len(calls) == 1
+
+
+def test_failure_is_shared_not_retried(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("quota exceeded")
+
+    results, errors = concurrent(cache, compute)
+
+    assert not results
+    assert len(errors) == 8
+    assert all(str(e) == "quota exceeded" for e in errors)
+    assert len(calls) == 1
+    assert cache.get("k") is None
+
+
+def test_lookup_does_not_wait_for_another_key(cache):
+    cache.put("cached", "ready")
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    worker = threading.Thread(target=cache.get_or_compute, args=("other", slow))
+    worker.start()
+    started.wait(5)
+    try:
+        # The lock is not held across another key's compute
+        assert cache.get_or_compute("cached", lambda: "unused") == "ready"
+    finally:
+        release.set()
+        worker.join(5)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+import rag_engine
+from resume_index import ResumeIndex
+
+DIM = 16
+
+
+def vector(text):
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+class FakeEncoder:
+    cache_key = "fake-encoder"
+
+
+@pytest.fixture(autouse=True)
+def fake_encoder(monkeypatch):
+    monkeypatch.setattr(rag_engine, "encode", lambda texts: np.vstack([vector(t) for t in texts]))
+    monkeypatch.setattr(rag_engine, "get_encoder", lambda: FakeEncoder())
+
+
+def lines(candidate, n=5):
+    return [f"{candidate} built systems with tool {j}" for j in range(n)]
+
+
+def top(index, query):
+    results = index.find_candidates("", queries=[query], top_candidates=1)
+    return results[0]["candidate_id"], results[0]["hits"][0]["chunk"]
+
+
+def populated(n_candidates):
+    index = ResumeIndex()
+    for c in range(n_candidates):
+        index.add(f"c{c}", lines(f"c{c}"))
+    return index
+
+
+def test_add_delete_update_then_search():
+    index = populated(3)
+    assert top(index, lines("c1")[2]) == ("c1", lines("c1")[2])
+
+    assert index.delete("c1") == 5
+    assert index.delete("c1") == 0
+    assert "c1" not in [r["candidate_id"] for r in index.find_candidates("", queries=lines("c1"))]
+
+    index.update("c2", ["c2 moved into data engineering roles"])
+    assert index.by_candidate["c2"] == [index.next_id - 1]
+    assert top(index, "c2 moved into data engineering roles")[0] == "c2"
+    assert len(index) == 2 and index.ntotal == 6
+
+
+def test_scores_average_over_lines():
+    index = populated(2)
+    queries = lines("c0")[:2] + ["nothing like any stored line at all"]
+    result = index.find_candidates("", queries=queries, k_chunks=2)[0]
+
+    assert result["candidate_id"] == "c0"
+    exact = [h["score"] for h in result["hits"] if h["query"] in queries[:2]]
+    assert exact == pytest.approx([1.0, 1.0])
+    # An unmatched line counts as 0 in the mean
+    assert result["score"] == pytest.approx(sum(h["score"] for h in result["hits"]) / 3)
+
+
+def test_distance_metric_rejected():
+    with pytest.raises(ValueError):
+        ResumeIndex(metric="l2")
+
+
+def test_ivf_keeps_ids_through_delete_add_and_rebuild():
+    index = populated(300)
+    index.rebuild("ivf")
+    assert isinstance(index.index, faiss.IndexIVF)
+
+    for c in ("c3", "c10", "c150"):
+        index.delete(c)
+    index.add("new", ["new candidate with a unique line"])
+    index.update("c20", lines("c20b"))
+
+    for c in ("c0", "c149", "c299", "c20b"):
+        owner = "c20" if c == "c20b" else c
+        assert top(index, lines(c)[4]) == (owner, lines(c)[4])
+    assert top(index, "new candidate with a unique line")[0] == "new"
+
+    # Rebuilding an IVF index after deletes reconstructs by id
+    index.rebuild("flat")
+    assert isinstance(index.index, faiss.IndexIDMap2)
+    assert index.ntotal == len(index.chunks)
+    assert top(index, lines("c299")[1]) == ("c299", lines("c299")[1])
+
+    index.delete("c299")
+    index.rebuild("ivf")
+    assert top(index, lines("c298")[1]) == ("c298", lines("c298")[1])
+    assert index.ntotal == len(index.chunks)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf"])
+def test_save_load_round_trip(tmp_path, index_type):
+    index = populated(300 if index_type == "ivf" else 3)
+    index.rebuild(index_type)
+    index.delete("c1")
+    index.save(str(tmp_path))
+
+    loaded = ResumeIndex.load(str(tmp_path))
+    assert loaded.next_id == index.next_id
+    assert loaded.chunks == index.chunks
+    assert loaded.by_candidate == index.by_candidate
+    assert loaded.metric == index.metric
+
+    # New ids continue after the saved ones, even past deleted candidates
+    ids = loaded.add("c-new", ["fresh candidate line for the store"])
+    assert ids == [index.next_id]
+    assert top(loaded, "fresh candidate line for the store")[0] == "c-new"
+    assert top(loaded, lines("c2")[0]) == ("c2", lines("c2")[0])
+
+
+def test_load_missing_path_is_empty(tmp_path):
+    index = ResumeIndex.load(str(tmp_path / "none"))
+    assert len(index) == 0 and index.find_candidates("some job description text") == []
+
+
+def test_save_removes_stale_generations(tmp_path):
+    index = populated(2)
+    index.save(str(tmp_path))
+    index.add("c9", lines("c9"))
+    index.save(str(tmp_path))
+
+    with open(tmp_path / "meta.json") as f:
+        meta = json.load(f)
+    assert meta["generation"] == 2
+    assert sorted(os.listdir(tmp_path)) == sorted(["meta.json", meta["index"], meta["chunks"]])
+    assert len(ResumeIndex.load(str(tmp_path))) == 3
@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+import skill_taxonomy
+from ats_analyser import resume_profile
+from skill_taxonomy import compile_taxonomy, load_taxonomy, refresh_taxonomy, reload_taxonomy
+
+
+def write(path, skills, version="1", mtime=None):
+    path.write_text(json.dumps({"version": version, "skills": skills}))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def taxonomy_file(tmp_path, monkeypatch):
+    """A tmp taxonomy installed as the shared one, checked on every refresh"""
+    path = tmp_path / "taxonomy.json"
+    write(path, {"kubernetes": ["k8s", "kube"], "golang": ["go lang"]}, mtime=1_000_000)
+
+    monkeypatch.setattr(skill_taxonomy, "_current", None)
+    monkeypatch.setattr(skill_taxonomy, "_last_check", 0.0)
+    monkeypatch.setattr(skill_taxonomy, "RELOAD_INTERVAL", 0.0)
+    reload_taxonomy(str(path))
+    return path   # monkeypatch restores the shared taxonomy afterwards
+
+
+def test_compile_normalizes_variants():
+    index = compile_taxonomy({"Kubernetes ": ["K8s", " kube"]})
+    assert index == {"kubernetes": "kubernetes", "k8s": "kubernetes", "kube": "kubernetes"}
+
+
+def test_variant_repeated_under_one_skill_is_allowed():
+    assert compile_taxonomy({"python": ["py", "PY", "python"]})["py"] == "python"
+
+
+@pytest.mark.parametrize("skills", [
+    {"javascript": ["js"], "json": ["js"]},            # shared variant
+    {"go": ["golang"], "golang": ["go lang"]},         # variant is another canonical
+])
+def test_conflicting_variants_are_rejected(skills):
+    with pytest.raises(ValueError, match="maps to both"):
+        compile_taxonomy(skills)
+
+
+def test_load_records_version_and_mtime(taxonomy_file):
+    taxonomy = load_taxonomy(str(taxonomy_file))
+    assert taxonomy.version == "1"
+    assert taxonomy.mtime == 1_000_000
+    assert taxonomy.normalize("k8s") == "kubernetes"
+    assert taxonomy.normalize("unknown") == "unknown"
+
+
+def test_changed_file_is_reloaded(taxonomy_file):
+    before = refresh_taxonomy()
+    assert refresh_taxonomy() is before   # unchanged mtime: no reload
+
+    write(taxonomy_file, {"kubernetes": ["k8s", "k3s"]}, version="2", mtime=1_000_100)
+    after = refresh_taxonomy()
+
+    assert after.version == "2"
+    assert after.generation == before.generation + 1
+    assert after.normalize("k3s") == "kubernetes"
+    assert after.normalize("kube") == "kube"
+
+
+def test_reload_waits_for_the_interval(taxonomy_file, monkeypatch):
+    before = refresh_taxonomy()
+    monkeypatch.setattr(skill_taxonomy, "RELOAD_INTERVAL", 3600.0)
+
+    write(taxonomy_file, {"kubernetes": ["k3s"]}, version="2", mtime=1_000_100)
+    assert refresh_taxonomy() is before
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps({"version": "2"}),                                    # no skills
+    json.dumps({"version": "2", "skills": {"a": ["x"], "b": ["x"]}}),  # conflict
+])
+def test_broken_file_keeps_previous_taxonomy(taxonomy_file, content):
+    before = refresh_taxonomy()
+    taxonomy_file.write_text(content)
+    os.utime(taxonomy_file, (1_000_100, 1_000_100))
+
+    assert refresh_taxonomy() is before
+    assert before.normalize("k8s") == "kubernetes"
+
+
+def test_profile_cache_follows_taxonomy_generation(taxonomy_file):
+    text = "Ran k3s clusters and wrote Go services"
+    before = resume_profile(text)
+    assert resume_profile(text) is before
+    assert "kubernetes" not in before.combined_normalized
+
+    write(taxonomy_file, {"kubernetes": ["k8s", "k3s"]}, version="2", mtime=1_000_100)
+    after = resume_profile(text)
+
+    assert after is not before
+    assert "kubernetes" in after.combined_normalized
@@ -0,0 +1,36 @@
+"""
+Pins utils.clean_text output. Ingestion stores it as the corpus text and
+the MinHash shingles are built from it, so any change here shifts
+near-duplicate matches against already stored signatures; update these
+cases deliberately. ATS scoring and RAG chunking do not use it.
+"""
+import pytest
+
+from utils import clean_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Tech tokens stay whole: + # . - / are token characters
+    ("Skilled in C++, C#, Node.js and CI/CD.", "Skilled in C++ C# Node.js and CI/CD."),
+    ("R&D, A/B testing, .NET Core, k8s", "R D A/B testing .NET Core k8s"),
+    ("React.js / TypeScript — 5+ years; AWS (EC2, S3)", "React.js / TypeScript 5+ years AWS EC2 S3"),
+    # Contact lines: @ | ( ) : split tokens, case is preserved
+    ("Email: jane.doe@example.com | Phone: +1 (555) 123-4567",
+     "Email jane.doe example.com Phone +1 555 123-4567"),
+    # Bullets, currency and percent signs are dropped
+    ("• Led a team of 8 • Reduced costs by $200K (40%)", "Led a team of 8 Reduced costs by 200K 40"),
+    # Whitespace collapses to single spaces
+    ("  Multiple   spaces\n\nand\tTabs ", "Multiple spaces and Tabs"),
+])
+def test_clean_text_normalization(text, expected):
+    assert clean_text(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", None])
+def test_clean_text_empty(text):
+    assert clean_text(text) == ""
+
+
+def test_clean_text_is_idempotent():
+    text = "Python / Django developer; CI/CD (GitHub Actions), C++ & Node.js — 7+ yrs"
+    assert clean_text(clean_text(text)) == clean_text(text)
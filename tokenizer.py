@@ -0,0 +1,52 @@
+"""
+Shared tokenizer for the analysis pipeline.
+
+One pass over the text with precompiled patterns produces everything the
+scoring code needs: token offsets, a case-preserved view (for tech-pattern
+detection) and a lowercased view (for matching). A token is a run of
+letters, digits and + # . - / so "C++", "node.js" and "CI/CD" stay whole.
+"""
+import re
+from typing import NamedTuple
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9+#.\-/]+")
+
+TECH_RE = re.compile(
+    r"\b[A-Z]{2,}\+?\+?\b"             # AWS, API, C++
+    r"|\b\w+\d+\b"                     # Python3
+    r"|\b[A-Z][a-z]+(?:\.[a-z]+)+\b"   # Node.js
+)
+
+
+class TokenStream(NamedTuple):
+    spans: tuple    # (start, end) character offsets into the source text
+    raw: tuple      # case-preserved tokens
+    lower: tuple    # lowercased tokens
+    tech: frozenset # lowercased tech-pattern matches
+
+    @property
+    def cleaned(self):
+        """Lowercased tokens joined by single spaces"""
+        return " ".join(self.lower)
+
+
+def tokenize(text):
+    """Tokenize text once for every analysis stage"""
+    spans = []
+    raw = []
+    lower = []
+    tech = set()
+
+    for m in TOKEN_RE.finditer(text or ""):
+        token = m.group()
+        low = token.lower()
+
+        spans.append(m.span())
+        raw.append(token)
+        lower.append(low)
+
+        # Only tokens with capitals or digits can match a tech pattern
+        if token != low or not low.isalpha():
+            tech.update(t.lower() for t in TECH_RE.findall(token))
+
+    return TokenStream(tuple(spans), tuple(raw), tuple(lower), frozenset(tech))
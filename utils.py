@@ -1,25 +1,21 @@
 # ---------------- IMPORTS ----------------
-import re
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
+from tokenizer import tokenize
+
 
 # ---------------- TEXT CLEANING ----------------
 def clean_text(text):
     """
     Clean resume text by removing extra spaces
     and unwanted special characters.
+    Keeps the case-preserved tokens of the shared tokenizer.
     """
     if not text:
         return ""
 
-    # Remove extra spaces and newlines
-    text = re.sub(r"\s+", " ", text)
-
-    # Remove unwanted symbols but keep useful ones
-    text = re.sub(r"[^A-Za-z0-9.,+/# ]", "", text)
-
-    return text.strip()
+    return " ".join(tokenize(text).raw)
 
 
 # ---------------- TEXT CHUNKING ----------------
@@ -52,7 +48,7 @@ def extract_keywords(text):
     if not text:
         return []
 
-    words = text.lower().split()
+    words = tokenize(text).lower
 
     stopwords = {
         "and", "or", "the", "a", "an",